@@ -0,0 +1,58 @@
+"""Compare the Barnes-Hut solver against the direct sum as N grows
+
+Run from the repository root with `python -m benchmarks.barneshut`.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.BarnesHut import Octree
+from src.kernels import directField
+
+
+def timeIt(func, repeat):
+    """Best wall time of repeat calls to func, and its last result"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[250, 500, 1000, 2000, 4000, 8000, 16000])
+    parser.add_argument('--theta', type=float, default=0.5)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f'{"N":>8} {"direct [s]":>12} {"tree [s]":>12} {"speedup":>8} '
+          f'{"max err":>10} {"rms err":>10}')
+
+    for n in args.sizes:
+        pos = rng.normal(size=(n, 3))
+        mass = rng.uniform(0.5, 1.5, n)
+
+        direct_time, reference = timeIt(
+            lambda: directField(pos, mass, 1.0), args.repeat
+        )
+        tree_time, field = timeIt(
+            lambda: Octree(pos, mass).field(1.0, args.theta), args.repeat
+        )
+
+        error = np.linalg.norm(field - reference, axis=1) / \
+            np.linalg.norm(reference, axis=1)
+
+        print(f'{n:>8} {direct_time:>12.4f} {tree_time:>12.4f} '
+              f'{direct_time / tree_time:>8.2f} {error.max():>10.2e} '
+              f'{np.sqrt(np.mean(error**2)):>10.2e}')
+
+
+if __name__ == '__main__':
+    main()
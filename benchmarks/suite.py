@@ -0,0 +1,292 @@
+"""Benchmarks of the simulation and drawing hot paths
+
+Run from the repository root with `python -m benchmarks.suite`. It sweeps
+body counts and trajectory lengths over Universe.stepTime for each engine,
+UniverseBatch.stepTime, Universe._fieldOnPlanet and _pairFields,
+Planet.update and the View drawing, reporting body-steps/s and frame
+times. Drawing goes through SDL's dummy video driver, so no display is
+needed.
+
+With --output the results are saved as JSON. Giving an earlier file with
+--compare prints the change of each benchmark and exits with status 1 if
+any got slower by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+from src.Planet import Planet  # noqa: E402
+from src.Universe import Universe  # noqa: E402
+from src.UniverseBatch import UniverseBatch  # noqa: E402
+from src.View import View  # noqa: E402
+from src.scenarios import plummer  # noqa: E402
+from src.vecN import Vec3  # noqa: E402
+
+from .barneshut import timeIt  # noqa: E402
+
+
+def _universe(n, engine='numpy', trail=0, seed=0):
+    """Plummer sphere of n bodies with trajectories of trail points"""
+    universe = Universe(0.001, 1, engine=engine)
+    universe.setArrays(
+        **plummer(n, scale=50, seed=seed), trajectoryCapacity=trail
+    )
+
+    if trail:
+        rng = np.random.default_rng(seed)
+        for planet, pos in zip(universe.planets, universe.positions):
+            walk = np.cumsum(rng.normal(0, 0.5, (trail, 3)), axis=0)
+            planet.trajectory.setPoints(pos + walk)
+
+    return universe
+
+
+def _result(name, params, seconds, rate=None, unit=None):
+    return {
+        'name': name, 'params': params, 'seconds': seconds, 'rate': rate,
+        'unit': unit
+    }
+
+
+def benchStepTime(engine, n, trail, steps, repeat):
+    """Time of Universe.stepTime, in body-steps/s"""
+    universe = _universe(n, engine, trail)
+
+    def run():
+        for _ in range(steps):
+            universe.stepTime()
+
+    seconds, _ = timeIt(run, repeat)
+    return _result(
+        'stepTime', {'engine': engine, 'bodies': n, 'trail': trail},
+        seconds / steps, n * steps / seconds, 'body-steps/s'
+    )
+
+
+def benchBatch(systems, n, steps, repeat, seed=0):
+    """Time of UniverseBatch.stepTime on three-body-like systems"""
+    rng = np.random.default_rng(seed)
+    batch = UniverseBatch(0.001, 1, 'leapfrog')
+    batch.setArrays(
+        rng.uniform(1, 2, (systems, n)), rng.normal(0, 10, (systems, n, 3)),
+        rng.normal(0, 0.3, (systems, n, 3))
+    )
+
+    seconds, _ = timeIt(lambda: batch.stepTime(steps), repeat)
+    return _result(
+        'UniverseBatch.stepTime', {'systems': systems, 'bodies': n},
+        seconds / steps, systems * n * steps / seconds, 'body-steps/s'
+    )
+
+
+def benchFieldOnPlanet(n, repeat):
+    """Time of the python engine's field on one planet"""
+    universe = _universe(n, 'python')
+    planet = universe.planets[0]
+
+    seconds, _ = timeIt(lambda: universe._fieldOnPlanet(0, planet), repeat)
+    return _result(
+        '_fieldOnPlanet', {'bodies': n}, seconds, n / seconds, 'pairs/s'
+    )
+
+
+def benchPairFields(n, repeat):
+    """Time of the python engine's field on every planet, pair by pair"""
+    universe = _universe(n, 'python')
+
+    seconds, _ = timeIt(universe._pairFields, repeat)
+    return _result(
+        '_pairFields', {'bodies': n}, seconds, n * (n - 1) / 2 / seconds,
+        'pairs/s'
+    )
+
+
+def benchPlanetUpdate(trail, calls, repeat):
+    """Time of Planet.update, trajectory bookkeeping included"""
+    planet = Planet(1, Vec3(1, 2, 3), Vec3(0, 1), trajectoryCapacity=trail)
+    field = Vec3(0.1, 0.2, 0.3)
+
+    def run():
+        for _ in range(calls):
+            planet.update(field, 0.001)
+
+    seconds, _ = timeIt(run, repeat)
+    return _result(
+        'Planet.update', {'trail': trail}, seconds / calls,
+        calls / seconds, 'updates/s'
+    )
+
+
+def benchDraw(view, n, trail, repeat):
+    """Frame time of View.drawUniverse, redrawing the trail layer whole"""
+    universe = _universe(n, trail=trail)
+    view.camCenter = None
+
+    def run():
+        view._invalidateTrails()
+        view.drawUniverse(universe)
+
+    seconds, _ = timeIt(run, repeat)
+    return _result(
+        'drawUniverse', {'bodies': n, 'trail': trail}, seconds,
+        1 / seconds, 'frames/s'
+    )
+
+
+def benchDrawIncremental(view, n, trail, repeat):
+    """Frame time of View.drawUniverse when each trail grows by a point"""
+    universe = _universe(n, trail=trail)
+    view.camCenter = None
+    view.drawUniverse(universe)
+
+    def run():
+        for planet, pos in zip(universe.planets, universe.positions):
+            planet.trajectory.append(pos)
+        view.drawUniverse(universe)
+
+    seconds, _ = timeIt(run, repeat)
+    return _result(
+        'drawUniverse incremental', {'bodies': n, 'trail': trail}, seconds,
+        1 / seconds, 'frames/s'
+    )
+
+
+def benchDrawPlanets(view, n, repeat):
+    """Time of View._drawPlanets for n planets, without their trails"""
+    universe = _universe(n, trail=0)
+    view.camCenter = None
+    view._setUpCamera(universe.planets)
+
+    seconds, _ = timeIt(lambda: view._drawPlanets(universe), repeat)
+    return _result(
+        '_drawPlanets', {'bodies': n}, seconds, n / seconds, 'planets/s'
+    )
+
+
+def runSuite(bodies, trails, engines, pythonMax, steps, repeat,
+             systems=(1000,), report=print):
+    """Run every benchmark of the sweep, returning the list of results"""
+    results = []
+
+    def add(result):
+        results.append(result)
+        report(formatResult(result))
+
+    for n in bodies:
+        for engine in engines:
+            if engine == 'python' and n > pythonMax:
+                continue
+            for trail in trails:
+                add(benchStepTime(engine, n, trail, steps, repeat))
+
+    for n in bodies:
+        if n <= pythonMax:
+            add(benchFieldOnPlanet(n, repeat))
+            add(benchPairFields(n, repeat))
+
+    for numSystems in systems:
+        for n in (3, 10):
+            add(benchBatch(numSystems, n, steps, repeat))
+
+    for trail in trails:
+        add(benchPlanetUpdate(trail, 10000, repeat))
+
+    view = View(800, 600)
+    try:
+        for n in bodies:
+            add(benchDrawPlanets(view, n, repeat))
+        for n in bodies:
+            for trail in trails:
+                add(benchDraw(view, n, trail, repeat))
+                add(benchDrawIncremental(view, n, trail, repeat))
+    finally:
+        view.quit()
+
+    return results
+
+
+def resultKey(result):
+    """Name and parameters identifying a benchmark across runs"""
+    params = ','.join(f'{k}={v}' for k, v in sorted(result['params'].items()))
+    return f'{result["name"]}[{params}]'
+
+
+def formatResult(result):
+    rate = f'{result["rate"]:.4g} {result["unit"]}' if result['rate'] else ''
+    return f'{resultKey(result):<50} {result["seconds"]:>12.3e} s  {rate}'
+
+
+def compare(results, baseline, tolerance):
+    """Print the change against a baseline, returning the slower keys"""
+    previous = {resultKey(r): r for r in baseline['results']}
+    slower = []
+
+    for result in results:
+        key = resultKey(result)
+        if key not in previous:
+            continue
+
+        ratio = result['seconds'] / previous[key]['seconds']
+        flag = ''
+        if ratio > 1 + tolerance:
+            flag = 'SLOWER'
+            slower.append(key)
+        elif ratio < 1 / (1 + tolerance):
+            flag = 'faster'
+        print(f'{key:<50} {ratio:>8.2f}x  {flag}')
+
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--bodies', type=int, nargs='+',
+                        default=[100, 1000, 5000])
+    parser.add_argument('--trails', type=int, nargs='+',
+                        default=[0, 100, 1000])
+    parser.add_argument('--engines', nargs='+',
+                        default=['python', 'numpy', 'barneshut'])
+    parser.add_argument('--python-max', type=int, default=300,
+                        help='largest body count run with the python engine')
+    parser.add_argument('--systems', type=int, nargs='+', default=[1000],
+                        help='system counts of the batched few-body runs')
+    parser.add_argument('--steps', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='JSON file to write the results to')
+    parser.add_argument('--compare', help='JSON file of an earlier run')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='relative slowdown reported as a regression')
+    args = parser.parse_args(argv)
+
+    results = runSuite(
+        args.bodies, args.trails, args.engines, args.python_max, args.steps,
+        args.repeat, args.systems
+    )
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'pygame': pygame.version.ver,
+                'machine': platform.machine(),
+                'results': results,
+            }, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            if compare(results, json.load(file), args.tolerance):
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
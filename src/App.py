@@ -1,7 +1,9 @@
 import pygame
-import copy
+import time
 
 from .Planet import Planet
+from .profiling import Profiler
+from .SimulationThread import SimulationThread
 from .Universe import Universe
 from .View import View
 from .vecN import Vec3
@@ -11,6 +13,13 @@ SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 FPS = 60
 TIMESTEP = 0.01
+INTEGRATOR = 'leapfrog'
+SPEED_FACTOR = 1.03
+MIN_SPEED = 1 / FPS
+PHYSICS_BUDGET = 0.8
+RATE_INTERVAL = 1.0
+BACKGROUND_SIMULATION = True
+PROFILE_PATH = 'profile.json'
 
 
 class App:
@@ -18,12 +27,14 @@ class App:
     def __init__(self):
         self.view = View(SCREEN_WIDTH, SCREEN_HEIGHT)
         self.planets = []
-        self.universe = Universe(TIMESTEP, 1)
+        self.universe = Universe(TIMESTEP, 1, integrator=INTEGRATOR)
         self.fps = FPS
+        self.speed = 1.0
         self.clock = pygame.time.Clock()
         self.runSimulation = False
         self.selectedPlanet = None
-        self.initialUniverse = None
+        self.initialState = None
+        self.profiler = None
 
     def run(self):
         """Run the application"""
@@ -34,34 +45,118 @@ class App:
                 self.pause = False
                 self._playSimulation()
 
-            if self.initialUniverse:
-                self.universe = copy.copy(self.initialUniverse)
+            if self.initialState:
+                self.universe = Universe.fromCheckpoint(self.initialState)
 
     def _playSimulation(self):
         """Simulate the orbits and show them on the screen"""
         self.view.constructionMode = False
-        self.initialUniverse = copy.deepcopy(self.universe)
-
-        while self.view.running:
-            self.clock.tick(self.fps)
-            self.view.drawUniverse(self.universe)
-
-            if not self.pause:
-                self.universe.stepTime()
-
-            action = self.view.handleEvents(self.universe.planets)
-
-            if action:
-                if action.type == 'PAUSE':
-                    self.pause = not self.pause
-                if action.type == 'STOP':
-                    self.runSimulation = False
-                    return
-
-                if action.type == 'FPS_UP':
-                    self.fps += 1
-                if action.type == 'FPS_DOWN':
-                    self.fps -= 1
+        self.initialState = self.universe.checkpoint()
+        self._pendingSteps = 0.0
+        self._stepsDone = 0
+        self._rateSteps = 0
+        self._rateStart = time.perf_counter()
+
+        # Physics runs in its own thread, drawing from published snapshots
+        simulation = None
+        if BACKGROUND_SIMULATION:
+            simulation = SimulationThread(
+                self.universe, self.speed * self.fps, 1 / self.fps
+            )
+            simulation.start()
+
+        try:
+            while self.view.running:
+                self.clock.tick(self.fps)
+
+                if simulation:
+                    shown = simulation.latest()
+                    self._stepsDone = simulation.steps
+                else:
+                    shown = self.universe
+                    if not self.pause:
+                        self._stepFrame()
+
+                self.view.drawUniverse(shown)
+                self._reportRate()
+
+                action = self.view.handleEvents(shown)
+
+                if action:
+                    if action.type == 'PAUSE':
+                        self.pause = not self.pause
+                    if action.type == 'STOP':
+                        self.runSimulation = False
+                        return
+
+                    if action.type == 'SPEED_UP':
+                        self.speed *= SPEED_FACTOR
+                    if action.type == 'SPEED_DOWN':
+                        self.speed = max(
+                            self.speed / SPEED_FACTOR, MIN_SPEED
+                        )
+
+                    if action.type == 'TOGGLE_PROFILER':
+                        self._toggleProfiler()
+
+                if simulation:
+                    simulation.paused = self.pause
+                    simulation.rate = self.speed * self.fps
+        finally:
+            if simulation:
+                simulation.stop()
+            if self.profiler:
+                self._toggleProfiler()
+
+    def _stepFrame(self):
+        """Run the physics steps due in one rendered frame
+
+        The simulation advances 'speed' steps per frame, fractional speeds
+        accumulating over frames. Stepping stops once the physics budget of
+        the frame is spent, dropping the backlog, so a heavy simulation
+        slows down instead of freezing the window.
+        """
+        self._pendingSteps += self.speed
+        budget = PHYSICS_BUDGET / self.fps
+        start = time.perf_counter()
+
+        while self._pendingSteps >= 1:
+            self.universe.stepTime()
+            self._pendingSteps -= 1
+            self._stepsDone += 1
+
+            if time.perf_counter() - start > budget:
+                self._pendingSteps = min(self._pendingSteps, self.speed)
+                break
+
+    def _reportRate(self):
+        """Show the achieved steps per second on the window"""
+        elapsed = time.perf_counter() - self._rateStart
+        if elapsed < RATE_INTERVAL:
+            return
+
+        rate = (self._stepsDone - self._rateSteps) / elapsed
+        self.view.setStatus(
+            f'{rate:.0f} steps/s, {self.speed:.2f} steps/frame'
+        )
+        self._rateSteps = self._stepsDone
+        self._rateStart = time.perf_counter()
+
+        if self.profiler:
+            self.view.overlay = self.profiler.summary()
+
+    def _toggleProfiler(self):
+        """Start profiling, or stop and save the report to PROFILE_PATH"""
+        if self.profiler is None:
+            self.profiler = Profiler()
+            self.profiler.attach(self.universe, self.view)
+            self.view.overlay = ['Profiling...']
+            return
+
+        self.profiler.detach()
+        self.profiler.save(PROFILE_PATH)
+        self.profiler = None
+        self.view.overlay = None
 
     def _playUniverseContruction(self):
         """Show the universe construction screen"""
@@ -82,7 +177,7 @@ class App:
             self.clock.tick(self.fps)
             self.view.drawUniverse(self.universe)
 
-            action = self.view.handleEvents(self.universe.planets)
+            action = self.view.handleEvents(self.universe)
 
             if action:
                 if action.type == 'ADD_PLANET':
@@ -109,7 +204,6 @@ class App:
 
                     if abs(drag) > 1.2 * planets[self.selectedPlanet].radius:
                         planets[self.selectedPlanet].vel = 0.667 * Vec3(drag)
-                        self.universe.setPlanets(planets)
 
                         self.selectedPlanet = None
 
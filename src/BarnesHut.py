@@ -0,0 +1,192 @@
+import numpy as np
+
+
+MAX_DEPTH = 20
+LEAF_SIZE = 8
+CHUNK_SIZE = 2048
+
+
+def _spreadBits(x):
+    """Insert two zero bits between each of the lower 21 bits of x"""
+    x = x & np.uint64(0x1fffff)
+    x = (x | x << np.uint64(32)) & np.uint64(0x1f00000000ffff)
+    x = (x | x << np.uint64(16)) & np.uint64(0x1f0000ff0000ff)
+    x = (x | x << np.uint64(8)) & np.uint64(0x100f00f00f00f00f)
+    x = (x | x << np.uint64(4)) & np.uint64(0x10c30c30c30c30c3)
+    x = (x | x << np.uint64(2)) & np.uint64(0x1249249249249249)
+    return x
+
+
+def _ranges(starts, counts):
+    """Concatenation of the integer ranges [start, start + count)"""
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + np.arange(counts.sum()) - offsets
+
+
+class Octree:
+    """Barnes-Hut octree over a set of point masses
+
+    The tree is built level by level from the bodies' Morton codes, so each
+    node covers a contiguous range of the Morton-sorted bodies. Node data is
+    kept in flat arrays and the traversal is done for many targets at once.
+    """
+
+    def __init__(self, pos, mass, leafSize=LEAF_SIZE, maxDepth=MAX_DEPTH):
+        self.pos = pos
+        self.mass = mass
+
+        lo = pos.min(axis=0)
+        side = float((pos.max(axis=0) - lo).max()) * (1 + 1e-9) or 1.0
+        cells = ((pos - lo) / side * 2**maxDepth).astype(np.uint64)
+        cells = np.minimum(cells, np.uint64(2**maxDepth - 1))
+        codes = _spreadBits(cells[:, 0]) | _spreadBits(cells[:, 1]) << \
+            np.uint64(1) | _spreadBits(cells[:, 2]) << np.uint64(2)
+
+        self.order = np.argsort(codes, kind='stable')
+        self.rank = np.empty_like(self.order)
+        self.rank[self.order] = np.arange(len(pos))
+        codes = codes[self.order]
+        sortedMass = mass[self.order]
+        sortedMoment = sortedMass[:, np.newaxis] * pos[self.order]
+
+        starts, counts, levels, parents = [], [], [], []
+        nodeOfBody = np.zeros(len(pos), dtype=np.int64)
+        active = np.ones(len(pos), dtype=bool)
+        nodeMass, nodeMoment = [], []
+        numNodes = 0
+
+        for level in range(maxDepth + 1):
+            idx = np.flatnonzero(active)
+            if not idx.size:
+                break
+
+            keys = codes[idx] >> np.uint64(3 * (maxDepth - level))
+            isNew = np.empty(idx.size, dtype=bool)
+            isNew[0] = True
+            isNew[1:] = keys[1:] != keys[:-1]
+            firsts = np.flatnonzero(isNew)
+
+            groupOfBody = np.cumsum(isNew) - 1
+            levelCounts = np.diff(np.append(firsts, idx.size))
+            isLeaf = (levelCounts <= leafSize) | (level == maxDepth)
+
+            starts.append(idx[firsts])
+            counts.append(levelCounts)
+            levels.append(np.full(firsts.size, level))
+            parents.append(
+                nodeOfBody[idx[firsts]] if level else np.array([-1])
+            )
+            nodeMass.append(np.add.reduceat(sortedMass[idx], firsts))
+            nodeMoment.append(np.add.reduceat(sortedMoment[idx], firsts))
+
+            nodeOfBody[idx] = numNodes + groupOfBody
+            active[idx[isLeaf[groupOfBody]]] = False
+            numNodes += firsts.size
+
+        self.start = np.concatenate(starts)
+        self.count = np.concatenate(counts)
+        self.size = side / 2.0**np.concatenate(levels)
+        self.nodeMass = np.concatenate(nodeMass)
+        self.com = np.concatenate(nodeMoment) / self.nodeMass[:, np.newaxis]
+
+        # Children of a node are contiguous, since nodes follow Morton order
+        parents = np.concatenate(parents)
+        self.firstChild = np.zeros(numNodes, dtype=np.int64)
+        self.numChildren = np.zeros(numNodes, dtype=np.int64)
+        hasParent = np.flatnonzero(parents >= 0)
+        uniqueParents, first, numChildren = np.unique(
+            parents[hasParent], return_index=True, return_counts=True
+        )
+        self.firstChild[uniqueParents] = hasParent[first]
+        self.numChildren[uniqueParents] = numChildren
+
+    def field(self, gravConst, theta, targets=None, softening=0.0,
+              potential=None):
+        """Approximate gravitational field on the target bodies
+
+        targets is a slice or an index array, all bodies by default. A node
+        is used as a single point mass when its size seen from the target
+        is smaller than the opening angle theta. With theta = 0 every node
+        is opened and the result is the exact direct sum. If a potential
+        array is given, the potential on the targets is written to it too.
+        """
+        targets = np.arange(len(self.pos))[
+            slice(None) if targets is None else targets
+        ]
+
+        field = np.zeros((len(targets), 3))
+        if potential is not None:
+            potential[:] = 0.0
+        for chunk_start in range(0, len(targets), CHUNK_SIZE):
+            chunk = targets[chunk_start:chunk_start + CHUNK_SIZE]
+            chunkPotential = None if potential is None else \
+                potential[chunk_start:chunk_start + len(chunk)]
+            field[chunk_start:chunk_start + len(chunk)] = self._chunkField(
+                gravConst, theta, chunk, softening**2, chunkPotential
+            )
+
+        return field
+
+    def _chunkField(self, gravConst, theta, targets, softening2,
+                    potential=None):
+        """Walk the tree for a chunk of targets, all at once"""
+        field = np.zeros((len(targets), 3))
+        rows = np.arange(len(targets))
+        nodes = np.zeros(len(targets), dtype=np.int64)
+        sortedPos = self.pos[self.order]
+        sortedMass = self.mass[self.order]
+
+        while targets.size:
+            disp = self.com[nodes] - self.pos[targets]
+            dist2 = np.einsum('ij,ij->i', disp, disp)
+            rank = self.rank[targets]
+            nodeStart = self.start[nodes]
+            contains = (nodeStart <= rank) & \
+                (rank < nodeStart + self.count[nodes])
+            accept = ~contains & (self.size[nodes]**2 < theta**2 * dist2)
+            isLeaf = self.numChildren[nodes] == 0
+
+            self._accumulate(
+                field, rows[accept], disp[accept],
+                dist2[accept] + softening2, self.nodeMass[nodes[accept]],
+                gravConst, potential
+            )
+
+            # Leaves that can't be approximated are summed body by body
+            direct = ~accept & isLeaf
+            counts = self.count[nodes[direct]]
+            bodyRows = np.repeat(rows[direct], counts)
+            bodyTargets = np.repeat(targets[direct], counts)
+            bodies = _ranges(nodeStart[direct], counts)
+            notSelf = bodies != self.rank[bodyTargets]
+            bodyRows = bodyRows[notSelf]
+            bodies = bodies[notSelf]
+            bodyDisp = sortedPos[bodies] - self.pos[bodyTargets[notSelf]]
+
+            self._accumulate(
+                field, bodyRows, bodyDisp,
+                np.einsum('ij,ij->i', bodyDisp, bodyDisp) + softening2,
+                sortedMass[bodies], gravConst, potential
+            )
+
+            # Open the remaining nodes
+            opened = ~accept & ~isLeaf
+            numChildren = self.numChildren[nodes[opened]]
+            rows = np.repeat(rows[opened], numChildren)
+            targets = np.repeat(targets[opened], numChildren)
+            nodes = _ranges(self.firstChild[nodes[opened]], numChildren)
+
+        return field
+
+    @staticmethod
+    def _accumulate(field, rows, disp, dist2, mass, gravConst,
+                    potential=None):
+        """Add the field of point masses to the given rows of field"""
+        inverse = gravConst * mass / np.sqrt(dist2)
+        weight = inverse / dist2
+        for axis in range(3):
+            field[:, axis] += np.bincount(
+                rows, weights=weight * disp[:, axis], minlength=len(field)
+            )
+        if potential is not None:
+            potential -= np.bincount(rows, inverse, minlength=len(field))
@@ -0,0 +1,176 @@
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .BarnesHut import Octree
+from .kernels import directField
+
+
+# Shared memory blocks mapped in each worker process, and their names
+_shared = {'names': None, 'blocks': []}
+
+
+def _attach(names):
+    """Map the shared memory blocks in the worker, unless already mapped"""
+    if names == _shared['names']:
+        return
+
+    for block in _shared['blocks']:
+        block.close()
+    _shared['blocks'] = [shared_memory.SharedMemory(name) for name in names]
+    _shared['names'] = names
+
+
+def _asArrays(blocks, num):
+    """Mass, position, field and potential arrays backed by the blocks
+
+    The blocks may have room for more bodies, only the first num are used.
+    """
+    return (
+        np.ndarray((num,), buffer=blocks[0].buf),
+        np.ndarray((num, 3), buffer=blocks[1].buf),
+        np.ndarray((num, 3), buffer=blocks[2].buf),
+        np.ndarray((num,), buffer=blocks[3].buf),
+    )
+
+
+def _computeField(names, num, targets, gravConst, engine, theta, softening,
+                  withPotential=False):
+    """Worker task: write the field on the targets to shared memory"""
+    _attach(names)
+    mass, pos, field, potentials = _asArrays(_shared['blocks'], num)
+    potential = np.empty(len(field[targets])) if withPotential else None
+
+    if engine == 'barneshut':
+        field[targets] = Octree(pos, mass).field(
+            gravConst, theta, targets, softening, potential
+        )
+    else:
+        field[targets] = directField(
+            pos, mass, gravConst, targets, softening, potential
+        )
+
+    if withPotential:
+        potentials[targets] = potential
+
+
+def _freeBlocks(blocks):
+    """Unlink and close shared memory blocks"""
+    for block in blocks:
+        block.unlink()
+        try:
+            block.close()
+        except BufferError:
+            # Arrays still view the block; it is unmapped once they are gone
+            pass
+
+
+def _release(pool, blocks):
+    """Shut the worker pool down and free the shared memory"""
+    pool.shutdown()
+    _freeBlocks(blocks)
+
+
+class ParallelSolver:
+    """Splits the field computation across a pool of worker processes
+
+    Masses, positions and the resulting fields live in shared memory blocks,
+    so each step only copies the current state into them and sends the
+    workers the range of targets they are responsible for. The blocks are
+    replaced by larger ones when the bodies outgrow them, and the workers
+    map the new ones on their next task, so the pool is started only once.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._pool = None
+        self._blocks = []
+        self._capacity = 0
+        self._finalizer = None
+
+    def __getstate__(self):
+        # Pools and shared memory can't be copied, a copy makes its own
+        return {'workers': self.workers}
+
+    def __setstate__(self, state):
+        self.__init__(state['workers'])
+
+    def field(self, pos, mass, gravConst, engine='numpy', theta=0.5,
+              softening=0.0, targets=None, potential=None):
+        """Gravitational field on the target bodies, computed by the workers
+
+        targets is a slice or an index array, all bodies by default. Each
+        worker gets a contiguous share of them. If a potential array is
+        given, the potential on the targets is written to it too.
+        """
+        num = len(pos)
+        if self._pool is None or num > self._capacity:
+            self._allocate(num)
+
+        shared = _asArrays(self._blocks, num)
+        shared[0][:] = mass
+        shared[1][:] = pos
+
+        if targets is None:
+            bounds = np.linspace(0, num, self.workers + 1).astype(int)
+            shares = [
+                slice(start, stop)
+                for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start
+            ]
+            targets = np.arange(num)
+        else:
+            targets = np.arange(num)[targets]
+            shares = [
+                share for share in np.array_split(targets, self.workers)
+                if share.size
+            ]
+
+        names = [block.name for block in self._blocks]
+        futures = [
+            self._pool.submit(
+                _computeField, names, num, share, gravConst, engine, theta,
+                softening, potential is not None
+            )
+            for share in shares
+        ]
+        for future in futures:
+            future.result()
+
+        # Indexing with an array copies: the blocks are reused by the next
+        # evaluation, so nothing returned may view them
+        if potential is not None:
+            potential[:] = shared[3][targets]
+        return shared[2][targets]
+
+    def close(self):
+        """Stop the worker processes and free the shared memory"""
+        if self._finalizer is not None:
+            self._finalizer()
+        self._pool = None
+        self._blocks = []
+        self._capacity = 0
+        self._finalizer = None
+
+    def _allocate(self, num):
+        """Create shared memory blocks with room for num bodies
+
+        The pool is started the first time, later the previous blocks are
+        freed, the workers still mapping them until their next task.
+        """
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+            self._finalizer = weakref.finalize(
+                self, _release, self._pool, self._blocks
+            )
+        else:
+            _freeBlocks(self._blocks)
+
+        # The finalizer frees whatever blocks the list holds by then
+        self._capacity = max(num, 2 * self._capacity)
+        self._blocks[:] = [
+            shared_memory.SharedMemory(create=True, size=max(size, 1) * 8)
+            for size in (self._capacity, 3 * self._capacity,
+                         3 * self._capacity, self._capacity)
+        ]
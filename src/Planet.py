@@ -1,29 +1,108 @@
+import numpy as np
+
 from .vecN import Vec3
-from .utils import assertType
+from .Trajectory import Trajectory, TRAJECTORY_CAPACITY
+from .utils import assertType, assertReal
 
 
 class Planet:
-    """Represents a planet"""
+    """Represents a planet
+
+    Position, velocity, mass and radius are kept in small float64 arrays.
+    Once the planet is added to a Universe these arrays are swapped for views
+    into the universe's contiguous storage, so the planet acts as a thin view
+    over it.
+    """
 
-    def __init__(self, mass, pos, vel, color=(0, 0, 0), radius=2):
-        assertType('mass', mass, [float, int])
-        assertType('position', pos, Vec3)
-        assertType('velocity', vel, Vec3)
+    def __init__(self, mass, pos, vel, color=(0, 0, 0), radius=2,
+                 trajectoryCapacity=TRAJECTORY_CAPACITY, trajectoryStride=1,
+                 validate=True):
+        if validate:
+            assertReal('mass', mass)
+            assertType('position', pos, Vec3)
+            assertType('velocity', vel, Vec3)
 
-        self.mass = float(mass)
-        self.pos = pos
-        self.vel = vel
-        self.trajectory = []
+        self._mass = np.array([mass], dtype=float)
+        self._pos = np.array([pos.x, pos.y, pos.z], dtype=float)
+        self._vel = np.array([vel.x, vel.y, vel.z], dtype=float)
+        self.trajectory = Trajectory(trajectoryCapacity, trajectoryStride)
+        self._radius = np.array([radius], dtype=float)
         self.color = color
-        self.radius = radius
+
+    @classmethod
+    def fromViews(cls, mass, pos, vel, radius, color=(0, 0, 0),
+                  trajectory=None):
+        """Create a planet over storage already holding its state
+
+        Nothing is validated or copied, which makes it the fast way to
+        create many planets over a universe's arrays.
+        """
+        planet = cls.__new__(cls)
+        planet._mass = mass
+        planet._pos = pos
+        planet._vel = vel
+        planet._radius = radius
+        planet.color = color
+        planet.trajectory = trajectory if trajectory is not None \
+            else Trajectory()
+
+        return planet
 
     def __str__(self):
         return f'Planet at ({self.pos.x}, {self.pos.y}, {self.pos.z})'
 
     __repr__ = __str__
 
+    @property
+    def mass(self):
+        return float(self._mass[0])
+
+    @mass.setter
+    def mass(self, mass):
+        self._mass[0] = mass
+
+    @property
+    def radius(self):
+        return float(self._radius[0])
+
+    @radius.setter
+    def radius(self, radius):
+        self._radius[0] = radius
+
+    @property
+    def pos(self):
+        return Vec3(*self._pos.tolist())
+
+    @pos.setter
+    def pos(self, pos):
+        self._pos[:] = (pos.x, pos.y, pos.z)
+
+    @property
+    def vel(self):
+        return Vec3(*self._vel.tolist())
+
+    @vel.setter
+    def vel(self, vel):
+        self._vel[:] = (vel.x, vel.y, vel.z)
+
+    def bind(self, mass, pos, vel, radius, copy=True):
+        """Make the planet a view over external storage, copying its state
+
+        With copy=False the storage must already hold the planet's state.
+        """
+        if copy:
+            mass[0] = self._mass[0]
+            pos[:] = self._pos
+            vel[:] = self._vel
+            radius[0] = self._radius[0]
+
+        self._mass = mass
+        self._pos = pos
+        self._vel = vel
+        self._radius = radius
+
     def update(self, field, dt):
         """Update properties one time step following gravitational field"""
-        self.trajectory.append(self.pos)
+        self.trajectory.append(self._pos)
         self.pos += self.vel * dt
         self.vel += field * dt
@@ -0,0 +1,150 @@
+import copy
+import threading
+import time
+
+import numpy as np
+
+
+MAX_BACKLOG = 0.25
+IDLE_SLEEP = 0.005
+
+
+class UniverseSnapshot:
+    """Copy of the drawable state of a universe, with planets as views
+
+    It has the planets, arrays and time a View needs to draw it. Updating it
+    copies the universe's arrays into its own and only the trajectory
+    points recorded since the last update.
+    """
+
+    def __init__(self):
+        self.planets = []
+        self.time = 0.0
+        self._sources = []
+        self._mass = np.empty(0)
+        self._pos = np.empty((0, 3))
+        self._vel = np.empty((0, 3))
+        self._radius = np.empty(0)
+        self._centerOfMass = np.zeros(3)
+
+    @property
+    def masses(self):
+        return self._mass
+
+    @property
+    def positions(self):
+        return self._pos
+
+    @property
+    def velocities(self):
+        return self._vel
+
+    @property
+    def radii(self):
+        return self._radius
+
+    def centerOfMass(self):
+        return self._centerOfMass
+
+    def update(self, universe):
+        """Copy the current state of the universe"""
+        if [id(p) for p in universe.planets] != self._sources:
+            self._rebuild(universe)
+
+        np.copyto(self._mass, universe.masses)
+        np.copyto(self._pos, universe.positions)
+        np.copyto(self._vel, universe.velocities)
+        np.copyto(self._radius, universe.radii)
+        for planet, source in zip(self.planets, universe.planets):
+            planet.trajectory.copyFrom(source.trajectory)
+        self._centerOfMass = universe.centerOfMass().copy()
+        self.time = universe.time
+
+    def _rebuild(self, universe):
+        """Create copies of the universe's planets viewing our arrays"""
+        self.planets = [copy.deepcopy(p) for p in universe.planets]
+        self._sources = [id(p) for p in universe.planets]
+
+        n = len(self.planets)
+        self._mass = np.empty(n)
+        self._pos = np.empty((n, 3))
+        self._vel = np.empty((n, 3))
+        self._radius = np.empty(n)
+        for i, planet in enumerate(self.planets):
+            planet.bind(
+                self._mass[i:i + 1], self._pos[i], self._vel[i],
+                self._radius[i:i + 1]
+            )
+
+
+class SimulationThread(threading.Thread):
+    """Steps a universe in the background, publishing drawable snapshots
+
+    Snapshots are triple buffered: the thread fills a back buffer and swaps
+    it with the ready one, while the reader swaps the ready one with the
+    front buffer it draws. Neither side ever waits on the other's work.
+    The universe must not be touched by other threads while this one runs.
+    """
+
+    def __init__(self, universe, rate, publishInterval):
+        super().__init__(daemon=True)
+        self.universe = universe
+        self.rate = rate
+        self.publishInterval = publishInterval
+        self.paused = False
+        self.steps = 0
+
+        self._back, self._ready, self._front = [
+            UniverseSnapshot() for _ in range(3)
+        ]
+        self._fresh = False
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._publish()
+
+    def run(self):
+        """Step the universe at 'rate' steps per second until stopped"""
+        pending = 0.0
+        last = lastPublish = time.perf_counter()
+
+        while not self._stopped.is_set():
+            now = time.perf_counter()
+            if not self.paused:
+                # Drop the backlog when stepping can't keep up with the rate
+                pending += (now - last) * self.rate
+                pending = min(pending, max(1.0, MAX_BACKLOG * self.rate))
+            last = now
+
+            if pending >= 1 and not self.paused:
+                self.universe.stepTime()
+                self.steps += 1
+                pending -= 1
+            else:
+                time.sleep(IDLE_SLEEP)
+
+            if now - lastPublish >= self.publishInterval:
+                self._publish()
+                lastPublish = now
+
+    def stop(self):
+        """Stop stepping and wait for the thread to finish"""
+        self._stopped.set()
+        if self.is_alive():
+            self.join()
+
+    def latest(self):
+        """The most recently published snapshot of the universe"""
+        with self._lock:
+            if self._fresh:
+                self._front, self._ready = self._ready, self._front
+                self._fresh = False
+
+            return self._front
+
+    def _publish(self):
+        """Snapshot the universe and make it the ready buffer"""
+        self._back.update(self.universe)
+
+        with self._lock:
+            self._back, self._ready = self._ready, self._back
+            self._fresh = True
@@ -0,0 +1,51 @@
+import itertools
+
+import numpy as np
+
+
+# Weights of the cell coordinates in the key, as in collisions.py
+KEY_WEIGHTS = np.array([2**32, 1], dtype=np.int64)
+NEIGHBOR_KEYS = np.array(
+    list(itertools.product((-1, 0, 1), repeat=2)), dtype=np.int64
+) @ KEY_WEIGHTS
+
+
+class SpatialIndex:
+    """Uniform grid over the planets' positions on the xy plane
+
+    Used to find the planet under a point, like a mouse click. The cells
+    are as wide as the largest reach, so a point can only hit the planets
+    in its own cell and the eight around it. The cells are found by binary
+    search over the planets' sorted cell keys.
+    """
+
+    def __init__(self, pos, radii, tolerance=1.1):
+        self.pos = np.array(pos[:, :2])
+        self.reach = tolerance * np.asarray(radii, dtype=float)
+        self.cellSize = float(self.reach.max(initial=0)) or 1.0
+
+        keys = self._cells(self.pos) @ KEY_WEIGHTS
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+
+    def __len__(self):
+        return len(self.pos)
+
+    def find(self, point):
+        """Index of the first planet reaching point, or None"""
+        point = np.array([point[0], point[1]], dtype=float)
+        keys = self._cells(point) @ KEY_WEIGHTS + NEIGHBOR_KEYS
+        starts = np.searchsorted(self.keys, keys, 'left')
+        stops = np.searchsorted(self.keys, keys, 'right')
+
+        candidates = np.concatenate([
+            self.order[start:stop] for start, stop in zip(starts, stops)
+        ])
+        dist = np.linalg.norm(self.pos[candidates] - point, axis=1)
+        hits = candidates[dist < self.reach[candidates]]
+
+        return int(hits.min()) if hits.size else None
+
+    def _cells(self, points):
+        """Integer grid cells of the points"""
+        return np.floor(points / self.cellSize).astype(np.int64)
@@ -0,0 +1,168 @@
+import itertools
+
+import numpy as np
+
+from .vecN import Vec3
+
+
+TRAJECTORY_CAPACITY = 2000
+
+_identities = itertools.count()
+
+
+class Trajectory:
+    """Fixed size ring buffer with the latest positions of a planet
+
+    Only one of every 'stride' appended points is stored, and once
+    'capacity' points are stored the oldest ones get overwritten, so the
+    memory used doesn't grow with the length of the simulation.
+
+    Copies made with copyFrom or deepcopy keep the identity of the
+    trajectory they copy, which is how a View follows a trajectory across
+    the snapshots of a SimulationThread.
+    """
+
+    def __init__(self, capacity=TRAJECTORY_CAPACITY, stride=1):
+        if capacity < 0 or stride < 1:
+            raise ValueError('capacity must be >= 0 and stride >= 1')
+
+        self.capacity = capacity
+        self.stride = stride
+        self._points = np.empty((capacity, 3))
+        self._head = 0
+        self._count = 0
+        self._calls = 0
+        self._written = 0
+        self._epoch = 0
+        self.identity = next(_identities)
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for point in self.points().tolist():
+            yield Vec3(*point)
+
+    def append(self, point):
+        """Record a position, if it falls on the decimation stride"""
+        self._calls += 1
+        if not self.capacity or (self._calls - 1) % self.stride:
+            return
+
+        self._points[self._head] = point
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        self._written += 1
+
+    def extend(self, points):
+        """Record an (n, 3) array of positions, like appending each of them
+
+        The points on the stride are copied in bulk, and only the last
+        'capacity' of them when there are more.
+        """
+        points = np.asarray(points, dtype=float)
+        first = -self._calls % self.stride
+        self._calls += len(points)
+        if not self.capacity:
+            return
+
+        points = points[first::self.stride]
+        kept = points[max(len(points) - self.capacity, 0):]
+        # Written in at most two slices, the second one wrapping around
+        start = (self._head + len(points) - len(kept)) % self.capacity
+        split = min(len(kept), self.capacity - start)
+        self._points[start:start + split] = kept[:split]
+        self._points[:len(kept) - split] = kept[split:]
+        self._head = (self._head + len(points)) % self.capacity
+        self._count = min(self._count + len(points), self.capacity)
+        self._written += len(points)
+
+    def clear(self):
+        """Forget all the recorded positions"""
+        self._head = self._count = self._calls = self._written = 0
+        self._epoch += 1
+
+    def setPoints(self, points):
+        """Replace the stored positions, oldest first, keeping the latest"""
+        points = points[len(points) - min(len(points), self.capacity):]
+        self.clear()
+        self._points[:len(points)] = points
+        self._count = self._written = self._calls = len(points)
+        self._head = len(points) % self.capacity if self.capacity else 0
+
+    def getState(self):
+        """Stored positions, oldest first, and the capacity, stride and
+        number of appended points, to save the trajectory
+        """
+        return self.points(), np.array(
+            [self.capacity, self.stride, self._calls]
+        )
+
+    def setState(self, points, ring):
+        """Restore a state returned by getState"""
+        capacity, self.stride, calls = [int(value) for value in ring]
+        if capacity != self.capacity:
+            self.capacity = capacity
+            self._points = np.empty((capacity, 3))
+        self.setPoints(points)
+        self._calls = calls
+
+    def copyFrom(self, other):
+        """Make this trajectory a copy of other
+
+        When this is an earlier copy of other, only the points recorded
+        since then are copied.
+        """
+        new = other._written - self._written
+        if self.capacity != other.capacity or self._epoch != other._epoch \
+                or not 0 <= new < self.capacity:
+            self.capacity = other.capacity
+            self._points = other._points.copy()
+        else:
+            changed = (self._head + np.arange(new)) % self.capacity
+            self._points[changed] = other._points[changed]
+
+        self.stride = other.stride
+        self._head = other._head
+        self._count = other._count
+        self._calls = other._calls
+        self._written = other._written
+        self._epoch = other._epoch
+        self.identity = other.identity
+
+    def marker(self):
+        """Where the recording is at, to later get the points added since"""
+        return self._epoch, self._written
+
+    def dropped(self):
+        """Number of points overwritten since the trajectory was cleared"""
+        return self._written - self._count
+
+    def pointsSince(self, marker):
+        """Points stored after a marker, preceded by the one before them
+
+        Only the new points are read, so it costs nothing to call with a
+        long trajectory. Returns None when the trajectory was cleared or
+        replaced since the marker, or the points before them are gone.
+        """
+        epoch, written = marker
+        new = self._written - written
+        if epoch != self._epoch or new < 0 or new > self._count or \
+                (new == self._count and written):
+            return None
+        if new == 0:
+            return self._points[:0]
+
+        stored = min(new + 1, self._count)
+        return self._points[
+            (self._head - stored + np.arange(stored)) % self.capacity
+        ]
+
+    def points(self):
+        """Array with the stored positions, from the oldest to the newest"""
+        if self._count < self.capacity:
+            return self._points[:self._count]
+
+        return np.concatenate(
+            (self._points[self._head:], self._points[:self._head])
+        )
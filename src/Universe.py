@@ -1,54 +1,722 @@
+import math
+
+import numpy as np
+
 from .vecN import Vec3
 from .Planet import Planet
-from .utils import assertType
+from .Trajectory import Trajectory
+from .kernels import directField
+from .BarnesHut import Octree
+from .ParallelSolver import ParallelSolver
+from .integrators import INTEGRATORS
+from .collisions import findCollisions, mergeGroups, bounce
+from .SpatialIndex import SpatialIndex
+from .utils import assertType, assertReal, assertInteger, assertArray
+
+
+ENGINES = ('python', 'numpy', 'barneshut')
+COLLISIONS = ('none', 'merge', 'bounce')
+CHECKPOINT_VERSION = 2
 
 
 class Universe:
-    """Represents the universe, its state and physics"""
+    """Represents the universe, its state and physics
+
+    Masses, positions, velocities and radii of all planets live in contiguous
+    NumPy arrays; the Planet objects are views over rows of these arrays.
+
+    The engine selects how the gravitational fields are computed: 'python'
+    loops over the planets, 'numpy' does the direct sum in batched array
+    operations and 'barneshut' uses an octree with opening angle theta.
+    With more than one worker the array engines split the planets among a
+    pool of processes.
+
+    The integrator advances the planets with the computed fields: 'euler'
+    (first order), 'leapfrog' (second order symplectic), 'yoshida4' (fourth
+    order symplectic) or 'rk4'.
+
+    A Plummer softening length smooths the field out at short distances, so
+    close encounters don't blow up. With adaptive stepping each planet gets
+    its own step of dt / 2^k, up to k = maxLevel, from the acceleration
+    criterion sqrt(2 * eta * softening / |a|), and the planets are advanced
+    in hierarchical blocks with leapfrog: only the planets on the finer
+    levels get their fields recomputed in between.
+
+    Planets whose spheres overlap after a step can be merged into one,
+    keeping the total mass and momentum, or bounced off each other
+    elastically. Otherwise they pass through each other.
+    """
 
-    def __init__(self, dt, gravConst=6.67408e-11):
-        assertType('time step', dt, [int, float])
-        assertType('gravitational constant', gravConst, [int, float])
+    def __init__(self, dt, gravConst=6.67408e-11, engine='numpy',
+                 theta=0.5, workers=1, integrator='euler', softening=0.0,
+                 adaptive=False, eta=0.02, maxLevel=8, collisions='none'):
+        assertReal('time step', dt)
+        assertReal('gravitational constant', gravConst)
+        assertType('engine', engine, str)
+        assertReal('opening angle', theta)
+        assertInteger('workers', workers)
+        assertType('integrator', integrator, str)
+        assertReal('softening', softening)
+        assertType('adaptive', adaptive, bool)
+        assertReal('eta', eta)
+        assertInteger('maxLevel', maxLevel)
+        assertType('collisions', collisions, str)
+
+        if engine not in ENGINES:
+            raise ValueError(f'engine must be one of {ENGINES}')
+        if integrator not in INTEGRATORS:
+            raise ValueError(f'integrator must be one of {tuple(INTEGRATORS)}')
+        if collisions not in COLLISIONS:
+            raise ValueError(f'collisions must be one of {COLLISIONS}')
+        if engine == 'python' and \
+                (workers > 1 or integrator != 'euler' or adaptive):
+            raise ValueError(
+                "the 'python' engine only supports one worker and 'euler'"
+            )
+        if adaptive and (integrator != 'leapfrog' or softening <= 0):
+            raise ValueError(
+                "adaptive steps need the 'leapfrog' integrator and softening"
+            )
 
         self.dt = float(dt)
         self.gravConst = float(gravConst)
+        self.engine = engine
+        self.theta = float(theta)
+        self.integrator = integrator
+        self.softening = float(softening)
+        self.adaptive = adaptive
+        self.eta = float(eta)
+        self.maxLevel = int(maxLevel)
+        self.collisions = collisions
+        self.numCollisions = 0
+        self.timestepLevels = np.zeros(0, dtype=int)
+        self.time = 0.0
+        self._cachedField = None
+        self._centerOfMass = None
+        self._pickIndex = None
+        self._outputs = []
+        self._solver = ParallelSolver(int(workers)) if workers > 1 else None
         self._planets = []
+        self._bindPlanets()
+
+    def __setstate__(self, state):
+        # Copies of the planets no longer view our arrays, so rebuild them
+        self.__dict__.update(state)
+        self._bindPlanets()
 
     @property
     def planets(self):
         return self._planets
 
-    def setPlanets(self, planets):
-        """Set the list of planets existing in the universe"""
+    @property
+    def masses(self):
+        return self._mass
+
+    @property
+    def positions(self):
+        return self._pos
+
+    @property
+    def velocities(self):
+        return self._vel
+
+    @property
+    def radii(self):
+        return self._radius
+
+    def setPlanets(self, planets, validate=True):
+        """Set the list of planets existing in the universe
+
+        With validate, every element is checked to be a Planet and, once
+        gathered in the arrays, all their values to be finite.
+        """
         assertType('planets', planets, list)
-        assertType('planets element', planets[0], Planet)
+        if validate:
+            for planet in planets:
+                assertType('planets element', planet, Planet)
+
         self._planets = sorted(planets, key=lambda p: p.pos.z)
+        self._bindPlanets()
+
+        if validate:
+            self._validateArrays()
+
+    def setArrays(self, masses, positions, velocities, radii=2,
+                  colors=(255, 255, 255), trajectoryCapacity=0,
+                  validate=True):
+        """Set the planets from arrays, without building them one by one
+
+        masses has shape (N,) and positions and velocities (N, 3). radii is
+        one radius or one per planet and colors one color, as a tuple or a
+        string, or a sequence with one per planet. The planets are created
+        right over the universe's arrays, sorted by z like setPlanets does,
+        and don't record trajectories unless a trajectoryCapacity is given.
+
+        With validate the shapes are checked and the values must be finite,
+        one check per array. Without it the arrays are only converted.
+        """
+        if validate:
+            masses = assertArray('masses', masses, (None,))
+            n = len(masses)
+            positions = assertArray('positions', positions, (n, 3))
+            velocities = assertArray('velocities', velocities, (n, 3))
+            radii = assertArray('radii', np.broadcast_to(radii, (n,)), (n,))
+        else:
+            masses = np.asarray(masses, dtype=float)
+            n = len(masses)
+            positions = np.asarray(positions, dtype=float)
+            velocities = np.asarray(velocities, dtype=float)
+            radii = np.broadcast_to(np.asarray(radii, dtype=float), (n,))
+
+        # Fancy indexing copies, so the inputs are never viewed
+        order = np.argsort(positions[:, 2], kind='stable')
+        self._storage = mass, pos, vel, radius = (
+            masses[order], positions[order], velocities[order], radii[order]
+        )
+
+        if isinstance(colors, (tuple, str)):
+            colors = [colors] * n
+        else:
+            colors = [
+                tuple(color) if isinstance(color, list) else color
+                for color in np.asarray(colors)[order].tolist()
+            ]
+
+        # Iterating over the arrays yields the row views
+        self._planets = [
+            Planet.fromViews(*views, Trajectory(trajectoryCapacity))
+            for views in zip(
+                mass[:, np.newaxis], pos, vel, radius[:, np.newaxis], colors
+            )
+        ]
+        self._viewStorage(n, n)
 
     def addPlanet(self, planet):
-        """Add a planet to the universe"""
+        """Add a planet to the universe, keeping the planets sorted by z
+
+        The planet is inserted with a binary search and the arrays have
+        spare rows, so only the rows after it are shifted and rebound. If
+        the planets moved out of order since they were sorted, they are
+        sorted again.
+        """
         assertType('planet', planet, Planet)
-        self._planets.append(planet)
-        self._planets = sorted(self._planets, key=lambda p: p.pos.z)
+        n = len(self._planets)
+        z = self._pos[:, 2]
+        if np.any(z[1:] < z[:-1]) or n == len(self._storage[0]):
+            self._planets = sorted(
+                self._planets + [planet], key=lambda p: p.pos.z
+            )
+            self._bindPlanets(2 * n + 1)
+            return
+
+        idx = int(np.searchsorted(z, planet.pos.z, side='right'))
+        for array in self._storage:
+            array[idx + 1:n + 1] = array[idx:n]
+        self._planets.insert(idx, planet)
+        mass, pos, vel, radius = self._storage
+        planet.bind(
+            mass[idx:idx + 1], pos[idx], vel[idx], radius[idx:idx + 1]
+        )
+        self._viewStorage(n + 1, idx + 1)
 
     def removePlanet(self, planet_idx):
         """Remove a planet from the universe"""
         if planet_idx >= len(self._planets):
             return
 
-        self._planets = self._planets[:planet_idx] + \
-            self._planets[planet_idx + 1:]
+        # The planet gets its own copy of its state back
+        planet = self._planets.pop(planet_idx)
+        planet.bind(np.empty(1), np.empty(3), np.empty(3), np.empty(1))
+
+        n = len(self._planets)
+        for array in self._storage:
+            array[planet_idx:n] = array[planet_idx + 1:n + 1]
+        self._viewStorage(n, planet_idx)
+
+    def planetAt(self, point):
+        """Index of the first planet whose disk on the xy plane holds point
+
+        A planet is hit within 1.1 times its radius. Returns None if there
+        is none. The lookup goes through a spatial index, rebuilt only when
+        the positions or the radii change.
+        """
+        if self._pickIndex is not None:
+            pos, radii, index = self._pickIndex
+            if np.array_equal(pos, self._pos) and \
+                    np.array_equal(radii, self._radius):
+                return index.find(point)
+
+        index = SpatialIndex(self._pos, self._radius)
+        self._pickIndex = (self._pos.copy(), self._radius.copy(), index)
+
+        return index.find(point)
+
+    def checkpoint(self, trajectories=True):
+        """Copy of the whole state of the universe as a dict of arrays
+
+        Holds the settings, the simulated time and number of collisions,
+        the planets' masses, positions, velocities, colors and radii, and
+        unless trajectories is False their trajectories. Only the points a
+        trajectory holds are stored, oldest first, all of them in one array
+        that 'trajectoryOffsets' splits into the planets'.
+        """
+        state = {
+            'version': CHECKPOINT_VERSION,
+            'dt': self.dt,
+            'gravConst': self.gravConst,
+            'engine': self.engine,
+            'theta': self.theta,
+            'workers': self._solver.workers if self._solver else 1,
+            'integrator': self.integrator,
+            'softening': self.softening,
+            'adaptive': self.adaptive,
+            'eta': self.eta,
+            'maxLevel': self.maxLevel,
+            'collisions': self.collisions,
+            'time': self.time,
+            'numCollisions': self.numCollisions,
+            'masses': self._mass.copy(),
+            'positions': self._pos.copy(),
+            'velocities': self._vel.copy(),
+            'colors': self._colorsArray(),
+            'radii': self._radius.copy(),
+        }
+        if not trajectories:
+            return state
+
+        saved = [p.trajectory.getState() for p in self._planets]
+        state['trajectoryPoints'] = np.concatenate(
+            [points for points, _ in saved] + [np.empty((0, 3))]
+        )
+        state['trajectoryOffsets'] = np.cumsum(
+            [0] + [len(points) for points, _ in saved], dtype=np.int64
+        )
+        state['trajectoryRings'] = np.array(
+            [ring for _, ring in saved], dtype=np.int64
+        ).reshape(-1, 3)
+
+        return state
+
+    @classmethod
+    def fromCheckpoint(cls, state, **settings):
+        """Create a universe from a state returned by checkpoint
+
+        The planets keep the order they had, so the restored universe steps
+        exactly like the original would. The trajectories are optional.
+        Keyword arguments of Universe, like engine or integrator, replace
+        the saved settings.
+        """
+        if int(state['version']) not in (1, CHECKPOINT_VERSION):
+            raise ValueError('unsupported checkpoint version')
+
+        saved = {
+            'engine': str(state['engine']),
+            'theta': float(state['theta']),
+            'workers': int(state['workers']),
+            'integrator': str(state['integrator']),
+            'softening': float(state['softening']),
+            'adaptive': bool(state['adaptive']),
+            'eta': float(state['eta']),
+            'maxLevel': int(state['maxLevel']),
+            'collisions': str(state['collisions'])
+            if 'collisions' in state else 'none',
+        }
+        saved.update(settings)
+        universe = cls(float(state['dt']), float(state['gravConst']), **saved)
+        universe.time = float(state['time'])
+        if 'numCollisions' in state:
+            universe.numCollisions = int(state['numCollisions'])
+
+        colors = [
+            tuple(int(c) for c in color.split(',')) if ',' in color else color
+            for color in state['colors'].tolist()
+        ]
+
+        # Whole arrays are read once and the planets created over them
+        n = len(state['masses'])
+        universe._storage = mass, pos, vel, radius = (
+            np.array(state['masses'], dtype=float).reshape(n),
+            np.array(state['positions'], dtype=float).reshape(n, 3),
+            np.array(state['velocities'], dtype=float).reshape(n, 3),
+            np.array(state['radii'], dtype=float).reshape(n)
+        )
+
+        trajectories = cls._trajectoriesFromState(state, n)
+
+        universe._planets = [
+            Planet.fromViews(*views)
+            for views in zip(
+                mass[:, np.newaxis], pos, vel, radius[:, np.newaxis], colors,
+                trajectories
+            )
+        ]
+        universe._viewStorage(n, n)
+        universe._validateArrays()
+
+        return universe
+
+    @staticmethod
+    def _trajectoriesFromState(state, n):
+        """The n trajectories saved in a checkpoint, or empty ones
+
+        Version 1 checkpoints hold every ring buffer whole, with the head,
+        count, calls and written counters of each.
+        """
+        if 'trajectoryPoints' not in state:
+            return [Trajectory() for _ in range(n)]
+
+        points, rings = state['trajectoryPoints'], state['trajectoryRings']
+        if int(state['version']) == 1:
+            stored = []
+            for buffer, (capacity, _, head, count, _, _) in zip(points,
+                                                                 rings):
+                order = (head - count + np.arange(count)) % max(capacity, 1)
+                stored.append(buffer[order])
+            rings = rings[:, [0, 1, 4]]
+        else:
+            stored = np.split(points, state['trajectoryOffsets'][1:-1])
+
+        trajectories = []
+        for planetPoints, ring in zip(stored, rings):
+            trajectory = Trajectory(0)
+            trajectory.setState(planetPoints, ring)
+            trajectories.append(trajectory)
+
+        return trajectories
+
+    def saveCheckpoint(self, path, compress=False):
+        """Save the state of the universe to a .npz file"""
+        save = np.savez_compressed if compress else np.savez
+        save(path, **self.checkpoint())
+
+    @classmethod
+    def loadCheckpoint(cls, path, **settings):
+        """Create a universe from a file written by saveCheckpoint
+
+        Keyword arguments replace the saved settings, like fromCheckpoint.
+        """
+        # Each access to a key of an NpzFile reads the array again
+        with np.load(path) as file:
+            state = dict(file)
+
+        return cls.fromCheckpoint(state, **settings)
+
+    def addOutput(self, output):
+        """Feed an output stage, like a TrajectoryWriter, after every step
+
+        The output's record method is called with the universe right away,
+        for the initial state, and then after each step.
+        """
+        self._outputs.append(output)
+        output.record(self)
+
+    def removeOutput(self, output):
+        """Stop feeding an output stage"""
+        self._outputs.remove(output)
 
     def stepTime(self):
         """Steps the simlation one time step"""
-        gravFields = [
-            self._fieldOnPlanet(i, p) for i, p in enumerate(self._planets)
-        ]
+        self.time += self.dt
 
-        for idx_planet, planet in enumerate(self._planets):
-            planet.update(gravFields[idx_planet], self.dt)
+        if self.engine != 'python':
+            self._stepTimeArrays()
+        else:
+            # The field of the last step's end, with the potential of the
+            # outputs, is cached and stepped from without another pass
+            gravFields = self._field().tolist()
+
+            for idx_planet, planet in enumerate(self._planets):
+                planet.update(Vec3(*gravFields[idx_planet]), self.dt)
+
+        if self.collisions != 'none':
+            self._handleCollisions()
+
+        for output in self._outputs:
+            output.record(self)
+
+    def _stepTimeArrays(self):
+        """Steps the simulation on the arrays with the chosen integrator"""
+        self._appendTrajectories()
+
+        if self.adaptive:
+            self._stepTimeBlocks()
+            return
+
+        integrate = INTEGRATORS[self.integrator]
+        integrate(self._pos, self._vel, self.dt, self._field)
+
+    def _appendTrajectories(self):
+        """Record the current position of each planet in its trajectory"""
+        for planet, pos in zip(self._planets, self._pos):
+            planet.trajectory.append(pos)
+
+    def _handleCollisions(self):
+        """Merge or bounce the planets that overlap"""
+        first, second = findCollisions(self._pos, self._radius)
+        if not len(first):
+            return
+
+        self.numCollisions += len(first)
+        if self.collisions == 'bounce':
+            bounce(self._pos, self._vel, self._mass, first, second)
+        else:
+            self._merge(mergeGroups(len(self._planets), first, second))
+
+    def _merge(self, labels):
+        """Merge each group of planets sharing a label into its heaviest
+
+        The merged planet keeps the color and trajectory of the heaviest one,
+        the total mass and momentum, the center of mass as position and the
+        total volume.
+        """
+        num = len(self._planets)
+        mass = np.zeros(num)
+        momentum = np.zeros((num, 3))
+        moment = np.zeros((num, 3))
+        volume = np.zeros(num)
+        np.add.at(mass, labels, self._mass)
+        np.add.at(momentum, labels, self._mass[:, np.newaxis] * self._vel)
+        np.add.at(moment, labels, self._mass[:, np.newaxis] * self._pos)
+        np.add.at(volume, labels, self._radius**3)
+
+        # The heaviest planet of each group comes last when sorted by label
+        order = np.lexsort((self._mass, labels))
+        isLast = np.append(labels[order][1:] != labels[order][:-1], True)
+        survivors = np.sort(order[isLast])
+        groups = labels[survivors]
+
+        self._mass[survivors] = mass[groups]
+        self._vel[survivors] = momentum[groups] / mass[groups, np.newaxis]
+        self._pos[survivors] = moment[groups] / mass[groups, np.newaxis]
+        self._radius[survivors] = np.cbrt(volume[groups])
+
+        self._planets = [self._planets[i] for i in survivors]
+        self._bindPlanets()
+        self.timestepLevels = self.timestepLevels[survivors] \
+            if len(self.timestepLevels) == num else self.timestepLevels
+
+    def _stepTimeBlocks(self):
+        """Steps the simulation with hierarchical block time steps
+
+        The step dt is split in 2^K substeps, K being the finest level in
+        use. A planet on level k gets a leapfrog step of dt / 2^k: a half
+        kick when its step opens, drifts on every substep and the other half
+        kick, with a freshly computed field, when its step closes.
+        """
+        pos, vel = self._pos, self._vel
+        acc = self._field().copy()
+        levels = self._timestepLevels(acc)
+        finest = int(levels.max()) if len(levels) else 0
+        substep = self.dt / 2**finest
+        period = 2**(finest - levels)
+        halfStep = (0.5 * substep * period)[:, np.newaxis]
+
+        for s in range(2**finest):
+            opening = s % period == 0
+            vel[opening] += halfStep[opening] * acc[opening]
+
+            pos += vel * substep
+
+            closing = np.flatnonzero((s + 1) % period == 0)
+            if len(closing) == len(pos):
+                # Every step closes at the end, the potential goes along
+                potential = np.empty(len(pos)) \
+                    if self._usesPotential() else None
+                acc = self._computeField(pos, potential=potential)
+            else:
+                acc[closing] = self._computeField(pos, closing)
+            vel[closing] += halfStep[closing] * acc[closing]
+
+        # acc holds the field at pos, reused by the outputs and next step
+        self._cachedField = (
+            self._fieldKey(), pos.copy(), self._mass.copy(), acc, potential
+        )
+        self.timestepLevels = levels
+
+    def _timestepLevels(self, acc):
+        """Level k of each planet, whose time step will be dt / 2^k"""
+        accNorm = np.linalg.norm(acc, axis=1)
+        with np.errstate(divide='ignore'):
+            wanted = np.sqrt(2 * self.eta * self.softening / accNorm)
+            levels = np.ceil(np.log2(self.dt / wanted))
+
+        return np.clip(levels, 0, self.maxLevel).astype(int)
+
+    def fieldError(self, sampleSize=256):
+        """Relative error of the engine's field against the direct sum
+
+        Only the first sampleSize planets are compared, keeping the cost of
+        the reference sum at O(sampleSize * N). Returns the maximum and the
+        root mean square of the per-planet relative errors. Where the
+        reference field is zero, like with a single planet, the error is
+        the absolute one over the smallest positive float.
+        """
+        stop = min(sampleSize, len(self._planets))
+        if not stop:
+            return {'max': 0.0, 'rms': 0.0}
+
+        reference = directField(
+            self._pos, self._mass, self.gravConst, slice(0, stop),
+            self.softening
+        )
+        error = np.linalg.norm(self._field()[:stop] - reference, axis=1) / \
+            np.maximum(np.linalg.norm(reference, axis=1), np.finfo(float).tiny)
+
+        return {
+            'max': float(error.max()),
+            'rms': float(np.sqrt(np.mean(error**2)))
+        }
+
+    def potentials(self):
+        """Gravitational potential at each planet's position
+
+        It is taken from the field pass at the current positions when
+        there was one, which computes it along with the field while an
+        output that uses it, like a ConservationMonitor, is attached.
+        """
+        self._field()
+        key, pos, mass, field, potential = self._cachedField
+        if potential is None:
+            potential = np.empty(len(pos))
+            field = self._computeField(pos, potential=potential)
+            self._cachedField = (key, pos, mass, field, potential)
+
+        return potential
+
+    def centerOfMass(self):
+        """Mass weighted mean position of the planets
+
+        It is cached until the time changes or the planets are replaced.
+        """
+        if self._centerOfMass is None or \
+                self._centerOfMass[0] != self.time:
+            center = np.average(self._pos, axis=0, weights=self._mass) \
+                if len(self._planets) else np.zeros(3)
+            self._centerOfMass = (self.time, center)
+
+        return self._centerOfMass[1]
+
+    def _field(self, pos=None):
+        """Gravitational field at the planets' positions, or at pos
+
+        The last result is cached, so when an integrator ends a step with
+        an evaluation at the positions the next one starts from, it is
+        computed only once. Evaluations at the planets' positions also
+        compute the potential if an output uses it.
+        """
+        if pos is None:
+            pos = self._pos
+
+        key = self._fieldKey()
+        if self._cachedField is not None:
+            cachedKey, cachedPos, cachedMass, field, _ = self._cachedField
+            if key == cachedKey and np.array_equal(pos, cachedPos) and \
+                    np.array_equal(self._mass, cachedMass):
+                return field
+
+        potential = None
+        if pos is self._pos and self._usesPotential():
+            potential = np.empty(len(pos))
+
+        field = self._computeField(pos, potential=potential)
+        self._cachedField = (
+            key, pos.copy(), self._mass.copy(), field, potential
+        )
+
+        return field
+
+    def _usesPotential(self):
+        """Whether an attached output reads the potentials"""
+        return any(
+            getattr(output, 'usesPotential', False) for output in self._outputs
+        )
+
+    def _fieldKey(self):
+        """Parameters that change the field, besides positions and masses"""
+        return (self.engine, self.theta, self.gravConst, self.softening)
+
+    def _computeField(self, pos, targets=None, potential=None):
+        """Gravitational field at pos on the targets, computed by the engine
+
+        targets is a slice or an index array, all the planets by default.
+        If a potential array is given, the potential on the targets is
+        written to it in the same pass.
+        """
+        if self._solver is not None and len(self._planets):
+            return self._solver.field(
+                pos, self._mass, self.gravConst, self.engine, self.theta,
+                self.softening, targets, potential
+            )
+
+        if self.engine == 'barneshut' and len(self._planets):
+            tree = Octree(pos, self._mass)
+            return tree.field(
+                self.gravConst, self.theta, targets, self.softening,
+                potential
+            )
+
+        if self.engine == 'python':
+            allPotential = None if potential is None else np.zeros(len(pos))
+            fields = self._pairFields(pos, allPotential)
+            field = np.array([[f.x, f.y, f.z] for f in fields]).reshape(-1, 3)
+            if targets is None:
+                targets = slice(None)
+            if potential is not None:
+                potential[:] = allPotential[targets]
+            return field[targets]
+
+        return directField(
+            pos, self._mass, self.gravConst, targets, self.softening,
+            potential
+        )
+
+    def _colorsArray(self):
+        """Colors of the planets as strings, 'r,g,b' for color tuples"""
+        return np.array([
+            ','.join(str(int(c)) for c in p.color)
+            if isinstance(p.color, (tuple, list)) else str(p.color)
+            for p in self._planets
+        ], dtype=str)
+
+    def _validateArrays(self):
+        """Raise a ValueError if any value in the arrays is not finite"""
+        arrays = {
+            'masses': self._mass, 'positions': self._pos,
+            'velocities': self._vel, 'radii': self._radius
+        }
+        for name, array in arrays.items():
+            assertArray(name, array, array.shape)
+
+    def _bindPlanets(self, capacity=0):
+        """Gather the planets' state into contiguous arrays they view into
+
+        The arrays get room for at least capacity planets.
+        """
+        capacity = max(capacity, len(self._planets))
+        self._storage = (
+            np.empty(capacity), np.empty((capacity, 3)),
+            np.empty((capacity, 3)), np.empty(capacity)
+        )
+        self._viewStorage(len(self._planets), 0, copy=True)
+
+    def _viewStorage(self, n, start, copy=False):
+        """Expose the first n rows of storage and rebind planets from start"""
+        mass, pos, vel, radius = self._storage
+        self._mass, self._pos, self._vel, self._radius = \
+            mass[:n], pos[:n], vel[:n], radius[:n]
+        self._centerOfMass = None
+
+        for i in range(start, n):
+            self._planets[i].bind(
+                mass[i:i + 1], pos[i], vel[i], radius[i:i + 1], copy
+            )
 
     def _gravitationalField(self, m, r):
         """Newton's gravitational field equation"""
+        if self.softening:
+            return (self.gravConst * m /
+                    (r.norm2() + self.softening**2)**1.5) * r
+
         return (self.gravConst * m / r.norm2()) * r.versor()
 
     def _fieldOnPlanet(self, idx_target, target_planet):
@@ -65,3 +733,37 @@ class Universe:
             )
 
         return field
+
+    def _pairFields(self, positions=None, potential=None):
+        """Calculates the grav. fields acting on all planets at once
+
+        Each pair is visited once: the inverse cube of its distance is
+        computed a single time and, by Newton's third law, gives the field
+        on both planets, so it does half the work of _fieldOnPlanet on
+        every planet. The positions are the planets' unless an (N, 3)
+        array is given. If a zeroed potential array is given, the
+        potential on each planet is added to it in the same pass.
+        """
+        planets = self._planets
+        if positions is None:
+            positions = [planet.pos for planet in planets]
+        else:
+            positions = [Vec3(*pos) for pos in positions.tolist()]
+        masses = [planet.mass for planet in planets]
+        fields = [Vec3() for _ in planets]
+        softening2 = self.softening**2
+
+        for i, pos in enumerate(positions):
+            for j in range(i + 1, len(planets)):
+                r = positions[j] - pos
+                dist2 = r.norm2() + softening2
+                inverse = self.gravConst / math.sqrt(dist2)
+                inverse3 = inverse / dist2
+
+                fields[i] += (masses[j] * inverse3) * r
+                fields[j] -= (masses[i] * inverse3) * r
+                if potential is not None:
+                    potential[i] -= masses[j] * inverse
+                    potential[j] -= masses[i] * inverse
+
+        return fields
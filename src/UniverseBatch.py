@@ -0,0 +1,145 @@
+import numpy as np
+
+from .kernels import batchedField
+from .integrators import INTEGRATORS
+from .utils import assertType, assertReal, assertArray
+
+
+class UniverseBatch:
+    """Many independent small universes stepped together
+
+    The S systems of N bodies live in (S, N) mass and (S, N, 3) position
+    and velocity arrays, and each step advances all of them at once with
+    one batched field evaluation per integrator stage. There are no Planet
+    objects, trajectories or collisions: it is meant for running thousands
+    of few-body problems, like the points of a stability map, where the
+    per-planet overhead of a Universe would dominate.
+
+    dt and gravConst are one value for every system or an array with one
+    per system. The integrators are the ones of Universe.
+    """
+
+    def __init__(self, dt, gravConst=6.67408e-11, integrator='leapfrog',
+                 softening=0.0):
+        assertType('integrator', integrator, str)
+        assertReal('softening', softening)
+
+        if integrator not in INTEGRATORS:
+            raise ValueError(f'integrator must be one of {tuple(INTEGRATORS)}')
+
+        self.dt = self._perSystem('time step', dt)
+        self.gravConst = self._perSystem('gravitational constant', gravConst)
+        self.integrator = integrator
+        self.softening = float(softening)
+        self.time = 0.0
+        self._cachedField = None
+        self._mass = np.zeros((0, 0))
+        self._pos = np.zeros((0, 0, 3))
+        self._vel = np.zeros((0, 0, 3))
+
+    @property
+    def masses(self):
+        return self._mass
+
+    @property
+    def positions(self):
+        return self._pos
+
+    @property
+    def velocities(self):
+        return self._vel
+
+    def __len__(self):
+        return len(self._mass)
+
+    def setArrays(self, masses, positions, velocities):
+        """Set the systems from (S, N) masses and (S, N, 3) positions and
+        velocities, which are copied
+        """
+        masses = assertArray('masses', masses, (None, None))
+        positions = assertArray('positions', positions, masses.shape + (3,))
+        velocities = assertArray(
+            'velocities', velocities, masses.shape + (3,)
+        )
+        for name, values in (('time step', self.dt),
+                             ('gravitational constant', self.gravConst)):
+            if np.ndim(values) and len(values) != len(masses):
+                raise ValueError(f'there must be a {name} per system')
+
+        self._mass = masses.copy()
+        self._pos = positions.copy()
+        self._vel = velocities.copy()
+        self._cachedField = None
+
+    def stepTime(self, steps=1):
+        """Advance every system by a number of steps"""
+        integrate = INTEGRATORS[self.integrator]
+        dt = np.reshape(self.dt, (-1, 1, 1))
+
+        for _ in range(steps):
+            integrate(self._pos, self._vel, dt, self._field)
+            self.time = self.time + self.dt
+
+    def potentials(self):
+        """Gravitational potential at each body's position, shape (S, N)"""
+        self._field()
+        return self._cachedField[4]
+
+    def energies(self):
+        """Total kinetic plus potential energy of each system"""
+        kinetic = 0.5 * np.einsum('si,sij,sij->s', self._mass, self._vel,
+                                  self._vel)
+        potential = 0.5 * np.einsum('si,si->s', self._mass, self.potentials())
+        return kinetic + potential
+
+    def momenta(self):
+        """Linear momentum of each system, shape (S, 3)"""
+        return np.einsum('si,sij->sj', self._mass, self._vel)
+
+    def angularMomenta(self):
+        """Angular momentum of each system about the origin, shape (S, 3)"""
+        return np.einsum(
+            'si,sij->sj', self._mass, np.cross(self._pos, self._vel)
+        )
+
+    def centersOfMass(self):
+        """Center of mass of each system, shape (S, 3)"""
+        return np.einsum('si,sij->sj', self._mass, self._pos) / \
+            self._mass.sum(axis=1)[:, np.newaxis]
+
+    def _field(self, pos=None):
+        """Gravitational field at the bodies' positions, or at pos
+
+        The last result is cached like Universe does, along with the
+        potential, which the batched sum gets almost for free.
+        """
+        if pos is None:
+            pos = self._pos
+
+        key = (self.gravConst, self.softening)
+        if self._cachedField is not None:
+            cachedKey, cachedPos, cachedMass, field, _ = self._cachedField
+            if np.array_equal(key[0], cachedKey[0]) and \
+                    key[1] == cachedKey[1] and \
+                    np.array_equal(pos, cachedPos) and \
+                    np.array_equal(self._mass, cachedMass):
+                return field
+
+        potential = np.empty(self._mass.shape)
+        field = batchedField(
+            pos, self._mass, self.gravConst, self.softening, potential
+        )
+        self._cachedField = (
+            key, pos.copy(), self._mass.copy(), field, potential
+        )
+
+        return field
+
+    @staticmethod
+    def _perSystem(name, value):
+        """A real number, or an array of them, as floats"""
+        if np.ndim(value):
+            return assertArray(name, value, (None,))
+
+        assertReal(name, value)
+        return float(value)
@@ -1,3 +1,4 @@
+import numpy as np
 import pygame
 
 from .vecN import Vec2, Vec3
@@ -6,6 +7,11 @@ from .vecN import Vec2, Vec3
 WINDOW_TITLE = 'Planet Simmulation'
 MIN_CAM_SIZE = 160
 CONTROL_BAR_WIDTH = 150
+MAX_TRAIL_POINTS = 1000
+OVERLAY_FONT_SIZE = 18
+# Share of a trajectory's capacity that may linger on the trail layer after
+# being overwritten before the layer is redrawn
+TRAIL_SLACK = 0.25
 
 
 class Action:
@@ -17,27 +23,47 @@ class Action:
 
 
 class View():
-    """Manages the GUI"""
+    """Manages the GUI
 
-    def __init__(self, screen_width, screen_height):
+    An offscreen view draws to a plain surface instead of a window, to
+    render frames where there is no display.
+    """
+
+    def __init__(self, screen_width, screen_height, offscreen=False):
         self.screenSize = (screen_width, screen_height)
+        self.offscreen = offscreen
 
         self.running = True
         self.camCenter = None
         self.camSize = None
         self.constructionMode = True
+        self.overlay = None
+        self._font = None
+        self.trailSlack = TRAIL_SLACK
+        self._trails = None
+        self._trailCamera = None
+        self._trailMarkers = {}
+        self._dirty = []
 
         # Init pygame
         pygame.init()
-        self.screen = pygame.display.set_mode(self.screenSize)
-        pygame.display.set_caption(WINDOW_TITLE)
+        if offscreen:
+            self.screen = pygame.Surface(self.screenSize)
+        else:
+            self.screen = pygame.display.set_mode(self.screenSize)
+            pygame.display.set_caption(WINDOW_TITLE)
 
     def quit(self):
         """Terminate the GUI and close window"""
         self.running = False
         pygame.quit()
 
-    def handleEvents(self, planets):
+    def setStatus(self, status):
+        """Show a status text next to the window title"""
+        if not self.offscreen:
+            pygame.display.set_caption(f'{WINDOW_TITLE} - {status}')
+
+    def handleEvents(self, universe):
         """Handle input events"""
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -51,6 +77,17 @@ class View():
                 if event.key == pygame.K_RETURN:
                     return Action('STOP')
 
+                # Seek controls, used when replaying
+                if event.key == pygame.K_LEFTBRACKET:
+                    return Action('SEEK_BACK')
+                if event.key == pygame.K_RIGHTBRACKET:
+                    return Action('SEEK_FORWARD')
+                if event.key == pygame.K_HOME:
+                    return Action('SEEK_START')
+
+                if event.key == pygame.K_F3:
+                    return Action('TOGGLE_PROFILER')
+
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 4:
                     self._zoomCamera(0.1 * self.camSize)
@@ -63,12 +100,12 @@ class View():
                     space_pos = self._screenCoordsToPos(pos)
 
                     # Click on a planet
-                    for i, p in enumerate(planets):
-                        if abs(space_pos - p.pos) < 1.1 * p.radius:
-                            if event.button == 1:
-                                return Action('SELECT_PLANET', i)
-                            if event.button == 3:
-                                return Action('REMOVE_PLANET', i)
+                    i = universe.planetAt((space_pos.x, space_pos.y))
+                    if i is not None:
+                        if event.button == 1:
+                            return Action('SELECT_PLANET', i)
+                        if event.button == 3:
+                            return Action('REMOVE_PLANET', i)
 
                     # Add new planet
                     if event.button == 1 and self._isInScreen(pos):
@@ -104,120 +141,278 @@ class View():
 
         # Speed control
         if keys[pygame.K_COMMA]:
-            return Action('FPS_DOWN')
+            return Action('SPEED_DOWN')
         if keys[pygame.K_PERIOD]:
-            return Action('FPS_UP')
+            return Action('SPEED_UP')
 
     def drawUniverse(self, universe):
-        """Draw the universe simulation GUI"""
+        """Draw the universe simulation GUI
+
+        The trails live on an off-screen layer that only gets the segments
+        added since the last frame, and only the parts of the window that
+        changed are updated: the new segments and where the planets, their
+        velocities and the markers were and are. The layer is redrawn
+        whole when the camera moves or zooms, or the trajectories are
+        replaced.
+        """
         self.screenSize = self.screen.get_size()
+        if not self.camCenter:
+            self._setUpCamera(universe.planets)
 
-        # Background
-        self.screen.fill((0, 0, 0))
+        trailRects = self._updateTrails(universe)
 
-        self._drawUniverse(universe)
+        if trailRects is None:
+            self.screen.blit(self._trails, (0, 0))
+        else:
+            for rect in self._dirty + trailRects:
+                self.screen.blit(self._trails, rect, rect)
 
-        pygame.display.update()
+        dirty = self._dirty
+        self._dirty = self._drawUniverse(universe)
+        if self.overlay:
+            self._dirty += self._drawOverlay()
+
+        if self.offscreen:
+            return
+        if trailRects is None:
+            pygame.display.update()
+        else:
+            pygame.display.update(dirty + trailRects + self._dirty)
 
     def _drawUniverse(self, universe):
-        """Draw the current state of a universe"""
+        """Draw the current state of a universe, over the trails
+
+        Returns the rectangles drawn on.
+        """
         if not self.camCenter:
             self._setUpCamera(universe.planets)
 
-        self._drawOrigin()
-
-        self._drawCenterOfMass(universe.planets)
+        rects = self._drawOrigin()
+        rects += self._drawCenterOfMass(universe)
+        rects += self._drawPlanets(universe)
+
+        return rects
+
+    def _updateTrails(self, universe):
+        """Bring the trail layer up to date with the trajectories
+
+        Draws the segments added since the last call, returning the
+        rectangles they cover, or redraws the whole layer and returns None
+        if the camera or the screen changed, a trajectory was replaced or
+        removed, or too many overwritten points linger on the layer.
+        """
+        camera = (self.camCenter.x, self.camCenter.y, self.camSize,
+                  self.screenSize)
+        trajectories = [planet.trajectory for planet in universe.planets]
+        markers = self._trailMarkers
+        valid = self._trails is not None and camera == self._trailCamera \
+            and len(markers) <= len(trajectories)
+
+        rects = []
+        segments = []
+        for planet, trajectory in zip(universe.planets, trajectories):
+            if not valid:
+                break
+
+            if trajectory.identity not in markers:
+                points = trajectory.points()
+                first = trajectory.dropped()
+            else:
+                marker, first = markers[trajectory.identity]
+                points = trajectory.pointsSince(marker)
+                if points is None or trajectory.dropped() - first > \
+                        self.trailSlack * trajectory.capacity:
+                    valid = False
+                    break
+
+            if len(points) == 2:
+                segments.append((planet.color, points))
+            else:
+                rects += self._drawTrail(planet.color, points)
+            markers[trajectory.identity] = (trajectory.marker(), first)
+
+        # Trails of removed planets can't be erased one by one
+        if valid and len(markers) == len(trajectories):
+            return rects + self._drawSegments(segments)
+
+        self._redrawTrails(universe, camera)
+        return None
+
+    def _redrawTrails(self, universe, camera):
+        """Draw every trajectory on a blank trail layer"""
+        if self._trails is None or self._trails.get_size() != \
+                tuple(self.screenSize):
+            self._trails = pygame.Surface(self.screenSize)
+        self._trails.fill((0, 0, 0))
+        self._trailCamera = camera
+        self._trailMarkers = {}
+        self._dirty = []
 
-        # Draw all planets
         for planet in universe.planets:
-            self._drawPlanet(planet)
+            trajectory = planet.trajectory
+            self._drawTrail(planet.color, trajectory.points())
+            self._trailMarkers[trajectory.identity] = (
+                trajectory.marker(), trajectory.dropped()
+            )
 
-    def _drawPlanet(self, planet):
-        """Draw a planet to the screen"""
-        screen_x, screen_y = self._posToScreenCoords(planet.pos)
-        radius = (self.screenSize[0] / self.camSize) * planet.radius
+    def _drawTrail(self, color, points):
+        """Draw a polyline of space positions on the trail layer
+
+        Returns the rectangles drawn on.
+        """
+        if len(points) < 2:
+            return []
+
+        coords = self._arrayToScreenCoords(points)
+        return [
+            pygame.draw.lines(self._trails, (*color, 10), False, run.tolist())
+            for run in self._visibleRuns(coords)
+        ]
+
+    def _drawSegments(self, segments):
+        """Draw single segments, as (color, points) pairs, on the trail layer
+
+        They are transformed and culled all at once, which is what a frame
+        of trails growing by one segment each needs. Returns the rectangles
+        drawn on.
+        """
+        if not segments:
+            return []
+
+        coords = self._arrayToScreenCoords(
+            np.concatenate([points for _, points in segments])
+        ).reshape(-1, 2, 2)
+        low = coords.min(axis=1)
+        high = coords.max(axis=1)
+        visible = (high[:, 0] >= 0) & (low[:, 0] <= self.screenSize[0]) & \
+            (high[:, 1] >= 0) & (low[:, 1] <= self.screenSize[1])
+
+        return [
+            pygame.draw.line(self._trails, (*color, 10), *ends)
+            for (color, _), ends in zip(
+                [segments[i] for i in np.flatnonzero(visible)],
+                coords[visible].tolist()
+            )
+        ]
 
-        if not self._isInScreen((screen_x, screen_y)):
-            radius /= 2
+    def _drawOverlay(self):
+        """Draw the overlay lines of text on the top left corner
 
-        screen_x = max(screen_x, 0)
-        screen_x = min(screen_x, self.screenSize[0])
-        screen_y = max(screen_y, 0)
-        screen_y = min(screen_y, self.screenSize[1])
+        Returns the rectangles drawn on.
+        """
+        if self._font is None:
+            self._font = pygame.font.Font(None, OVERLAY_FONT_SIZE)
 
-        # Draw trajectory
-        if len(planet.trajectory) > 1:
-            pygame.draw.lines(
-                self.screen,
-                (*planet.color, 10),
-                False,
-                [self._posToScreenCoords(point) for point in planet.trajectory]
+        rects = []
+        for i, line in enumerate(self.overlay):
+            text = self._font.render(line, True, (200, 200, 200), (0, 0, 0))
+            rects.append(
+                self.screen.blit(text, (5, 5 + i * OVERLAY_FONT_SIZE))
             )
 
-        # Draw planet
-        pygame.draw.circle(
-            self.screen,
-            planet.color,
-            (screen_x, screen_y),
-            radius
+        return rects
+
+    def _drawPlanets(self, universe):
+        """Draw the planets and their velocities to the screen
+
+        The positions and velocity ends of all the planets are transformed
+        at once. Planets off the screen are kept in sight as half sized
+        indicators on its edge, with their velocity drawn from there. Of
+        the indicators of the same size on an edge pixel whose velocity
+        points away from the screen, only the last one, which would cover
+        the others, is drawn. Their trajectories go on the trail layer.
+        Returns the rectangles drawn on.
+        """
+        planets = universe.planets
+        if not len(planets):
+            return []
+
+        positions = universe.positions
+        coords = self._arrayToScreenCoords(positions)
+        ends = self._arrayToScreenCoords(
+            positions + 1.5 * universe.velocities
         )
-
-        # Draw velocity
-        end_screen_pos = self._posToScreenCoords(planet.pos + 1.5 * planet.vel)
-        pygame.draw.line(
-            self.screen,
-            (255, 255, 255),
-            (screen_x, screen_y),
-            (end_screen_pos[0], end_screen_pos[1])
+        radii = (self.screenSize[0] / self.camSize) * universe.radii
+
+        size = np.array(self.screenSize)
+        inScreen = np.all((coords >= 0) & (coords <= size), axis=1)
+        radii[~inScreen] /= 2
+        # Indicators whose velocity stays beyond the edge they are on
+        hidden = np.flatnonzero(np.any(
+            ((coords < 0) & (ends < 0)) | ((coords > size) & (ends > size)),
+            axis=1
+        ))[::-1]
+        coords = np.clip(coords, 0, size)
+
+        # Culling of the indicators a later one of the same size covers
+        _, last = np.unique(
+            np.column_stack((coords[hidden], radii[hidden].astype(int))),
+            axis=0, return_index=True
         )
+        culled = np.zeros(len(planets), dtype=bool)
+        culled[hidden] = True
+        culled[hidden[last]] = False
+
+        rects = []
+        for i, center, radius, end in zip(
+            np.flatnonzero(~culled).tolist(), coords[~culled].tolist(),
+            radii[~culled].tolist(), ends[~culled].tolist()
+        ):
+            rects.append(pygame.draw.circle(
+                self.screen, planets[i].color, center, radius
+            ))
+            rects.append(pygame.draw.line(
+                self.screen, (255, 255, 255), center, end
+            ))
+
+        return rects
 
     def _drawOrigin(self):
-        """Draw a cross on the origin of the coordinate system"""
+        """Draw a cross on the origin of the coordinate system
+
+        Returns the rectangles drawn on.
+        """
         screen_coords = self._posToScreenCoords(Vec2())
 
         if not self._isInScreen(screen_coords):
-            return
+            return []
 
-        pygame.draw.line(
-            self.screen,
-            (150, 150, 150),
-            (screen_coords[0] - 3, screen_coords[1]),
-            (screen_coords[0] + 3, screen_coords[1]),
-        )
-        pygame.draw.line(
-            self.screen,
-            (150, 150, 150),
-            (screen_coords[0], screen_coords[1] - 3),
-            (screen_coords[0], screen_coords[1] + 3),
-        )
+        return self._drawCross((150, 150, 150), screen_coords)
 
-    def _drawCenterOfMass(self, planets):
-        """Draw a cross on the center of mass of the planets"""
-        if not planets:
-            return Vec2()
+    def _drawCenterOfMass(self, universe):
+        """Draw a cross on the center of mass of the planets
+
+        Returns the rectangles drawn on.
+        """
+        if not len(universe.planets):
+            return []
 
-        center_of_mass = planets[0].mass * planets[0].pos
-        for p in planets[1:]:
-            center_of_mass += p.mass * p.pos
-        center_of_mass /= sum([p.mass for p in planets])
+        center_of_mass = universe.centerOfMass()
 
-        screen_coords = self._posToScreenCoords(center_of_mass)
+        screen_coords = \
+            self._arrayToScreenCoords(center_of_mass[np.newaxis])[0].tolist()
 
         if not self._isInScreen(screen_coords):
-            return
+            return []
 
-        pygame.draw.line(
-            self.screen,
-            (200, 100, 100),
-            (screen_coords[0] - 3, screen_coords[1]),
-            (screen_coords[0] + 3, screen_coords[1]),
-        )
-        pygame.draw.line(
-            self.screen,
-            (200, 100, 100),
-            (screen_coords[0], screen_coords[1] - 3),
-            (screen_coords[0], screen_coords[1] + 3),
-        )
+        return self._drawCross((200, 100, 100), screen_coords)
+
+    def _drawCross(self, color, screen_coords):
+        """Draw a small cross, returning the rectangles drawn on"""
+        return [
+            pygame.draw.line(
+                self.screen,
+                color,
+                (screen_coords[0] - 3, screen_coords[1]),
+                (screen_coords[0] + 3, screen_coords[1]),
+            ),
+            pygame.draw.line(
+                self.screen,
+                color,
+                (screen_coords[0], screen_coords[1] - 3),
+                (screen_coords[0], screen_coords[1] + 3),
+            ),
+        ]
 
     def _setUpCamera(self, planets):
         """Set the starting position of the camera"""
@@ -242,10 +437,16 @@ class View():
             displacement = Vec2(displacement)
 
         self.camCenter += displacement
+        self._invalidateTrails()
 
     def _zoomCamera(self, sizeChange):
         """Change the zoom level of the camera"""
         self.camSize -= sizeChange
+        self._invalidateTrails()
+
+    def _invalidateTrails(self):
+        """Have the trail layer redrawn whole on the next frame"""
+        self._trailCamera = None
 
     def _posToScreenCoords(self, pos):
         """Translate the space position into the screen drawing coordinates"""
@@ -260,6 +461,51 @@ class View():
 
         return int(x), int(y)
 
+    def _arrayToScreenCoords(self, points):
+        """Translate an array of space positions into screen coordinates
+
+        Batched version of _posToScreenCoords for an (N, 2) or (N, 3) array,
+        returning an (N, 2) integer array.
+        """
+        camLim = np.array([self.camCenter.x, self.camCenter.y]) - \
+            self.camSize / 2
+        scale = np.array(self.screenSize) / self.camSize
+
+        coords = (points[:, :2] - camLim) * scale
+
+        # Invert orientation of y
+        coords[:, 1] = self.screenSize[1] - coords[:, 1]
+
+        return coords.astype(int)
+
+    def _visibleRuns(self, coords):
+        """Split a polyline in screen coordinates into its visible runs
+
+        Consecutive points falling on the same pixel are merged and, past
+        MAX_TRAIL_POINTS, the line is decimated. Segments whose bounding box
+        is off the screen are culled, which breaks the line into runs of
+        consecutive visible segments.
+        """
+        # Level of detail
+        moved = np.ones(len(coords), dtype=bool)
+        moved[1:] = np.any(coords[1:] != coords[:-1], axis=1)
+        coords = coords[moved]
+        if len(coords) > MAX_TRAIL_POINTS:
+            stride = -(-len(coords) // MAX_TRAIL_POINTS)
+            coords = np.concatenate((coords[:-1:stride], coords[-1:]))
+
+        # Culling
+        low = np.minimum(coords[:-1], coords[1:])
+        high = np.maximum(coords[:-1], coords[1:])
+        visible = (high[:, 0] >= 0) & (low[:, 0] <= self.screenSize[0]) & \
+            (high[:, 1] >= 0) & (low[:, 1] <= self.screenSize[1])
+
+        edges = np.diff(np.concatenate(([0], visible.astype(int), [0])))
+        starts = np.flatnonzero(edges == 1)
+        stops = np.flatnonzero(edges == -1)
+
+        return [coords[start:stop + 1] for start, stop in zip(starts, stops)]
+
     def _screenCoordsToPos(self, coords):
         # Invert orientation of y
         coord_y = self.screenSize[1] - coords[1]
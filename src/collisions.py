@@ -0,0 +1,89 @@
+"""Collision detection and response for the planet arrays"""
+import itertools
+
+import numpy as np
+
+
+# Weights of the cell coordinates in the hash key. The key is linear in the
+# coordinates, so the keys of the neighbors of sorted cells are sorted too.
+# Products may wrap around in int64, only adding harmless false candidates.
+HASH_WEIGHTS = np.array([2**42, 2**21, 1], dtype=np.int64)
+NEIGHBOR_KEYS = np.array(
+    list(itertools.product((-1, 0, 1), repeat=3)), dtype=np.int64
+) @ HASH_WEIGHTS
+
+
+def findCollisions(pos, radii):
+    """Pairs of bodies (i, j), i < j, whose spheres overlap
+
+    The broad phase bins the bodies in a uniform grid with cells as wide as
+    the largest diameter, looked up through a spatial hash, so only bodies
+    in neighboring cells are compared and the cost is close to O(N).
+    """
+    num = len(pos)
+    empty = np.zeros(0, dtype=np.int64)
+    if num < 2:
+        return empty, empty
+
+    cellSize = 2 * radii.max()
+    if cellSize <= 0:
+        return empty, empty
+
+    cells = np.floor(pos / cellSize).astype(np.int64)
+    keys = cells @ HASH_WEIGHTS
+    order = np.argsort(keys, kind='stable')
+    sortedKeys = keys[order]
+
+    first, second = [], []
+    for offsetKey in NEIGHBOR_KEYS:
+        neighborKeys = sortedKeys + offsetKey
+        start = np.searchsorted(sortedKeys, neighborKeys, 'left')
+        counts = np.searchsorted(sortedKeys, neighborKeys, 'right') - start
+
+        bodies = np.repeat(order, counts)
+        offsets = np.arange(counts.sum()) - \
+            np.repeat(np.cumsum(counts) - counts, counts)
+        others = order[np.repeat(start, counts) + offsets]
+
+        keep = bodies < others
+        first.append(bodies[keep])
+        second.append(others[keep])
+
+    # Cells sharing a key give the same pair more than once
+    pairs = np.unique(np.concatenate(first) * num + np.concatenate(second))
+    first, second = pairs // num, pairs % num
+
+    disp = pos[second] - pos[first]
+    touching = np.einsum('ij,ij->i', disp, disp) < \
+        (radii[first] + radii[second])**2
+
+    return first[touching], second[touching]
+
+
+def mergeGroups(num, first, second):
+    """Label each body with the smallest index of its cluster of contacts"""
+    labels = np.arange(num)
+    while True:
+        smallest = np.minimum(labels[first], labels[second])
+        previous = labels.copy()
+        np.minimum.at(labels, first, smallest)
+        np.minimum.at(labels, second, smallest)
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def bounce(pos, vel, mass, first, second):
+    """Elastic collision of the approaching pairs, changing vel in place"""
+    normal = pos[second] - pos[first]
+    normal /= np.linalg.norm(normal, axis=1)[:, np.newaxis]
+    approach = np.einsum('ij,ij->i', vel[second] - vel[first], normal)
+
+    closing = approach < 0
+    first, second = first[closing], second[closing]
+    normal = normal[closing]
+
+    totalMass = mass[first] + mass[second]
+    impulse = (2 * approach[closing] / totalMass)[:, np.newaxis] * normal
+    np.add.at(vel, first, mass[second][:, np.newaxis] * impulse)
+    np.subtract.at(vel, second, mass[first][:, np.newaxis] * impulse)
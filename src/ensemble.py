@@ -0,0 +1,385 @@
+"""Run a scenario over a grid of parameters and perturbations
+
+A sweep spec is a dict, or a JSON file, like:
+
+    {
+        "conditions": "examples/binary.json",
+        "steps": 1000,
+        "universe": {"integrator": "leapfrog"},
+        "sweep": {"dt": [0.01, 0.005], "massScale": [1, 1.1]},
+        "perturbations": 20,
+        "positionSigma": 0.01,
+        "seed": 0
+    }
+
+The conditions are JSON initial conditions, as a path or inline, or a .npz
+checkpoint. Every combination of the sweep values is run 'perturbations'
+times, with Gaussian noise of 'positionSigma' and 'velocitySigma' added to
+the positions and velocities. Swept keys are 'dt', 'gravConst' and
+'massScale', a factor on every mass, or any other Universe argument, like
+'integrator'. 'until' can be given instead of 'steps'.
+
+Runs are spread over a pool of processes, in chunks so small systems don't
+pay a round trip each, and every run is summarized with its conserved
+quantity errors in one row of a results table. The runs of a chunk with
+few bodies and the same settings are stepped together as a UniverseBatch,
+unless the spec sets "batch" to false. Run
+`python -m src.ensemble --help` from the repository root.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .Universe import Universe
+from .UniverseBatch import UniverseBatch
+from .headless import run
+from .monitor import ConservationMonitor
+
+
+SCALED_KEYS = ('dt', 'gravConst', 'massScale')
+# Settings of a checkpoint a run starts with, unless the spec changes them
+CHECKPOINT_SETTINGS = (
+    'engine', 'theta', 'integrator', 'softening', 'adaptive', 'eta',
+    'maxLevel', 'collisions'
+)
+CHUNKS_PER_WORKER = 4
+# Runs of at most this many bodies, with a direct sum engine, are batched
+BATCH_MAX_BODIES = 10
+BATCH_ENGINES = ('python', 'numpy')
+
+
+def loadConditions(conditions):
+    """Initial conditions as arrays, from a dict, JSON file or checkpoint
+
+    A checkpoint also brings the settings of its universe.
+    """
+    if isinstance(conditions, str) and conditions.endswith('.npz'):
+        with np.load(conditions) as state:
+            return {
+                'settings': {
+                    key: state[key].item() for key in CHECKPOINT_SETTINGS
+                    if key in state
+                },
+                'dt': float(state['dt']),
+                'gravConst': float(state['gravConst']),
+                'masses': state['masses'],
+                'positions': state['positions'],
+                'velocities': state['velocities'],
+                'radii': state['radii'],
+            }
+
+    if isinstance(conditions, str):
+        with open(conditions) as file:
+            conditions = json.load(file)
+
+    planets = conditions['planets']
+    return {
+        'settings': {},
+        'dt': float(conditions['dt']),
+        'gravConst': float(conditions.get('gravConst', 1)),
+        'masses': np.array([p['mass'] for p in planets], dtype=float),
+        'positions': np.array([p['pos'] for p in planets], dtype=float),
+        'velocities': np.array([p['vel'] for p in planets], dtype=float),
+        'radii': np.array([p.get('radius', 2) for p in planets], dtype=float),
+    }
+
+
+def expandSweep(spec):
+    """List of runs of a spec, each a dict with its index and parameters"""
+    sweep = spec.get('sweep', {})
+    names = list(sweep)
+    runs = []
+
+    for values in itertools.product(*(sweep[name] for name in names)):
+        for sample in range(spec.get('perturbations', 1)):
+            runs.append({
+                'run': len(runs), **dict(zip(names, values)),
+                'sample': sample
+            })
+
+    return runs
+
+
+def runOne(spec, base, params):
+    """Run a single member of the ensemble and summarize it in a row"""
+    masses, positions, velocities = _initialState(spec, base, params)
+    universe = Universe(
+        float(params.get('dt', base['dt'])),
+        float(params.get('gravConst', base['gravConst'])),
+        **_settings(spec, base, params)
+    )
+    universe.setArrays(masses, positions, velocities, base['radii'])
+    monitor = ConservationMonitor()
+    universe.addOutput(monitor)
+
+    stats = run(universe, spec.get('steps'), spec.get('until'))
+    series = monitor.series()
+
+    return {
+        **params,
+        'bodies': len(universe.planets),
+        'steps': stats['steps'],
+        'time': universe.time,
+        'wallTime': stats['elapsed'],
+        'energyError': float(series['energyError'][-1]),
+        'maxEnergyError': float(series['energyError'].max()),
+        'momentumDrift': float(series['momentumDrift'].max()),
+        'angularMomentumDrift': float(series['angularMomentumDrift'].max()),
+        'centerOfMassDrift': float(series['centerOfMassDrift'].max()),
+        'collisions': universe.numCollisions,
+    }
+
+
+def runBatch(spec, base, batch):
+    """Run members of the ensemble as one UniverseBatch, a row for each
+
+    The members must share their settings and number of steps. Their
+    errors are tracked every step like a ConservationMonitor does, and
+    the wall time of the batch is split evenly among them.
+    """
+    params = batch[0]
+    settings = _settings(spec, base, params)
+    steps = _numSteps(spec, float(params.get('dt', base['dt'])))
+    dt = np.array([float(p.get('dt', base['dt'])) for p in batch])
+
+    universe = UniverseBatch(
+        dt, np.array([float(p.get('gravConst', base['gravConst']))
+                      for p in batch]),
+        settings.get('integrator', 'euler'), settings.get('softening', 0.0)
+    )
+    universe.setArrays(*(
+        np.stack(arrays) for arrays in
+        zip(*(_initialState(spec, base, p) for p in batch))
+    ))
+
+    start = time.perf_counter()
+    energy = universe.energies()
+    momentum = universe.momenta()
+    angularMomentum = universe.angularMomenta()
+    center = universe.centersOfMass()
+    velocity = momentum / universe.masses.sum(axis=1)[:, np.newaxis]
+    scale = np.where(energy != 0, np.abs(energy), 1.0)
+    errors = {
+        name: np.zeros(len(batch)) for name in (
+            'energyError', 'maxEnergyError', 'momentumDrift',
+            'angularMomentumDrift', 'centerOfMassDrift'
+        )
+    }
+
+    def track():
+        errors['energyError'] = np.abs(universe.energies() - energy) / scale
+        for name, drift in (
+            ('maxEnergyError', errors['energyError']),
+            ('momentumDrift', universe.momenta() - momentum),
+            ('angularMomentumDrift',
+             universe.angularMomenta() - angularMomentum),
+            ('centerOfMassDrift', universe.centersOfMass() - center -
+             np.reshape(universe.time, (-1, 1)) * velocity),
+        ):
+            if drift.ndim > 1:
+                drift = np.linalg.norm(drift, axis=1)
+            np.maximum(errors[name], drift, out=errors[name])
+
+    for _ in range(steps):
+        universe.stepTime()
+        track()
+    elapsed = time.perf_counter() - start
+    times = np.broadcast_to(universe.time, len(batch))
+
+    return [
+        {
+            **p,
+            'bodies': len(base['masses']),
+            'steps': steps,
+            'time': float(times[i]),
+            'wallTime': elapsed / len(batch),
+            **{name: float(values[i]) for name, values in errors.items()},
+            'collisions': 0,
+        }
+        for i, p in enumerate(batch)
+    ]
+
+
+def _settings(spec, base, params):
+    """Universe arguments of a run: the base's, the spec's and the swept"""
+    settings = {**base['settings'], **spec.get('universe', {})}
+    settings.update({
+        key: value for key, value in params.items()
+        if key not in SCALED_KEYS + ('run', 'sample')
+    })
+    return settings
+
+
+def _initialState(spec, base, params):
+    """Masses, positions and velocities of a run, scaled and perturbed"""
+    rng = np.random.default_rng([spec.get('seed', 0), params['run']])
+    positions = base['positions'] + rng.normal(
+        0, spec.get('positionSigma', 0.0), base['positions'].shape
+    )
+    velocities = base['velocities'] + rng.normal(
+        0, spec.get('velocitySigma', 0.0), base['velocities'].shape
+    )
+    return base['masses'] * params.get('massScale', 1.0), positions, \
+        velocities
+
+
+def _numSteps(spec, dt):
+    """Steps a run takes, from the spec's steps or until, like run does"""
+    steps, until = spec.get('steps'), spec.get('until')
+    if until is not None:
+        untilSteps = int(np.ceil(until / dt - 0.5))
+        steps = untilSteps if steps is None else min(steps, untilSteps)
+    return max(steps, 0)
+
+
+def _batchKey(spec, base, params):
+    """What runs must share to be batched together, None if they can't be"""
+    settings = _settings(spec, base, params)
+    if len(base['masses']) > BATCH_MAX_BODIES or \
+            settings.get('engine', 'numpy') not in BATCH_ENGINES or \
+            settings.get('adaptive', False) or \
+            settings.get('collisions', 'none') != 'none':
+        return None
+
+    return (
+        settings.get('integrator', 'euler'), settings.get('softening', 0.0),
+        _numSteps(spec, float(params.get('dt', base['dt'])))
+    )
+
+
+def _runChunk(spec, base, chunk):
+    """Worker task: run a chunk of the ensemble
+
+    Runs of few bodies that share their settings go as one batch.
+    """
+    rows = [None] * len(chunk)
+    batches = {}
+    for i, params in enumerate(chunk):
+        key = _batchKey(spec, base, params) if spec.get('batch', True) \
+            else None
+        if key is None:
+            rows[i] = runOne(spec, base, params)
+        else:
+            batches.setdefault(key, []).append(i)
+
+    for indices in batches.values():
+        batchRows = runBatch(spec, base, [chunk[i] for i in indices])
+        for i, row in zip(indices, batchRows):
+            rows[i] = row
+
+    return rows
+
+
+def runEnsemble(spec, workers=None, report=None):
+    """Run every member of a sweep spec, returning the rows of results
+
+    Rows come in the order of expandSweep. With workers=1 everything runs
+    in this process. report, if given, is called with the number of runs
+    done after each chunk.
+    """
+    if spec.get('steps') is None and spec.get('until') is None:
+        raise ValueError('the spec needs either steps or until')
+
+    base = loadConditions(spec['conditions'])
+    runs = expandSweep(spec)
+    workers = workers or os.cpu_count()
+    size = max(1, -(-len(runs) // (workers * CHUNKS_PER_WORKER)))
+    chunks = [runs[i:i + size] for i in range(0, len(runs), size)]
+
+    rows = []
+    if workers == 1:
+        results = (_runChunk(spec, base, chunk) for chunk in chunks)
+        for chunkRows in results:
+            rows.extend(chunkRows)
+            if report:
+                report(len(rows))
+        return rows
+
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [
+            pool.submit(_runChunk, spec, base, chunk) for chunk in chunks
+        ]
+        for future in futures:
+            rows.extend(future.result())
+            if report:
+                report(len(rows))
+
+    return rows
+
+
+def aggregate(rows, keys):
+    """Group the rows by the given keys, averaging over the rest
+
+    Each group's row holds the keys, the number of runs, and the mean and
+    max of every numeric column that is not a key.
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(row[key] for key in keys), []).append(row)
+
+    table = []
+    for point, group in groups.items():
+        summary = {**dict(zip(keys, point)), 'runs': len(group)}
+        for column, value in group[0].items():
+            if column in keys or column in ('run', 'sample') or \
+                    isinstance(value, (str, bool)):
+                continue
+            values = np.array([row[column] for row in group])
+            summary[f'mean {column}'] = float(values.mean())
+            summary[f'max {column}'] = float(values.max())
+        table.append(summary)
+
+    return table
+
+
+def writeTable(rows, path):
+    """Write rows of results to a CSV file"""
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Run a scenario over a sweep of parameters'
+    )
+    parser.add_argument('spec', help='JSON sweep spec')
+    parser.add_argument('output', help='CSV table with a row per run')
+    parser.add_argument('--workers', type=int, help='default: all cores')
+    parser.add_argument('--aggregate', metavar='FILE',
+                        help='CSV table with a row per sweep point, over the '
+                        'perturbations')
+    args = parser.parse_args(argv)
+
+    with open(args.spec) as file:
+        spec = json.load(file)
+
+    # Paths in the spec are relative to it
+    conditions = spec['conditions']
+    if isinstance(conditions, str) and not os.path.isabs(conditions):
+        spec['conditions'] = os.path.join(
+            os.path.dirname(args.spec), conditions
+        )
+
+    runs = len(expandSweep(spec))
+    start = time.perf_counter()
+    rows = runEnsemble(spec, args.workers, lambda done: print(
+        f'{done}/{runs} runs  {time.perf_counter() - start:.1f} s'
+    ))
+
+    writeTable(rows, args.output)
+    if args.aggregate:
+        writeTable(aggregate(rows, list(spec.get('sweep', {}))),
+                   args.aggregate)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+"""Render simulations to image files or a raw video stream, without a window
+
+Frames are drawn by an offscreen View, from a run simulated on the fly or
+from a recording written by TrajectoryWriter, and written either as a
+numbered image sequence or as raw RGB24 frames to a file or the standard
+output, ready to be piped into a video encoder:
+
+    python -m src.export run - --raw | ffmpeg -f rawvideo -pix_fmt rgb24 \
+        -s 800x600 -r 60 -i - run.mp4
+
+A recording is split in chunks of consecutive frames that a pool of
+processes render and encode in parallel. A simulated run has to be stepped
+in order, so its frames are drawn as it goes and only encoded in the pool.
+Run `python -m src.export --help` from the repository root.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pygame
+
+from .App import SCREEN_WIDTH, SCREEN_HEIGHT, FPS
+from .Trajectory import Trajectory
+from .Universe import Universe, ENGINES, COLLISIONS
+from .View import View
+from .headless import loadInitialConditions, universeOptions, \
+    REPORT_INTERVAL
+from .integrators import INTEGRATORS
+from .replay import Replay, TRAIL_FRAMES
+from .vecN import Vec2
+
+
+FRAME_NAME = 'frame_{:06d}.{}'
+CHUNK_FRAMES = 32
+# Frames or chunks queued per worker before waiting for the oldest
+QUEUED_PER_WORKER = 2
+# Universe settings of the command line, --workers being the encoders'
+UNIVERSE_SETTINGS = ('engine', 'integrator', 'softening', 'collisions')
+
+
+# Replay and view of a recording, set in each worker process
+_worker = {}
+
+
+def _encode(path, size, data):
+    """Worker task: save a raw RGB frame as an image file"""
+    pygame.image.save(pygame.image.fromstring(data, size, 'RGB'), path)
+
+
+def _openRecording(path, size, camera, trailFrames):
+    """Worker initializer: load a recording and an offscreen view"""
+    _worker['replay'] = Replay(path, trailFrames=trailFrames)
+    _worker['view'] = view = offscreenView(size)
+    view.camCenter, view.camSize = Vec2(camera[0], camera[1]), camera[2]
+
+
+def _renderFrames(frames, first, directory=None, imageFormat='png'):
+    """Worker task: draw recorded frames, in order
+
+    Each frame is saved to the directory if one is given, numbered from
+    first, otherwise the raw RGB frames are returned.
+    """
+    replay, view = _worker['replay'], _worker['view']
+    rendered = []
+
+    for index, frame in enumerate(frames, first):
+        replay.showFrame(frame)
+        view.drawUniverse(replay.universe)
+        if directory is None:
+            rendered.append(pygame.image.tostring(view.screen, 'RGB'))
+        else:
+            pygame.image.save(view.screen, os.path.join(
+                directory, FRAME_NAME.format(index, imageFormat)
+            ))
+
+    return rendered
+
+
+def offscreenView(size=None):
+    """View drawing frames that only depend on the state they show
+
+    Overwritten trail points are never left on the trail layer, so a frame
+    is the same however many frames were drawn before it.
+    """
+    view = View(*(size or (SCREEN_WIDTH, SCREEN_HEIGHT)), offscreen=True)
+    view.trailSlack = 0
+    return view
+
+
+class ImageSequence:
+    """Writes frames as numbered image files, encoded by a pool of processes
+
+    The format is given by the file extension, any that pygame can save.
+    """
+
+    def __init__(self, directory, size, imageFormat='png', workers=None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.size = size
+        self.imageFormat = imageFormat
+        self.workers = workers or os.cpu_count()
+        self._pool = None
+        self._pending = deque()
+
+    def write(self, index, data):
+        """Queue a raw RGB frame to be encoded"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        while len(self._pending) >= QUEUED_PER_WORKER * self.workers:
+            self._pending.popleft().result()
+
+        self._pending.append(self._pool.submit(
+            _encode, self.path(index), self.size, data
+        ))
+
+    def path(self, index):
+        """File the frame of the given index is written to"""
+        return os.path.join(
+            self.directory, FRAME_NAME.format(index, self.imageFormat)
+        )
+
+    def close(self):
+        """Wait for every frame to be written"""
+        try:
+            while self._pending:
+                self._pending.popleft().result()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+class RawStream:
+    """Writes frames as raw RGB24 bytes to a file, or '-' for stdout"""
+
+    def __init__(self, path):
+        self._owned = path != '-'
+        self.file = open(path, 'wb') if self._owned else sys.stdout.buffer
+
+    def write(self, index, data):
+        self.file.write(data)
+
+    def close(self):
+        if self._owned:
+            self.file.close()
+        else:
+            self.file.flush()
+
+
+def exportRun(universe, sink, frames, every=1, size=None, report=None):
+    """Step a universe, drawing a frame every 'every' steps to the sink
+
+    The first frame is the current state. The camera frames the planets of
+    that first frame and stays put. report, if given, is called with the
+    number of frames done after each one. Returns the number of frames.
+    """
+    view = offscreenView(size)
+
+    for index in range(frames):
+        if index:
+            for _ in range(every):
+                universe.stepTime()
+
+        view.drawUniverse(universe)
+        sink.write(index, pygame.image.tostring(view.screen, 'RGB'))
+        if report:
+            report(index + 1)
+
+    return frames
+
+
+def exportRecording(path, output, size=None, speed=1.0, frames=None,
+                    trailFrames=TRAIL_FRAMES, imageFormat='png', raw=False,
+                    workers=None, report=None):
+    """Render a recording with a pool of processes
+
+    Output frames are taken every 'speed' recorded frames, up to 'frames'
+    of them. With raw the frames are written as RGB24 bytes to the output
+    file, '-' being stdout, otherwise as numbered images to the output
+    directory. The camera frames the planets of the first frame. Returns
+    the number of frames.
+    """
+    size = size or (SCREEN_WIDTH, SCREEN_HEIGHT)
+    workers = workers or os.cpu_count()
+
+    replay = Replay(path, trailFrames=trailFrames)
+    indices = np.arange(0, len(replay.recording), speed).astype(int)
+    indices = indices[:frames].tolist()
+    replay.showFrame(0)
+    view = offscreenView(size)
+    view._setUpCamera(replay.universe.planets)
+    camera = (view.camCenter.x, view.camCenter.y, view.camSize)
+
+    if raw:
+        sink = RawStream(output)
+    else:
+        os.makedirs(output, exist_ok=True)
+
+    done = 0
+    pending = deque()
+    pool = ProcessPoolExecutor(
+        workers, initializer=_openRecording,
+        initargs=(path, size, camera, trailFrames)
+    )
+
+    def collect():
+        nonlocal done
+        count, future = pending.popleft()
+        for offset, data in enumerate(future.result()):
+            sink.write(done + offset, data)
+        done += count
+        if report:
+            report(done)
+
+    try:
+        for first in range(0, len(indices), CHUNK_FRAMES):
+            chunk = indices[first:first + CHUNK_FRAMES]
+            pending.append((len(chunk), pool.submit(
+                _renderFrames, chunk, first, None if raw else output,
+                imageFormat
+            )))
+            if len(pending) >= QUEUED_PER_WORKER * workers:
+                collect()
+        while pending:
+            collect()
+    finally:
+        pool.shutdown(cancel_futures=True)
+        if raw:
+            sink.close()
+
+    return done
+
+
+def parseSize(text):
+    """Frame size from a 'WIDTHxHEIGHT' string"""
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Render a run or a recording to images or raw video'
+    )
+    parser.add_argument('source', help='recording directory, JSON initial '
+                        'conditions or .npz checkpoint')
+    parser.add_argument('output', help='directory for the images, or with '
+                        '--raw a file or - for stdout')
+    parser.add_argument('--raw', action='store_true',
+                        help='write raw RGB24 frames instead of images')
+    parser.add_argument('--format', default='png',
+                        help='image file format (default: png)')
+    parser.add_argument('--size', type=parseSize,
+                        default=(SCREEN_WIDTH, SCREEN_HEIGHT),
+                        help='frame size as WIDTHxHEIGHT')
+    parser.add_argument('--frames', type=int,
+                        help='number of frames (default: the whole '
+                        'recording)')
+    parser.add_argument('--trail', type=int, default=TRAIL_FRAMES,
+                        help='number of past frames drawn as trails')
+    parser.add_argument('--workers', type=int, help='default: all cores')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='recorded frames per output frame')
+    parser.add_argument('--every', type=int, default=1,
+                        help='simulated steps per output frame')
+    parser.add_argument('--engine', choices=ENGINES,
+                        help="default: numpy, or the checkpoint's")
+    parser.add_argument('--integrator', choices=INTEGRATORS,
+                        help="default: leapfrog, or the checkpoint's")
+    parser.add_argument('--softening', type=float,
+                        help='Plummer softening length (default: 0)')
+    parser.add_argument('--collisions', choices=COLLISIONS,
+                        help='default: none')
+    args = parser.parse_args(argv)
+
+    start = lastReport = time.perf_counter()
+
+    def report(done):
+        nonlocal lastReport
+        now = time.perf_counter()
+        if now - lastReport >= REPORT_INTERVAL:
+            lastReport = now
+            print(f'{done} frames  {done / (now - start):.1f} frames/s',
+                  file=sys.stderr)
+
+    if os.path.isdir(args.source):
+        done = exportRecording(
+            args.source, args.output, args.size, args.speed, args.frames,
+            args.trail, args.format, args.raw, args.workers, report
+        )
+    else:
+        if args.frames is None:
+            parser.error('--frames is required to render a run')
+
+        # Settings given on the command line replace a checkpoint's
+        options = universeOptions(args, UNIVERSE_SETTINGS)
+        try:
+            if args.source.endswith('.npz'):
+                universe = Universe.loadCheckpoint(args.source, **options)
+            else:
+                universe = loadInitialConditions(
+                    args.source, **{'integrator': 'leapfrog', **options}
+                )
+        except ValueError as error:
+            parser.error(str(error))
+        for planet in universe.planets:
+            planet.trajectory = Trajectory(args.trail, args.every)
+
+        sink = RawStream(args.output) if args.raw else ImageSequence(
+            args.output, args.size, args.format, args.workers
+        )
+        try:
+            done = exportRun(
+                universe, sink, args.frames, args.every, args.size, report
+            )
+        finally:
+            sink.close()
+
+    elapsed = time.perf_counter() - start
+    print(f'{done} frames in {elapsed:.1f} s, '
+          f'{done / elapsed / FPS:.2f}x real time at {FPS} fps',
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
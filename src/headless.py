@@ -0,0 +1,223 @@
+"""Run simulations without the GUI
+
+Nothing in this module imports pygame, so it can be used on servers with no
+display. Run `python -m src.headless --help` from the repository root.
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from .Planet import Planet
+from .Universe import Universe, ENGINES, COLLISIONS
+from .integrators import INTEGRATORS
+from .monitor import ConservationMonitor
+from .profiling import Profiler
+from .recording import TrajectoryWriter
+from .vecN import Vec3
+
+
+REPORT_INTERVAL = 1.0
+# Universe settings that can be given on the command line
+UNIVERSE_OPTIONS = (
+    'engine', 'theta', 'workers', 'integrator', 'softening', 'adaptive',
+    'collisions'
+)
+
+
+def loadInitialConditions(path, trajectoryCapacity=0, **universeKwargs):
+    """Create a universe from a JSON initial conditions file
+
+    The file holds the time step 'dt', optionally 'gravConst', and a list of
+    'planets', each with 'mass', 'pos' and 'vel' and optionally 'color' and
+    'radius'. Trajectories are not recorded unless a trajectoryCapacity is
+    given. Other keyword arguments are passed on to the Universe.
+    """
+    with open(path) as file:
+        conditions = json.load(file)
+
+    universe = Universe(
+        conditions['dt'], conditions.get('gravConst', 1), **universeKwargs
+    )
+    universe.setPlanets([
+        Planet(
+            planet['mass'],
+            Vec3(*map(float, planet['pos'])),
+            Vec3(*map(float, planet['vel'])),
+            tuple(planet.get('color', (255, 255, 255))),
+            planet.get('radius', 2),
+            trajectoryCapacity
+        )
+        for planet in conditions['planets']
+    ])
+
+    return universe
+
+
+def universeOptions(args, names=UNIVERSE_OPTIONS):
+    """Universe settings given on the command line, as keyword arguments
+
+    The options left out are None, so the Universe defaults, or the
+    settings saved in a checkpoint, apply to them.
+    """
+    return {
+        name: getattr(args, name) for name in names
+        if getattr(args, name, None) is not None
+    }
+
+
+def formatProgress(stats, totalSteps=None):
+    """One line readout of the progress and throughput of a run"""
+    steps = f'{stats["steps"]}' + (f'/{totalSteps}' if totalSteps else '')
+
+    return f'step {steps}  t={stats["time"]:.4g}  ' \
+        f'{stats["stepsPerSec"]:.1f} steps/s  ' \
+        f'{stats["bodyStepsPerSec"]:.3g} body-steps/s'
+
+
+def run(universe, steps=None, until=None, report=None,
+        reportInterval=REPORT_INTERVAL):
+    """Step the universe a number of steps or up to a simulated time
+
+    If report is given it is called with the current statistics at most
+    every reportInterval seconds of wall time, and once at the end. Returns
+    the final statistics: steps done, simulated time, elapsed wall time,
+    steps/sec and body-steps/sec.
+    """
+    if steps is None and until is None:
+        raise ValueError('either steps or until must be given')
+
+    if until is not None:
+        # Half a step of tolerance to avoid an extra step from rounding
+        untilSteps = int(np.ceil((until - universe.time) / universe.dt - 0.5))
+        steps = untilSteps if steps is None else min(steps, untilSteps)
+
+    numBodies = len(universe.planets)
+    start = lastReport = time.perf_counter()
+
+    def stats(done):
+        elapsed = time.perf_counter() - start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        return {
+            'steps': done,
+            'time': universe.time,
+            'elapsed': elapsed,
+            'stepsPerSec': rate,
+            'bodyStepsPerSec': rate * numBodies
+        }
+
+    for step in range(1, steps + 1):
+        universe.stepTime()
+
+        if report and time.perf_counter() - lastReport >= reportInterval:
+            report(stats(step))
+            lastReport = time.perf_counter()
+
+    result = stats(max(steps, 0))
+    if report:
+        report(result)
+
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Run a planet simulation without the GUI'
+    )
+    parser.add_argument('conditions',
+                        help='JSON initial conditions or .npz checkpoint')
+    parser.add_argument('output', help='.npz checkpoint of the final state')
+    parser.add_argument('--steps', type=int, help='number of steps to run')
+    parser.add_argument('--until', type=float, help='simulated time to reach')
+    parser.add_argument('--engine', choices=ENGINES,
+                        help="default: numpy, or the checkpoint's")
+    parser.add_argument('--theta', type=float,
+                        help='Barnes-Hut opening angle (default: 0.5)')
+    parser.add_argument('--workers', type=int, help='default: 1')
+    parser.add_argument('--integrator', choices=INTEGRATORS,
+                        help="default: euler, or the checkpoint's")
+    parser.add_argument('--softening', type=float,
+                        help='Plummer softening length (default: 0)')
+    parser.add_argument('--adaptive', action='store_true', default=None,
+                        help='use block time steps (needs leapfrog and '
+                        'softening)')
+    parser.add_argument('--collisions', choices=COLLISIONS,
+                        help='merge or bounce overlapping bodies (default: '
+                        'none)')
+    parser.add_argument('--record', metavar='DIR',
+                        help='stream positions and velocities to DIR')
+    parser.add_argument('--record-every', type=int, default=1, metavar='K',
+                        help='record one of every K steps')
+    parser.add_argument('--monitor', metavar='FILE',
+                        help='save the energy, momenta and center of mass '
+                        'of every step to a .npz FILE')
+    parser.add_argument('--check-accuracy', action='store_true',
+                        help="print the error of the engine's field against "
+                        'the direct sum at the end')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='save the time spent in each phase to FILE')
+    parser.add_argument('--quiet', action='store_true',
+                        help="don't print the progress readout")
+    args = parser.parse_args(argv)
+
+    if args.steps is None and args.until is None:
+        parser.error('one of --steps or --until is required')
+
+    # Settings given on the command line replace a checkpoint's
+    load = Universe.loadCheckpoint if args.conditions.endswith('.npz') \
+        else loadInitialConditions
+    try:
+        universe = load(args.conditions, **universeOptions(args))
+    except ValueError as error:
+        parser.error(str(error))
+    total = args.steps if args.until is None else None
+
+    # Merging changes the number of bodies, which a recording can't follow
+    if args.record and universe.collisions == 'merge':
+        parser.error("--record can't be used with merging collisions")
+
+    def report(stats):
+        print(formatProgress(stats, total), file=sys.stderr)
+
+    writer = None
+    if args.record:
+        writer = TrajectoryWriter(args.record, args.record_every)
+        universe.addOutput(writer)
+
+    monitor = None
+    if args.monitor:
+        monitor = ConservationMonitor()
+        universe.addOutput(monitor)
+
+    profiler = None
+    if args.profile:
+        profiler = Profiler()
+        profiler.attach(universe)
+
+    try:
+        run(universe, args.steps, args.until, None if args.quiet else report)
+    finally:
+        if writer:
+            writer.close()
+        if profiler:
+            profiler.detach()
+            profiler.save(args.profile)
+        if monitor:
+            series = monitor.series()
+            np.savez(args.monitor, **series)
+            if not args.quiet:
+                print(f'energy error {series["energyError"][-1]:.3e}',
+                      file=sys.stderr)
+
+    if args.check_accuracy:
+        error = universe.fieldError()
+        print(f'field error max {error["max"]:.3e} rms {error["rms"]:.3e}',
+              file=sys.stderr)
+
+    universe.saveCheckpoint(args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Time integrators for the (N, 3) position and velocity arrays
+
+Each integrator advances pos and vel in place by one time step dt, calling
+field(pos) for the acceleration at a given set of positions.
+"""
+
+_CBRT2 = 2**(1 / 3)
+_W1 = 1 / (2 - _CBRT2)
+_W0 = -_CBRT2 * _W1
+YOSHIDA_KICKS = (_W1 / 2, (_W0 + _W1) / 2, (_W0 + _W1) / 2, _W1 / 2)
+YOSHIDA_DRIFTS = (_W1, _W0, _W1)
+
+
+def euler(pos, vel, dt, field):
+    """Explicit Euler, moving with the velocity from before the kick"""
+    acc = field(pos)
+    pos += vel * dt
+    vel += acc * dt
+
+
+def leapfrog(pos, vel, dt, field):
+    """Second order symplectic kick-drift-kick leapfrog (velocity Verlet)"""
+    vel += 0.5 * dt * field(pos)
+    pos += vel * dt
+    vel += 0.5 * dt * field(pos)
+
+
+def yoshida4(pos, vel, dt, field):
+    """Fourth order symplectic Yoshida composition of leapfrog steps"""
+    for kick, drift in zip(YOSHIDA_KICKS, YOSHIDA_DRIFTS):
+        vel += kick * dt * field(pos)
+        pos += drift * dt * vel
+    vel += YOSHIDA_KICKS[-1] * dt * field(pos)
+
+
+def rk4(pos, vel, dt, field):
+    """Classical fourth order Runge-Kutta"""
+    k1x, k1v = vel.copy(), field(pos)
+    k2x, k2v = vel + 0.5 * dt * k1v, field(pos + 0.5 * dt * k1x)
+    k3x, k3v = vel + 0.5 * dt * k2v, field(pos + 0.5 * dt * k2x)
+    k4x, k4v = vel + dt * k3v, field(pos + dt * k3x)
+
+    pos += dt / 6 * (k1x + 2 * k2x + 2 * k3x + k4x)
+    vel += dt / 6 * (k1v + 2 * k2v + 2 * k3v + k4v)
+
+
+INTEGRATORS = {
+    'euler': euler,
+    'leapfrog': leapfrog,
+    'yoshida4': yoshida4,
+    'rk4': rk4,
+}
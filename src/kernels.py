@@ -0,0 +1,129 @@
+import numpy as np
+
+
+BLOCK_SIZE = 256
+BATCH_PAIRS = 2**16
+
+
+def directField(pos, mass, gravConst, targets=None, softening=0.0,
+                potential=None):
+    """Gravitational field on the target bodies due to all the others
+
+    Pairwise sum over the contiguous (N, 3) position and (N,) mass arrays.
+    targets is a slice or an index array selecting the bodies the field is
+    computed on, all of them by default. With a Plummer softening length
+    the 1/r^2 law is smoothed out at distances below it. Targets are
+    processed in blocks so memory stays O(BLOCK_SIZE * N).
+
+    If a potential array is given, the gravitational potential on the
+    targets is written to it in the same pass. The field on all the bodies
+    goes through _symmetricField, which visits each pair once.
+    """
+    if targets is None:
+        return _symmetricField(pos, mass, gravConst, softening, potential)
+
+    targets = np.arange(len(pos))[targets]
+    field = np.empty((len(targets), 3))
+
+    for block_start in range(0, len(targets), BLOCK_SIZE):
+        block = targets[block_start:block_start + BLOCK_SIZE]
+        rows = np.arange(len(block))
+
+        disp = pos[np.newaxis, :, :] - pos[block, np.newaxis]
+        dist2 = np.einsum('ijk,ijk->ij', disp, disp)
+        if softening:
+            dist2 += softening**2
+        dist2[rows, block] = np.inf
+
+        inverse = gravConst * mass / np.sqrt(dist2)
+        field[block_start:block_start + len(block)] = \
+            np.einsum('ijk,ij->ik', disp, inverse / dist2)
+        if potential is not None:
+            potential[block_start:block_start + len(block)] = \
+                -inverse.sum(axis=1)
+
+    return field
+
+
+def _symmetricField(pos, mass, gravConst, softening=0.0, potential=None):
+    """Gravitational field on every body, each pair computed once
+
+    The bodies are split in blocks of BLOCK_SIZE and only the tiles of
+    pairs on or above the diagonal are computed. By Newton's third law the
+    distances of a tile give the field on both of its blocks, halving the
+    square roots and divisions of directField. Memory stays
+    O(BLOCK_SIZE^2).
+    """
+    field = np.zeros((len(pos), 3))
+    if potential is not None:
+        potential[:] = 0
+
+    for start in range(0, len(pos), BLOCK_SIZE):
+        rows = slice(start, start + BLOCK_SIZE)
+        for other in range(start, len(pos), BLOCK_SIZE):
+            columns = slice(other, other + BLOCK_SIZE)
+
+            disp = pos[np.newaxis, columns] - pos[rows, np.newaxis]
+            dist2 = np.einsum('ijk,ijk->ij', disp, disp)
+            if softening:
+                dist2 += softening**2
+            if other == start:
+                np.fill_diagonal(dist2, np.inf)
+
+            inverse = gravConst / np.sqrt(dist2)
+            inverse3 = inverse / dist2
+            field[rows] += np.einsum(
+                'ijk,ij->ik', disp, inverse3 * mass[columns]
+            )
+            if potential is not None:
+                potential[rows] -= inverse @ mass[columns]
+            if other == start:
+                continue
+
+            field[columns] -= np.einsum(
+                'ijk,ij->jk', disp, inverse3 * mass[rows, np.newaxis]
+            )
+            if potential is not None:
+                potential[columns] -= mass[rows] @ inverse
+
+    return field
+
+
+def batchedField(pos, mass, gravConst, softening=0.0, potential=None):
+    """Gravitational field on every body of a stack of independent systems
+
+    pos is a (S, N, 3) array of S systems of N bodies and mass (S, N); the
+    bodies of a system only feel each other. gravConst is one value or one
+    per system. The whole stack is summed in batched array operations, in
+    blocks of systems so memory stays O(BATCH_PAIRS), which pays off for
+    many systems of a few bodies.
+
+    If a (S, N) potential array is given, the gravitational potential on
+    every body is written to it in the same pass.
+    """
+    numSystems, numBodies = mass.shape
+    gravConst = np.broadcast_to(
+        np.asarray(gravConst, dtype=float).reshape(-1, 1, 1),
+        (numSystems, 1, 1)
+    )
+    diagonal = np.arange(numBodies)
+    blockSize = max(1, BATCH_PAIRS // max(1, numBodies**2))
+    field = np.empty((numSystems, numBodies, 3))
+
+    for start in range(0, numSystems, blockSize):
+        block = slice(start, start + blockSize)
+        blockPos = pos[block]
+
+        disp = blockPos[:, np.newaxis, :, :] - blockPos[:, :, np.newaxis, :]
+        dist2 = np.einsum('sijk,sijk->sij', disp, disp)
+        if softening:
+            dist2 += softening**2
+        dist2[:, diagonal, diagonal] = np.inf
+
+        inverse = gravConst[block] * mass[block, np.newaxis, :] / \
+            np.sqrt(dist2)
+        field[block] = np.einsum('sijk,sij->sik', disp, inverse / dist2)
+        if potential is not None:
+            potential[block] = -inverse.sum(axis=2)
+
+    return field
@@ -0,0 +1,88 @@
+"""Tracking of the quantities a closed system conserves"""
+import numpy as np
+
+
+class ConservationMonitor:
+    """Time series of energy, momenta and center of mass of a universe
+
+    Attach it with Universe.addOutput, which records the initial state and
+    then every step, or one of every 'every' steps. The potential energy
+    comes out of the universe's own field pass, which computes it along
+    with the field while the monitor is attached, so recording is O(N).
+    """
+
+    usesPotential = True
+
+    def __init__(self, every=1):
+        if every < 1:
+            raise ValueError('every must be >= 1')
+
+        self.every = every
+        self._calls = 0
+        self._records = {
+            name: [] for name in (
+                'time', 'kinetic', 'potential', 'mass', 'momentum',
+                'angularMomentum', 'centerOfMass'
+            )
+        }
+
+    def __len__(self):
+        return len(self._records['time'])
+
+    def record(self, universe):
+        """Take the conserved quantities of the universe"""
+        self._calls += 1
+        if (self._calls - 1) % self.every:
+            return
+
+        mass, pos, vel = universe.masses, universe.positions, \
+            universe.velocities
+        records = self._records
+
+        records['time'].append(universe.time)
+        records['kinetic'].append(
+            0.5 * mass @ np.einsum('ij,ij->i', vel, vel)
+        )
+        records['potential'].append(0.5 * mass @ universe.potentials())
+        records['mass'].append(mass.sum())
+        records['momentum'].append(mass @ vel)
+        records['angularMomentum'].append(mass @ np.cross(pos, vel))
+        records['centerOfMass'].append(universe.centerOfMass().copy())
+
+    def series(self):
+        """The recorded quantities, and their drifts, as arrays
+
+        Besides the time, kinetic, potential and total 'energy', mass,
+        'momentum', 'angularMomentum' and 'centerOfMass' records, it holds
+        the relative 'energyError' and the absolute 'momentumDrift' and
+        'angularMomentumDrift' against the first record. The
+        'centerOfMassDrift' is the distance from the center of mass to
+        where the initial momentum would have carried it.
+        """
+        series = {
+            name: np.array(values) for name, values in self._records.items()
+        }
+        for name in ('momentum', 'angularMomentum', 'centerOfMass'):
+            series[name] = series[name].reshape(-1, 3)
+        series['energy'] = series['kinetic'] + series['potential']
+        if not len(self):
+            return series
+
+        energy = series['energy']
+        series['energyError'] = np.abs(energy - energy[0]) / \
+            (abs(energy[0]) or 1.0)
+        series['momentumDrift'] = np.linalg.norm(
+            series['momentum'] - series['momentum'][0], axis=1
+        )
+        series['angularMomentumDrift'] = np.linalg.norm(
+            series['angularMomentum'] - series['angularMomentum'][0], axis=1
+        )
+
+        velocity = series['momentum'][0] / series['mass'][0]
+        expected = series['centerOfMass'][0] + \
+            (series['time'] - series['time'][0])[:, np.newaxis] * velocity
+        series['centerOfMassDrift'] = np.linalg.norm(
+            series['centerOfMass'] - expected, axis=1
+        )
+
+        return series
@@ -0,0 +1,142 @@
+"""Opt-in timers for the phases of a simulation and of its drawing
+
+A Profiler attaches to a universe and a view by shadowing their hot
+methods with timed wrappers on the instances. The classes are untouched,
+so nothing is paid while no profiler is attached, and detaching removes
+the wrappers again.
+"""
+import functools
+import json
+import time
+
+
+# Phases of a universe and of a view, as (method, phase name)
+UNIVERSE_PHASES = (
+    ('stepTime', 'step'),
+    ('_computeField', 'force'),
+    ('_pairFields', 'force'),
+    ('_appendTrajectories', 'trajectories'),
+    ('_handleCollisions', 'collisions'),
+)
+VIEW_PHASES = (
+    ('drawUniverse', 'draw'),
+    ('_drawPlanets', 'draw planets'),
+    ('handleEvents', 'events'),
+)
+
+
+class Profiler:
+    """Call counts and wall times of the phases of a run
+
+    The phases are stepping ('step'), the field evaluations ('force'),
+    trajectory bookkeeping ('trajectories' and 'planet update', the python
+    engine's per planet step), collisions, and the view's drawing and
+    event handling. The time of a step not spent in its inner phases is
+    reported as 'integration'.
+    """
+
+    def __init__(self):
+        self.timers = {}
+        self.start = time.perf_counter()
+        self._patched = []
+        self._running = {}
+
+    def attach(self, universe=None, view=None):
+        """Start timing the phases of a universe and a view"""
+        if universe is not None:
+            for method, phase in UNIVERSE_PHASES:
+                self.instrument(universe, method, phase)
+            for planet in universe.planets:
+                self.instrument(planet, 'update', 'planet update')
+        if view is not None:
+            for method, phase in VIEW_PHASES:
+                self.instrument(view, method, phase)
+
+    def detach(self):
+        """Remove every timed wrapper"""
+        for obj, method in reversed(self._patched):
+            delattr(obj, method)
+        self._patched = []
+
+    def instrument(self, obj, method, phase):
+        """Time the calls of an object's method under the given phase
+
+        Calls made while another call of the same phase runs, like the
+        python engine's _pairFields within _computeField, are part of the
+        outer one and aren't counted again.
+        """
+        func = getattr(obj, method)
+        timer = self.timers.setdefault(phase, [0, 0.0, 0.0])
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            if self._running.get(phase):
+                return func(*args, **kwargs)
+
+            self._running[phase] = True
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._running[phase] = False
+                elapsed = time.perf_counter() - start
+                timer[0] += 1
+                timer[1] += elapsed
+                timer[2] = max(timer[2], elapsed)
+
+        setattr(obj, method, timed)
+        self._patched.append((obj, method))
+
+    def reset(self):
+        """Zero every timer"""
+        for timer in self.timers.values():
+            timer[:] = [0, 0.0, 0.0]
+        self.start = time.perf_counter()
+
+    def report(self):
+        """Calls, total, mean and maximum seconds of each phase, as a dict"""
+        phases = {
+            phase: {
+                'calls': calls, 'total': total,
+                'mean': total / calls if calls else 0.0, 'max': longest
+            }
+            for phase, (calls, total, longest) in self.timers.items()
+        }
+
+        if 'step' in phases:
+            step = phases['step']
+            inner = sum(
+                phases[phase]['total'] for phase in
+                ('force', 'trajectories', 'planet update', 'collisions')
+                if phase in phases
+            )
+            total = max(step['total'] - inner, 0.0)
+            phases['integration'] = {
+                'calls': step['calls'], 'total': total,
+                'mean': total / step['calls'] if step['calls'] else 0.0,
+                'max': None
+            }
+
+        return {
+            'elapsed': time.perf_counter() - self.start, 'phases': phases
+        }
+
+    def summary(self):
+        """Lines of text with the mean time and share of each phase"""
+        report = self.report()
+        lines = []
+        for phase, stats in sorted(report['phases'].items(),
+                                   key=lambda item: -item[1]['total']):
+            share = stats['total'] / report['elapsed'] if report['elapsed'] \
+                else 0.0
+            lines.append(
+                f'{phase:<14} {stats["calls"]:>8} '
+                f'{1e3 * stats["mean"]:>9.3f} ms {100 * share:>5.1f}%'
+            )
+
+        return lines
+
+    def save(self, path):
+        """Write the report to a JSON file"""
+        with open(path, 'w') as file:
+            json.dump(self.report(), file, indent=2)
@@ -0,0 +1,171 @@
+"""Streaming record of a simulation to disk, and reading it back
+
+A recording is a directory with 'positions.npy' and 'velocities.npy' of
+shape (frames, bodies, 3), 'times.npy' of shape (frames,) and 'initial.npz'
+with the universe's first checkpoint, minus the trajectories. Frames are
+appended in chunks and the .npy headers rewritten after each one, so the
+files can be memory mapped with numpy.load while the run is still going.
+"""
+import os
+
+import numpy as np
+
+
+CHUNK_FRAMES = 256
+HEADER_LENGTH = 128
+MAGIC = b'\x93NUMPY\x01\x00'
+
+
+def _npyHeader(shape):
+    """Version 1.0 .npy header of a float64 array, padded to HEADER_LENGTH"""
+    header = repr({
+        'descr': '<f8', 'fortran_order': False, 'shape': tuple(shape)
+    }).encode('latin1')
+    padding = HEADER_LENGTH - len(MAGIC) - 2 - len(header) - 1
+    header += b' ' * padding + b'\n'
+
+    return MAGIC + np.uint16(len(header)).tobytes() + header
+
+
+class _ArrayFile:
+    """A float64 .npy file whose first dimension grows as rows are added"""
+
+    def __init__(self, path, rowShape):
+        self.rowShape = tuple(rowShape)
+        self.rows = 0
+        self.file = open(path, 'wb')
+        self.file.write(_npyHeader((0, *self.rowShape)))
+        self.file.flush()
+
+    def append(self, rows):
+        """Write rows at the end and update the header"""
+        self.file.write(np.ascontiguousarray(rows, dtype='<f8').tobytes())
+        self.rows += len(rows)
+        self.file.seek(0)
+        self.file.write(_npyHeader((self.rows, *self.rowShape)))
+        self.file.seek(0, os.SEEK_END)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class TrajectoryWriter:
+    """Records positions and velocities of a universe every few steps
+
+    Attach it with Universe.addOutput, which makes the universe call
+    record after every step. Frames are kept in a fixed size chunk buffer,
+    so memory stays constant however long the run is.
+    """
+
+    def __init__(self, path, every=1, chunkFrames=CHUNK_FRAMES):
+        if every < 1 or chunkFrames < 1:
+            raise ValueError('every and chunkFrames must be >= 1')
+
+        self.path = path
+        self.every = every
+        self.chunkFrames = chunkFrames
+        self.frames = 0
+        self._calls = 0
+        self._buffered = 0
+        self._files = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, universe):
+        """Take a frame of the universe, once every 'every' calls"""
+        self._calls += 1
+        if (self._calls - 1) % self.every:
+            return
+
+        if self._files is None:
+            self._open(universe)
+        if len(universe.positions) != self._pos.shape[1]:
+            raise ValueError('the number of bodies changed while recording')
+
+        self._pos[self._buffered] = universe.positions
+        self._vel[self._buffered] = universe.velocities
+        self._times[self._buffered] = universe.time
+        self._buffered += 1
+        self.frames += 1
+
+        if self._buffered == self.chunkFrames:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered frames to disk"""
+        if not self._buffered:
+            return
+
+        for file, buffer in zip(self._files,
+                                (self._pos, self._vel, self._times)):
+            file.append(buffer[:self._buffered])
+        self._buffered = 0
+
+    def close(self):
+        """Write the remaining frames and close the files"""
+        if self._files is None:
+            return
+
+        self.flush()
+        for file in self._files:
+            file.close()
+        self._files = None
+
+    def _open(self, universe):
+        """Create the recording directory and the chunk buffers"""
+        os.makedirs(self.path, exist_ok=True)
+
+        np.savez(os.path.join(self.path, 'initial.npz'),
+                 **universe.checkpoint(trajectories=False))
+
+        num = len(universe.positions)
+        self._pos = np.empty((self.chunkFrames, num, 3))
+        self._vel = np.empty((self.chunkFrames, num, 3))
+        self._times = np.empty(self.chunkFrames)
+        self._files = [
+            _ArrayFile(os.path.join(self.path, 'positions.npy'), (num, 3)),
+            _ArrayFile(os.path.join(self.path, 'velocities.npy'), (num, 3)),
+            _ArrayFile(os.path.join(self.path, 'times.npy'), ()),
+        ]
+
+
+class Recording:
+    """Read access to a recording, memory mapped without loading it"""
+
+    def __init__(self, path):
+        self.path = path
+        with np.load(os.path.join(path, 'initial.npz')) as initial:
+            self.initial = dict(initial)
+        self.reload()
+
+    def __len__(self):
+        return self.frames
+
+    def reload(self):
+        """Map the files again, to see the frames written since
+
+        While the run is going the files may be a chunk apart, so only the
+        frames present in all of them are exposed.
+        """
+        arrays = [self._map(name) for name in
+                  ('positions.npy', 'velocities.npy', 'times.npy')]
+        self.frames = min(len(array) for array in arrays)
+        self.positions, self.velocities, self.times = [
+            array[:self.frames] for array in arrays
+        ]
+
+    def _map(self, name):
+        path = os.path.join(self.path, name)
+        with open(path, 'rb') as file:
+            np.lib.format.read_magic(file)
+            shape, _, _ = np.lib.format.read_array_header_1_0(file)
+
+        if not shape[0]:
+            # Empty files can't be memory mapped
+            return np.empty(shape)
+        return np.load(path, mmap_mode='r')
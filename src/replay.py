@@ -0,0 +1,132 @@
+"""Play back a recorded run without simulating it again
+
+Run `python -m src.replay DIR` from the repository root, DIR being a
+recording written by TrajectoryWriter. Space pauses, `.` and `,` change the
+playback speed, `[` and `]` seek back and forward and Home restarts.
+"""
+import argparse
+import time
+
+import numpy as np
+import pygame
+
+from .App import SCREEN_WIDTH, SCREEN_HEIGHT, FPS
+from .Trajectory import Trajectory
+from .Universe import Universe
+from .View import View
+from .recording import Recording
+
+
+SPEED_FACTOR = 1.05
+SEEK_FRACTION = 0.05
+RELOAD_INTERVAL = 1.0
+TRAIL_FRAMES = 500
+
+
+class Replay:
+    """Shows a recording frame by frame through a View
+
+    Frames are read lazily from the memory mapped recording: only the
+    current frame and the trail before it are touched, so long recordings
+    open instantly. The speed is the number of recorded frames advanced per
+    rendered frame; fractional speeds accumulate and large ones skip frames.
+    While playing forward, the trails only get the frames passed since the
+    last one shown, so the view just draws the new segments.
+    """
+
+    def __init__(self, path, speed=1.0, trailFrames=TRAIL_FRAMES):
+        self.recording = Recording(path)
+        self.universe = Universe.fromCheckpoint(self.recording.initial)
+        self.trailFrames = trailFrames
+        self.speed = speed
+        self.frame = 0.0
+        self.pause = False
+        self._shownFrame = None
+
+        for planet in self.universe.planets:
+            planet.trajectory = Trajectory(trailFrames)
+
+    def run(self):
+        """Open the window and play the recording until it is closed"""
+        view = View(SCREEN_WIDTH, SCREEN_HEIGHT)
+        view.constructionMode = False
+        clock = pygame.time.Clock()
+        lastReload = time.perf_counter()
+
+        while view.running:
+            clock.tick(FPS)
+
+            # Follow a recording that is still being written
+            if time.perf_counter() - lastReload > RELOAD_INTERVAL:
+                self.recording.reload()
+                lastReload = time.perf_counter()
+
+            self.showFrame(int(self.frame))
+            view.drawUniverse(self.universe)
+            view.setStatus(
+                f'frame {int(self.frame)}/{len(self.recording)}, '
+                f't = {self.universe.time:.2f}, {self.speed:.2f}x'
+            )
+
+            action = view.handleEvents(self.universe)
+            if action:
+                self._handleAction(action)
+
+            if not self.pause:
+                self.seek(self.frame + self.speed)
+
+    def seek(self, frame):
+        """Move to a frame, clamped to the recorded ones"""
+        self.frame = min(max(frame, 0.0), max(len(self.recording) - 1, 0))
+
+    def showFrame(self, frame):
+        """Load a recorded frame, and the trail before it, into the universe"""
+        if not len(self.recording):
+            return
+
+        recording = self.recording
+        self.universe.positions[:] = recording.positions[frame]
+        self.universe.velocities[:] = recording.velocities[frame]
+        self.universe.time = float(recording.times[frame])
+
+        shown, self._shownFrame = self._shownFrame, frame
+        if shown is not None and 0 <= frame - shown < self.trailFrames:
+            passed = np.asarray(recording.positions[shown:frame])
+            for i, planet in enumerate(self.universe.planets):
+                planet.trajectory.extend(passed[:, i])
+            return
+
+        trail = recording.positions[max(frame - self.trailFrames, 0):frame]
+        for i, planet in enumerate(self.universe.planets):
+            planet.trajectory.setPoints(trail[:, i])
+
+    def _handleAction(self, action):
+        """React to the user's input"""
+        if action.type == 'PAUSE':
+            self.pause = not self.pause
+        if action.type == 'SPEED_UP':
+            self.speed *= SPEED_FACTOR
+        if action.type == 'SPEED_DOWN':
+            self.speed /= SPEED_FACTOR
+        if action.type == 'SEEK_BACK':
+            self.seek(self.frame - SEEK_FRACTION * len(self.recording))
+        if action.type == 'SEEK_FORWARD':
+            self.seek(self.frame + SEEK_FRACTION * len(self.recording))
+        if action.type in ('SEEK_START', 'STOP'):
+            self.seek(0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Play back a recorded run')
+    parser.add_argument('recording', help='directory written by --record')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='recorded frames per rendered frame')
+    parser.add_argument('--trail', type=int, default=TRAIL_FRAMES,
+                        help='number of past frames drawn as trails')
+    args = parser.parse_args(argv)
+
+    Replay(args.recording, args.speed, args.trail).run()
+
+
+if __name__ == '__main__':
+    main()
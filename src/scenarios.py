@@ -0,0 +1,210 @@
+"""Generators of large initial conditions
+
+Each generator returns a dict with the 'masses', 'positions' and
+'velocities' arrays of the bodies, which can be passed straight to
+Universe.setArrays:
+
+    universe.setArrays(**plummer(100000, seed=1))
+
+Everything is drawn with NumPy in whole arrays, from a seedable random
+generator, and the bodies are moved to their center of mass frame.
+Run `python -m src.scenarios --help` from the repository root to save a
+scenario as a checkpoint that the headless runner can resume.
+"""
+import argparse
+
+import numpy as np
+
+from .Universe import Universe, ENGINES, COLLISIONS
+from .headless import universeOptions
+from .integrators import INTEGRATORS
+
+
+def _centered(masses, positions, velocities):
+    """Move the bodies to their center of mass frame"""
+    total = masses.sum()
+    positions -= masses @ positions / total
+    velocities -= masses @ velocities / total
+
+    return {
+        'masses': masses, 'positions': positions, 'velocities': velocities
+    }
+
+
+def _isotropic(rng, lengths):
+    """Vectors with the given lengths pointing in random directions"""
+    directions = rng.normal(size=(len(lengths), 3))
+    directions /= np.linalg.norm(directions, axis=1)[:, np.newaxis]
+
+    return lengths[:, np.newaxis] * directions
+
+
+def plummer(n, mass=1.0, scale=1.0, gravConst=1.0, maxRadius=10.0,
+            seed=None):
+    """Plummer sphere in equilibrium, with scale length 'scale'
+
+    Radii are drawn from the inverse of the cumulative mass profile and
+    speeds by rejection sampling of the distribution function, as done by
+    Aarseth, Henon and Wielen. Bodies beyond maxRadius scale lengths are
+    drawn again.
+    """
+    rng = np.random.default_rng(seed)
+
+    radii = np.empty(n)
+    missing = np.arange(n)
+    while missing.size:
+        u = rng.uniform(size=missing.size)
+        radii[missing] = 1 / np.sqrt(u**(-2 / 3) - 1)
+        missing = missing[radii[missing] > maxRadius]
+
+    # q = v / v_escape has density proportional to q^2 (1 - q^2)^3.5
+    q = np.empty(n)
+    missing = np.arange(n)
+    while missing.size:
+        candidates = rng.uniform(size=missing.size)
+        accept = rng.uniform(0, 0.1, missing.size) < \
+            candidates**2 * (1 - candidates**2)**3.5
+        q[missing[accept]] = candidates[accept]
+        missing = missing[~accept]
+
+    escape = np.sqrt(2 * gravConst * mass / scale) * (1 + radii**2)**-0.25
+
+    return _centered(
+        np.full(n, mass / n),
+        _isotropic(rng, scale * radii),
+        _isotropic(rng, q * escape)
+    )
+
+
+def disk(n, mass=1.0, radius=1.0, centralMass=1.0, thickness=0.02,
+         gravConst=1.0, seed=None):
+    """Thin disk of n bodies in circular orbits around a central body
+
+    The surface density is uniform between 5% and 100% of the radius.
+    Orbital speeds are set from the mass enclosed within each body's
+    radius, central body included. The disk rotates around the z axis.
+    The central body is the first one.
+    """
+    rng = np.random.default_rng(seed)
+    bodies = n - 1
+
+    r = radius * np.sqrt(rng.uniform(0.05**2, 1, bodies))
+    angle = rng.uniform(0, 2 * np.pi, bodies)
+    positions = np.zeros((n, 3))
+    positions[1:, 0] = r * np.cos(angle)
+    positions[1:, 1] = r * np.sin(angle)
+    positions[1:, 2] = rng.normal(0, thickness * radius, bodies)
+
+    # Mass enclosed by each body: the central one and those further in
+    bodyMass = mass / max(bodies, 1)
+    masses = np.full(n, bodyMass)
+    masses[0] = centralMass
+    enclosed = np.empty(bodies)
+    enclosed[np.argsort(r)] = bodyMass * np.arange(bodies)
+    speed = np.sqrt(gravConst * (centralMass + enclosed) / r)
+
+    velocities = np.zeros((n, 3))
+    velocities[1:, 0] = -speed * np.sin(angle)
+    velocities[1:, 1] = speed * np.cos(angle)
+
+    return _centered(masses, positions, velocities)
+
+
+def galaxyCollision(n, mass=1.0, radius=1.0, centralMass=1.0,
+                    separation=6.0, impactParameter=1.0, inclination=0.5,
+                    gravConst=1.0, seed=None):
+    """Two disks on a parabolic-like approach, the second one tilted
+
+    The disks are separated by 'separation' radii along x and offset by
+    'impactParameter' radii along y. The second disk is tilted by
+    'inclination' radians around the x axis. Each disk gets half of the n
+    bodies and falls towards the other at the escape speed of the pair.
+    """
+    rng = np.random.default_rng(seed)
+    first = disk(n // 2, mass, radius, centralMass, gravConst=gravConst,
+                 seed=rng)
+    second = disk(n - n // 2, mass, radius, centralMass,
+                  gravConst=gravConst, seed=rng)
+
+    cos, sin = np.cos(inclination), np.sin(inclination)
+    tilt = np.array([[1, 0, 0], [0, cos, -sin], [0, sin, cos]])
+    second['positions'] = second['positions'] @ tilt.T
+    second['velocities'] = second['velocities'] @ tilt.T
+
+    offset = radius * np.array([separation, impactParameter, 0]) / 2
+    distance = 2 * np.linalg.norm(offset)
+    speed = np.sqrt(2 * gravConst * 2 * (mass + centralMass) / distance) / 2
+    approach = speed * np.array([1.0, 0, 0])
+
+    return _centered(
+        np.concatenate((first['masses'], second['masses'])),
+        np.concatenate((first['positions'] - offset,
+                        second['positions'] + offset)),
+        np.concatenate((first['velocities'] + approach,
+                        second['velocities'] - approach))
+    )
+
+
+def uniformCloud(n, mass=1.0, radius=1.0, dispersion=0.0, seed=None):
+    """Bodies uniformly spread in a sphere, with Gaussian velocities
+
+    dispersion is the standard deviation of each velocity component.
+    """
+    rng = np.random.default_rng(seed)
+
+    return _centered(
+        np.full(n, mass / n),
+        _isotropic(rng, radius * np.cbrt(rng.uniform(size=n))),
+        rng.normal(0, dispersion, (n, 3))
+    )
+
+
+SCENARIOS = {
+    'plummer': plummer,
+    'disk': disk,
+    'galaxies': galaxyCollision,
+    'cloud': uniformCloud,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Save a generated scenario as a .npz checkpoint'
+    )
+    parser.add_argument('scenario', choices=SCENARIOS)
+    parser.add_argument('bodies', type=int)
+    parser.add_argument('output', help='.npz checkpoint to write')
+    parser.add_argument('--dt', type=float, default=0.001)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--radius', type=float, default=0.01,
+                        help='radius of each body')
+    parser.add_argument('--engine', choices=ENGINES,
+                        help='saved engine, barneshut scales to large N '
+                        '(default: numpy)')
+    parser.add_argument('--theta', type=float,
+                        help='Barnes-Hut opening angle (default: 0.5)')
+    parser.add_argument('--workers', type=int, help='default: 1')
+    parser.add_argument('--integrator', choices=INTEGRATORS,
+                        help='default: euler')
+    parser.add_argument('--softening', type=float,
+                        help='Plummer softening length (default: 0)')
+    parser.add_argument('--adaptive', action='store_true', default=None,
+                        help='use block time steps (needs leapfrog and '
+                        'softening)')
+    parser.add_argument('--collisions', choices=COLLISIONS,
+                        help='default: none')
+    args = parser.parse_args(argv)
+
+    try:
+        universe = Universe(args.dt, 1, **universeOptions(args))
+    except ValueError as error:
+        parser.error(str(error))
+    universe.setArrays(
+        **SCENARIOS[args.scenario](args.bodies, seed=args.seed),
+        radii=args.radius
+    )
+    universe.saveCheckpoint(args.output)
+
+
+if __name__ == '__main__':
+    main()
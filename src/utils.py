@@ -1,16 +1,62 @@
+import numpy as np
+
+
+REAL_TYPES = (int, float, np.integer, np.floating)
+INTEGER_TYPES = (int, np.integer)
+
+
 def assertType(varName, var, correct_type):
     """Raises a TypeError if 'var' is not of type 'correct_type'"""
-    correct = False
-
     if type(correct_type) is list or type(correct_type) is tuple:
-        for t in correct_type:
-            if type(var) is t:
-                correct = True
-    else:
-        correct = type(var) is correct_type
-
-    if not correct:
-        raise TypeError(
-            varName + ' must be of type ' + str(correct_type) +
-            ', type' + str(type(var)) + ' was passed!'
+        if type(var) in correct_type:
+            return
+    elif type(var) is correct_type:
+        return
+
+    raise TypeError(
+        varName + ' must be of type ' + str(correct_type) +
+        ', type' + str(type(var)) + ' was passed!'
+    )
+
+
+def assertReal(varName, var):
+    """Raises a TypeError if 'var' is not a real number
+
+    Python and NumPy integers and floats are accepted, booleans are not.
+    """
+    if isinstance(var, REAL_TYPES) and not isinstance(var, bool):
+        return
+
+    raise TypeError(
+        f'{varName} must be a real number, {type(var)} was passed!'
+    )
+
+
+def assertInteger(varName, var):
+    """Raises a TypeError if 'var' is not a Python or NumPy integer"""
+    if isinstance(var, INTEGER_TYPES) and not isinstance(var, bool):
+        return
+
+    raise TypeError(f'{varName} must be an integer, {type(var)} was passed!')
+
+
+def assertArray(varName, array, shape):
+    """Convert 'array' to float64 and check its shape and values at once
+
+    shape may hold None for the dimensions of any length. Raises a
+    ValueError if the shape doesn't match or a value is not finite, and
+    returns the converted array.
+    """
+    array = np.asarray(array, dtype=float)
+
+    if array.ndim != len(shape) or any(
+        size is not None and size != actual
+        for size, actual in zip(shape, array.shape)
+    ):
+        raise ValueError(
+            f'{varName} must have shape {shape}, {array.shape} was passed!'
         )
+    if not np.isfinite(array).all():
+        raise ValueError(f'{varName} must only have finite values!')
+
+    return array
@@ -0,0 +1,68 @@
+import os
+from unittest import TestCase, mock
+
+from src import App as app
+
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+
+class FakeUniverse:
+    """Universe whose steps take a fixed time on a fake clock"""
+
+    def __init__(self, stepCost):
+        self.clock = 0.0
+        self.stepCost = stepCost
+        self.steps = 0
+
+    def stepTime(self):
+        self.clock += self.stepCost
+        self.steps += 1
+
+
+class StepFrameTests(TestCase):
+    """Test pacing the physics steps of the frames drawn"""
+
+    def makeApp(self, speed, stepCost):
+        application = app.App.__new__(app.App)
+        application.universe = FakeUniverse(stepCost)
+        application.fps = 60
+        application.speed = speed
+        application._pendingSteps = 0.0
+        application._stepsDone = 0
+        return application
+
+    def stepFrames(self, application, frames):
+        """Steps done in each of a number of frames"""
+        universe = application.universe
+        done = []
+        with mock.patch.object(app.time, 'perf_counter',
+                               lambda: universe.clock):
+            for _ in range(frames):
+                before = universe.steps
+                application._stepFrame()
+                done.append(universe.steps - before)
+
+        return done
+
+    def test_fractional_speed(self):
+        """Test fractional speeds accumulate over the frames"""
+        application = self.makeApp(2.5, 1e-6)
+
+        self.assertEqual(self.stepFrames(application, 4), [2, 3, 2, 3])
+        self.assertEqual(application._stepsDone, 10)
+
+        application.speed = 0.25
+        self.assertEqual(self.stepFrames(application, 8),
+                         [0, 0, 0, 1, 0, 0, 0, 1])
+
+    def test_catch_up_cap(self):
+        """Test a frame stops at its budget and drops the backlog"""
+        budget = app.PHYSICS_BUDGET / 60
+        # Three steps fit in the budget of a frame, ten are asked for
+        application = self.makeApp(10, budget / 3.5)
+
+        self.assertEqual(self.stepFrames(application, 3), [4, 4, 4])
+        # At most one frame of steps is carried over
+        self.assertEqual(application._pendingSteps, 10)
+        self.assertEqual(application._stepsDone, 12)
@@ -0,0 +1,76 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.BarnesHut import Octree
+from src.kernels import directField
+
+
+class OctreeTests(TestCase):
+    """Test the Barnes-Hut octree solver"""
+
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        self.pos = rng.normal(size=(500, 3))
+        self.mass = rng.uniform(0.5, 1.5, 500)
+        self.reference = directField(self.pos, self.mass, 2.0)
+
+    def test_zero_opening_angle_is_exact(self):
+        """Test opening every node reproduces the direct sum"""
+        field = Octree(self.pos, self.mass).field(2.0, 0)
+
+        np.testing.assert_allclose(field, self.reference, rtol=1e-10)
+
+    def test_opening_angle_controls_error(self):
+        """Test the error is small and shrinks with the opening angle"""
+        tree = Octree(self.pos, self.mass)
+        errors = []
+        for theta in [0.8, 0.5, 0.2]:
+            field = tree.field(2.0, theta)
+            errors.append(np.max(
+                np.linalg.norm(field - self.reference, axis=1) /
+                np.linalg.norm(self.reference, axis=1)
+            ))
+
+        self.assertLess(errors[0], 0.5)
+        self.assertLess(errors[1], errors[0])
+        self.assertLess(errors[2], errors[1])
+
+    def test_partial_range(self):
+        """Test computing the field on a subset of the bodies"""
+        tree = Octree(self.pos, self.mass)
+
+        np.testing.assert_allclose(
+            tree.field(2.0, 0, slice(100, 300)), self.reference[100:300],
+            rtol=1e-10
+        )
+        np.testing.assert_allclose(
+            tree.field(2.0, 0, [7, 3, 450]), self.reference[[7, 3, 450]],
+            rtol=1e-10
+        )
+
+    def test_softening(self):
+        """Test the softened field matches the softened direct sum"""
+        field = Octree(self.pos, self.mass).field(2.0, 0, softening=0.1)
+
+        np.testing.assert_allclose(
+            field, directField(self.pos, self.mass, 2.0, softening=0.1),
+            rtol=1e-10
+        )
+
+    def test_single_body(self):
+        """Test a lone body feels no field"""
+        field = Octree(np.ones((1, 3)), np.ones(1)).field(1.0, 0.5)
+
+        np.testing.assert_array_equal(field, np.zeros((1, 3)))
+
+    def test_potential(self):
+        """Test the potential with every node opened, and approximated"""
+        reference = np.empty(300)
+        directField(self.pos, self.mass, 2.0, slice(0, 300), 0.1, reference)
+
+        tree = Octree(self.pos, self.mass)
+        for theta, rtol in [(0, 1e-10), (0.5, 1e-2)]:
+            potential = np.empty(300)
+            tree.field(2.0, theta, slice(0, 300), 0.1, potential)
+            np.testing.assert_allclose(potential, reference, rtol=rtol)
@@ -0,0 +1,76 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from benchmarks import suite
+
+
+class BenchmarkSuiteTests(TestCase):
+    """Test running the benchmark suite and comparing its results"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.dir.name, 'results.json')
+        self.args = [
+            '--bodies', '5', '--trails', '0', '4', '--python-max', '5',
+            '--systems', '3', '--steps', '2', '--repeat', '1',
+            '--output', self.output
+        ]
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def runMain(self, args):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            suite.main(args)
+        return stdout.getvalue()
+
+    def test_output(self):
+        """Test every benchmark of a small sweep is saved as JSON"""
+        printed = self.runMain(self.args)
+        with open(self.output) as file:
+            results = json.load(file)['results']
+
+        keys = [suite.resultKey(result) for result in results]
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertIn('stepTime[bodies=5,engine=barneshut,trail=4]', keys)
+        self.assertIn('UniverseBatch.stepTime[bodies=3,systems=3]', keys)
+        self.assertIn('drawUniverse incremental[bodies=5,trail=4]', keys)
+        for result in results:
+            self.assertGreater(result['seconds'], 0)
+            self.assertIn(suite.resultKey(result), printed)
+
+    def test_compare(self):
+        """Test slowdowns beyond the tolerance are flagged"""
+        results = [
+            suite._result('a', {'bodies': 1}, 1.0),
+            suite._result('b', {'bodies': 1}, 1.5),
+            suite._result('c', {}, 1.0),
+        ]
+        baseline = {'results': [
+            suite._result('a', {'bodies': 1}, 1.1),
+            suite._result('b', {'bodies': 1}, 1.0),
+        ]}
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            slower = suite.compare(results, baseline, 0.2)
+        self.assertEqual(slower, ['b[bodies=1]'])
+
+    def test_compare_exit_status(self):
+        """Test the suite exits with status 1 when a benchmark got slower"""
+        self.runMain(self.args)
+        with open(self.output) as file:
+            baseline = json.load(file)
+        for result in baseline['results']:
+            result['seconds'] /= 1000
+        path = os.path.join(self.dir.name, 'baseline.json')
+        with open(path, 'w') as file:
+            json.dump(baseline, file)
+
+        with self.assertRaises(SystemExit) as raised:
+            self.runMain(self.args + ['--compare', path])
+        self.assertEqual(raised.exception.code, 1)
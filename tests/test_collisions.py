@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.collisions import findCollisions, mergeGroups, bounce
+
+
+class CollisionsTests(TestCase):
+    """Test the collision detection and response kernels"""
+
+    def test_find_collisions(self):
+        """Test the spatial hash finds the same pairs as brute force"""
+        rng = np.random.default_rng(3)
+        pos = rng.uniform(-20, 20, (400, 3))
+        radii = rng.uniform(0.2, 2, 400)
+
+        dist = np.linalg.norm(pos[:, np.newaxis] - pos, axis=2)
+        touching = np.triu(dist < radii[:, np.newaxis] + radii, 1)
+        expected = sorted(zip(*map(np.ndarray.tolist, np.nonzero(touching))))
+
+        first, second = findCollisions(pos, radii)
+        self.assertTrue(len(expected))
+        self.assertEqual(
+            sorted(zip(first.tolist(), second.tolist())), expected
+        )
+
+    def test_no_collisions(self):
+        """Test finding no contacts between apart or single planets"""
+        pos = np.array([[0.0, 0, 0], [10, 0, 0]])
+        first, second = findCollisions(pos, np.ones(2))
+        self.assertEqual(len(first), 0)
+        self.assertEqual(len(findCollisions(pos[:1], np.ones(1))[0]), 0)
+
+    def test_merge_groups(self):
+        """Test chains of contacts end up in a single group"""
+        labels = mergeGroups(6, np.array([3, 1, 2]), np.array([4, 5, 3]))
+        self.assertEqual(labels.tolist(), [0, 1, 2, 2, 2, 1])
+
+    def test_bounce(self):
+        """Test bounces keep momentum and energy, and skip receding pairs"""
+        pos = np.array([[0.0, 0, 0], [1, 1, 0], [5, 0, 0], [6, 0, 0]])
+        vel = np.array([[1.0, 0, 0], [0, -1, 0], [-1, 0, 0], [1, 0, 0]])
+        mass = np.array([1.0, 2, 1, 1])
+        first, second = np.array([0, 2]), np.array([1, 3])
+
+        before = vel.copy()
+        bounce(pos, vel, mass, first, second)
+
+        np.testing.assert_allclose(mass @ vel, mass @ before)
+        np.testing.assert_allclose(
+            mass @ np.sum(vel**2, axis=1), mass @ np.sum(before**2, axis=1)
+        )
+        np.testing.assert_array_equal(vel[2:], before[2:])
+        self.assertFalse(np.array_equal(vel[:2], before[:2]))
@@ -0,0 +1,150 @@
+import csv
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from src.Universe import Universe
+from src.ensemble import aggregate, expandSweep, loadConditions, \
+    runEnsemble, writeTable
+from src.scenarios import plummer
+
+
+CONDITIONS = {
+    'dt': 0.01,
+    'planets': [
+        {'mass': 5000, 'pos': [20, 0, 0], 'vel': [-5, -5, 0]},
+        {'mass': 5000, 'pos': [-20, 0, 0], 'vel': [5, 5, 0]},
+    ]
+}
+
+
+class EnsembleTests(TestCase):
+    """Test running sweeps of parameters and perturbations"""
+
+    def makeSpec(self, **kwargs):
+        spec = {
+            'conditions': CONDITIONS,
+            'steps': 20,
+            'sweep': {'dt': [0.01, 0.005], 'massScale': [1, 2]},
+            'perturbations': 3,
+            'positionSigma': 0.1,
+        }
+        spec.update(kwargs)
+        return spec
+
+    def test_expand_sweep(self):
+        """Test every combination is run once per perturbation"""
+        runs = expandSweep(self.makeSpec())
+
+        self.assertEqual(len(runs), 12)
+        self.assertEqual([r['run'] for r in runs], list(range(12)))
+        self.assertEqual(
+            runs[4], {'run': 4, 'dt': 0.01, 'massScale': 2, 'sample': 1}
+        )
+        self.assertEqual(len(expandSweep({'conditions': CONDITIONS})), 1)
+
+    def test_run_ensemble(self):
+        """Test a row per run with its parameters and errors"""
+        rows = runEnsemble(self.makeSpec(), workers=1)
+
+        self.assertEqual(len(rows), 12)
+        for row in rows:
+            self.assertEqual(row['steps'], 20)
+            self.assertEqual(row['bodies'], 2)
+            self.assertAlmostEqual(row['time'], 20 * row['dt'])
+            self.assertGreaterEqual(row['maxEnergyError'],
+                                    row['energyError'])
+            self.assertLess(row['momentumDrift'], 1e-6)
+
+    def test_runs_are_reproducible(self):
+        """Test a run only depends on the seed and its index"""
+        spec = self.makeSpec(sweep={'dt': [0.01]})
+        first, second = runEnsemble(spec, workers=1), runEnsemble(spec, 2)
+        third = runEnsemble({**spec, 'seed': 1}, workers=1)
+
+        self.assertEqual(
+            [r['energyError'] for r in first],
+            [r['energyError'] for r in second]
+        )
+        self.assertNotEqual(first[0]['energyError'], first[1]['energyError'])
+        self.assertNotEqual(first[0]['energyError'], third[0]['energyError'])
+
+    def test_universe_settings(self):
+        """Test Universe arguments from the spec and the sweep"""
+        spec = self.makeSpec(
+            sweep={'integrator': ['euler', 'leapfrog']}, perturbations=1,
+            universe={'softening': 1.0}
+        )
+        euler, leapfrog = runEnsemble(spec, workers=1)
+
+        self.assertEqual(euler['integrator'], 'euler')
+        self.assertLess(leapfrog['maxEnergyError'], euler['maxEnergyError'])
+
+    def test_checkpoint_conditions(self):
+        """Test starting from a checkpoint, with its settings"""
+        u = Universe(0.001, 1, integrator='rk4')
+        u.setArrays(**plummer(10, seed=0))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'state.npz')
+            u.saveCheckpoint(path)
+            base = loadConditions(path)
+
+        self.assertEqual(base['dt'], 0.001)
+        self.assertEqual(base['settings']['integrator'], 'rk4')
+        np.testing.assert_array_equal(base['masses'], u.masses)
+
+    def test_requires_steps(self):
+        """Test a spec without steps or until is refused"""
+        with self.assertRaises(ValueError):
+            runEnsemble({'conditions': CONDITIONS}, workers=1)
+
+    def test_aggregate_and_table(self):
+        """Test grouping over the perturbations and writing the tables"""
+        rows = runEnsemble(self.makeSpec(), workers=1)
+        table = aggregate(rows, ['dt', 'massScale'])
+
+        self.assertEqual(len(table), 4)
+        self.assertEqual(table[0]['runs'], 3)
+        self.assertAlmostEqual(
+            table[0]['mean energyError'],
+            np.mean([r['energyError'] for r in rows[:3]])
+        )
+        self.assertNotIn('mean sample', table[0])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'results.csv')
+            writeTable(rows, path)
+            with open(path) as file:
+                read = list(csv.DictReader(file))
+
+        self.assertEqual(len(read), 12)
+        self.assertEqual(float(read[5]['energyError']), rows[5]['energyError'])
+
+    def test_batched_runs(self):
+        """Test batched runs give the rows of the runs one by one"""
+        spec = self.makeSpec(universe={'integrator': 'leapfrog'},
+                             velocitySigma=0.1)
+        batched = runEnsemble(spec, workers=1)
+        single = runEnsemble({**spec, 'batch': False}, workers=1)
+
+        for row, expected in zip(batched, single):
+            self.assertEqual(row['run'], expected['run'])
+            self.assertEqual(row['steps'], expected['steps'])
+            self.assertAlmostEqual(row['time'], expected['time'])
+            for name in ('energyError', 'maxEnergyError'):
+                self.assertAlmostEqual(row[name], expected[name], delta=1e-9)
+            for name in ('momentumDrift', 'angularMomentumDrift',
+                         'centerOfMassDrift'):
+                self.assertAlmostEqual(row[name], expected[name], delta=1e-6)
+
+    def test_until_in_batches(self):
+        """Test runs batched by their number of steps with until"""
+        spec = self.makeSpec(until=0.1, steps=None)
+        rows = runEnsemble(spec, workers=1)
+
+        self.assertEqual([r['steps'] for r in rows[:6]], [10] * 6)
+        self.assertEqual([r['steps'] for r in rows[6:]], [20] * 6)
+        for row in rows:
+            self.assertAlmostEqual(row['time'], 0.1)
@@ -0,0 +1,112 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+import pygame
+
+from src.Planet import Planet
+from src.Universe import Universe
+from src.View import View
+from src.export import ImageSequence, RawStream, exportRecording, \
+    exportRun, offscreenView, FRAME_NAME
+from src.recording import TrajectoryWriter
+from src.replay import Replay
+from src.vecN import Vec3
+
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+SIZE = (200, 150)
+
+
+class ExportTests(TestCase):
+    """Test rendering runs and recordings without a window"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'run')
+
+        universe = self.makeUniverse()
+        with TrajectoryWriter(self.path) as writer:
+            universe.addOutput(writer)
+            for _ in range(80):
+                universe.stepTime()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def makeUniverse(self):
+        u = Universe(0.05, 1, integrator='leapfrog')
+        u.setPlanets([
+            Planet(5000, Vec3(20), Vec3(-5, -5), (200, 20, 20)),
+            Planet(5000, Vec3(-20), Vec3(5, 5), (20, 200, 20)),
+        ])
+        return u
+
+    def test_offscreen_view(self):
+        """Test an offscreen view draws to a surface of its size"""
+        view = View(*SIZE, offscreen=True)
+        view.drawUniverse(self.makeUniverse())
+
+        self.assertEqual(view.screen.get_size(), SIZE)
+        self.assertTrue(pygame.surfarray.array3d(view.screen).any())
+
+    def test_recording_matches_playback(self):
+        """Test the chunks rendered in parallel match a sequential pass"""
+        output = os.path.join(self.dir.name, 'frames.rgb')
+        done = exportRecording(self.path, output, SIZE, speed=2,
+                               trailFrames=20, raw=True, workers=2)
+
+        replay = Replay(self.path, trailFrames=20)
+        view = offscreenView(SIZE)
+        replay.showFrame(0)
+        view._setUpCamera(replay.universe.planets)
+        expected = []
+        for frame in range(0, 81, 2):
+            replay.showFrame(frame)
+            view.drawUniverse(replay.universe)
+            expected.append(pygame.image.tostring(view.screen, 'RGB'))
+
+        self.assertEqual(done, 41)
+        with open(output, 'rb') as file:
+            self.assertEqual(file.read(), b''.join(expected))
+
+    def test_recording_to_images(self):
+        """Test a recording written as a numbered image sequence"""
+        output = os.path.join(self.dir.name, 'frames')
+        done = exportRecording(self.path, output, SIZE, frames=40,
+                               imageFormat='bmp', workers=2)
+
+        self.assertEqual(done, 40)
+        self.assertEqual(sorted(os.listdir(output)), [
+            FRAME_NAME.format(i, 'bmp') for i in range(40)
+        ])
+        image = pygame.image.load(os.path.join(output, FRAME_NAME.format(
+            39, 'bmp'
+        )))
+        self.assertEqual(image.get_size(), SIZE)
+
+    def test_run(self):
+        """Test a simulated run to raw frames and to images"""
+        output = os.path.join(self.dir.name, 'run.rgb')
+        sink = RawStream(output)
+        exportRun(self.makeUniverse(), sink, 10, every=3, size=SIZE)
+        sink.close()
+        with open(output, 'rb') as file:
+            raw = file.read()
+        self.assertEqual(len(raw), 10 * SIZE[0] * SIZE[1] * 3)
+
+        universe = self.makeUniverse()
+        sink = ImageSequence(os.path.join(self.dir.name, 'images'), SIZE,
+                             workers=2)
+        exportRun(universe, sink, 10, every=3, size=SIZE)
+        sink.close()
+
+        self.assertAlmostEqual(universe.time, 27 * 0.05)
+        image = pygame.image.load(sink.path(9))
+        np.testing.assert_array_equal(
+            pygame.surfarray.array3d(image),
+            np.frombuffer(raw[-SIZE[0] * SIZE[1] * 3:], dtype=np.uint8)
+            .reshape(SIZE[1], SIZE[0], 3).transpose(1, 0, 2)
+        )
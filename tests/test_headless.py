@@ -0,0 +1,121 @@
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from src import headless
+
+
+CONDITIONS = {
+    'dt': 0.01,
+    'gravConst': 1,
+    'planets': [
+        {'mass': 5000, 'pos': [20, 0, 0], 'vel': [-5, -5, 0]},
+        {'mass': 5000, 'pos': [-20, 0, 0], 'vel': [5, 5, 0]},
+    ]
+}
+
+
+class HeadlessTests(TestCase):
+    """Test running simulations without the GUI"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.conditions = os.path.join(self.dir.name, 'conditions.json')
+        with open(self.conditions, 'w') as file:
+            json.dump(CONDITIONS, file)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_run_steps(self):
+        """Test running a fixed number of steps"""
+        universe = headless.loadInitialConditions(self.conditions)
+        reports = []
+        stats = headless.run(universe, steps=25, report=reports.append)
+
+        self.assertEqual(stats['steps'], 25)
+        self.assertAlmostEqual(universe.time, 0.25)
+        self.assertEqual(reports[-1], stats)
+        self.assertAlmostEqual(
+            stats['bodyStepsPerSec'], 2 * stats['stepsPerSec']
+        )
+
+    def test_run_until(self):
+        """Test running up to a simulated time"""
+        universe = headless.loadInitialConditions(self.conditions)
+        stats = headless.run(universe, until=0.5)
+
+        self.assertEqual(stats['steps'], 50)
+
+        with self.assertRaises(ValueError):
+            headless.run(universe)
+
+    def test_cli_without_pygame(self):
+        """Test the command line runner writes the state, importing no GUI"""
+        output = os.path.join(self.dir.name, 'state.npz')
+        script = 'import sys; from src import headless; ' \
+            'headless.main(sys.argv[1:]); ' \
+            'assert "pygame" not in sys.modules'
+
+        subprocess.run(
+            [sys.executable, '-c', script, self.conditions, output,
+             '--steps', '10', '--quiet'],
+            check=True
+        )
+
+        state = np.load(output)
+        self.assertAlmostEqual(float(state['time']), 0.1)
+        self.assertEqual(state['positions'].shape, (2, 3))
+
+    def test_cli_refuses_recording_merges(self):
+        """Test recording is refused when bodies can merge"""
+        output = os.path.join(self.dir.name, 'state.npz')
+        record = os.path.join(self.dir.name, 'run')
+
+        with self.assertRaises(SystemExit):
+            headless.main([
+                self.conditions, output, '--steps', '10', '--quiet',
+                '--collisions', 'merge', '--record', record
+            ])
+        self.assertFalse(os.path.exists(record))
+
+    def test_cli_check_accuracy(self):
+        """Test printing the error of the Barnes-Hut field at the end"""
+        output = os.path.join(self.dir.name, 'state.npz')
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            headless.main([
+                self.conditions, output, '--steps', '5', '--quiet',
+                '--engine', 'barneshut', '--check-accuracy'
+            ])
+
+        self.assertIn('field error max', stderr.getvalue())
+        self.assertTrue(os.path.exists(output))
+
+    def test_cli_overrides_checkpoint_settings(self):
+        """Test settings given with a checkpoint replace the saved ones"""
+        checkpoint = os.path.join(self.dir.name, 'start.npz')
+        output = os.path.join(self.dir.name, 'state.npz')
+        headless.loadInitialConditions(self.conditions).saveCheckpoint(
+            checkpoint
+        )
+
+        headless.main([
+            checkpoint, output, '--steps', '2', '--quiet', '--engine',
+            'barneshut', '--integrator', 'leapfrog'
+        ])
+        state = np.load(output)
+        self.assertEqual(str(state['engine']), 'barneshut')
+        self.assertEqual(str(state['integrator']), 'leapfrog')
+        self.assertEqual(float(state['softening']), 0)
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                headless.main([output, output, '--steps', '1', '--adaptive'])
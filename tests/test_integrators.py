@@ -0,0 +1,55 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.integrators import INTEGRATORS
+
+
+def harmonicField(pos):
+    """Field of a unit harmonic oscillator"""
+    return -pos
+
+
+class IntegratorsTests(TestCase):
+    """Test the time integrators on a harmonic oscillator"""
+
+    def integrate(self, name, dt, time=2 * np.pi):
+        """Final position and velocity after integrating up to time"""
+        pos = np.array([[1.0, 0, 0]])
+        vel = np.array([[0, 1.0, 0]])
+        for _ in range(int(round(time / dt))):
+            INTEGRATORS[name](pos, vel, dt, harmonicField)
+
+        return pos, vel
+
+    def errorAfterPeriod(self, name, dt):
+        pos, vel = self.integrate(name, dt)
+        return np.abs(pos - [[1, 0, 0]]).max()
+
+    def test_order_of_convergence(self):
+        """Test halving dt reduces the error by 2^order"""
+        dt = 2 * np.pi / 64
+        for name, order in [('euler', 1), ('leapfrog', 2),
+                            ('yoshida4', 4), ('rk4', 4)]:
+            ratio = self.errorAfterPeriod(name, dt) / \
+                self.errorAfterPeriod(name, dt / 2)
+
+            self.assertAlmostEqual(np.log2(ratio), order, delta=0.3, msg=name)
+
+    def test_symplectic_energy_is_bounded(self):
+        """Test the symplectic integrators don't drift in energy"""
+        for name in ['leapfrog', 'yoshida4']:
+            pos, vel = self.integrate(name, 0.1, time=1000)
+            energy = 0.5 * (np.sum(pos**2) + np.sum(vel**2))
+
+            self.assertAlmostEqual(energy, 1, delta=0.01, msg=name)
+
+    def test_in_place(self):
+        """Test the integrators update the given arrays"""
+        for name in INTEGRATORS:
+            pos = np.array([[1.0, 0, 0]])
+            vel = np.array([[0, 1.0, 0]])
+            INTEGRATORS[name](pos, vel, 0.1, harmonicField)
+
+            self.assertNotEqual(pos[0, 1], 0, msg=name)
+            self.assertNotEqual(vel[0, 0], 0, msg=name)
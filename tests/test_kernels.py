@@ -0,0 +1,120 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+
+from src.kernels import directField, batchedField
+
+
+class DirectFieldTests(TestCase):
+    """Test the direct sum field kernel"""
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.pos = rng.normal(size=(600, 3))
+        self.mass = rng.uniform(0.5, 1.5, 600)
+
+    def reference(self, softening=0.0):
+        """Field computed one body at a time"""
+        field = np.zeros_like(self.pos)
+        for i in range(len(self.pos)):
+            disp = np.delete(self.pos - self.pos[i], i, axis=0)
+            dist2 = np.sum(disp**2, axis=1) + softening**2
+            field[i] = 2.0 * (np.delete(self.mass, i) / dist2**1.5) @ disp
+
+        return field
+
+    def test_field(self):
+        """Test the blocked sum against the body by body one"""
+        np.testing.assert_allclose(
+            directField(self.pos, self.mass, 2.0), self.reference(),
+            rtol=1e-10
+        )
+
+    def test_targets(self):
+        """Test computing the field on a slice or on chosen bodies"""
+        reference = self.reference()
+
+        np.testing.assert_allclose(
+            directField(self.pos, self.mass, 2.0, slice(250, 550)),
+            reference[250:550], rtol=1e-10
+        )
+        np.testing.assert_allclose(
+            directField(self.pos, self.mass, 2.0, [599, 0, 300]),
+            reference[[599, 0, 300]], rtol=1e-10
+        )
+
+    def test_softening(self):
+        """Test the Plummer softened field"""
+        np.testing.assert_allclose(
+            directField(self.pos, self.mass, 2.0, softening=0.3),
+            self.reference(0.3), rtol=1e-10
+        )
+
+    def test_potential(self):
+        """Test the potential written along with the field"""
+        potential = np.empty(600)
+        field = directField(self.pos, self.mass, 2.0, softening=0.1,
+                            potential=potential)
+
+        dist = np.linalg.norm(
+            self.pos[:, np.newaxis] - self.pos, axis=2
+        )
+        weights = self.mass / np.sqrt(dist**2 + 0.1**2)
+        np.fill_diagonal(weights, 0)
+        np.testing.assert_allclose(potential, -2.0 * weights.sum(axis=1))
+        np.testing.assert_allclose(
+            field, directField(self.pos, self.mass, 2.0, softening=0.1)
+        )
+
+    def test_symmetric_tiles(self):
+        """Test visiting each pair once like summing over every target"""
+        for n in (0, 1, 256, 600):
+            pos, mass = self.pos[:n], self.mass[:n]
+            potentials = np.empty((2, n))
+            field = directField(pos, mass, 2.0, softening=0.1,
+                                potential=potentials[0])
+            reference = directField(pos, mass, 2.0, slice(None), 0.1,
+                                    potentials[1])
+
+            np.testing.assert_allclose(field, reference, rtol=1e-12)
+            np.testing.assert_allclose(*potentials, rtol=1e-12)
+
+
+class BatchedFieldTests(TestCase):
+    """Test the field kernel of a stack of small systems"""
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.pos = rng.normal(size=(50, 4, 3))
+        self.mass = rng.uniform(0.5, 1.5, (50, 4))
+
+    def test_field_and_potential(self):
+        """Test each system against the direct sum on it alone"""
+        potential = np.empty((50, 4))
+        field = batchedField(self.pos, self.mass, 2.0, 0.1, potential)
+
+        for s in range(50):
+            expectedPotential = np.empty(4)
+            np.testing.assert_allclose(
+                field[s], directField(self.pos[s], self.mass[s], 2.0,
+                                      softening=0.1,
+                                      potential=expectedPotential),
+                rtol=1e-12
+            )
+            np.testing.assert_allclose(potential[s], expectedPotential,
+                                       rtol=1e-12)
+
+    def test_constant_per_system_and_blocks(self):
+        """Test a constant per system and a sum split in blocks"""
+        gravConst = np.linspace(1, 2, 50)
+        field = batchedField(self.pos, self.mass, gravConst)
+
+        np.testing.assert_allclose(
+            field, batchedField(self.pos, self.mass, 1.0) *
+            gravConst[:, np.newaxis, np.newaxis], rtol=1e-12
+        )
+        with patch('src.kernels.BATCH_PAIRS', 40):
+            np.testing.assert_array_equal(
+                batchedField(self.pos, self.mass, gravConst), field
+            )
@@ -0,0 +1,127 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.Planet import Planet
+from src.Universe import Universe
+from src.kernels import directField
+from src.monitor import ConservationMonitor
+from src.vecN import Vec3
+
+
+class ConservationMonitorTests(TestCase):
+    """Test tracking the conserved quantities of a run"""
+
+    def makeUniverse(self, engine='numpy', integrator='leapfrog'):
+        u = Universe(0.001, 1, engine=engine, integrator=integrator)
+        u.setPlanets([
+            Planet(1000, Vec3(50), Vec3(-10, 5)),
+            Planet(1000, Vec3(5, -15), Vec3(7, 0)),
+            Planet(1000, Vec3(0, 30, 2), Vec3(1, -5)),
+        ])
+        return u
+
+    def test_conserved_quantities(self):
+        """Test a leapfrog run keeps energy, momenta and center of mass"""
+        u = self.makeUniverse()
+        monitor = ConservationMonitor()
+        u.addOutput(monitor)
+        for _ in range(200):
+            u.stepTime()
+
+        series = monitor.series()
+        self.assertEqual(len(monitor), 201)
+        self.assertEqual(series['momentum'].shape, (201, 3))
+        self.assertLess(series['energyError'].max(), 1e-4)
+        self.assertLess(series['momentumDrift'].max(), 1e-9)
+        self.assertLess(series['angularMomentumDrift'].max(), 1e-6)
+        self.assertLess(series['centerOfMassDrift'].max(), 1e-9)
+
+    def test_potential_matches_direct_sum(self):
+        """Test the recorded potential energy against the direct sum"""
+        u = self.makeUniverse()
+        monitor = ConservationMonitor()
+        u.addOutput(monitor)
+        u.stepTime()
+
+        potential = np.empty(3)
+        directField(u.positions, u.masses, 1, potential=potential)
+        self.assertAlmostEqual(
+            monitor.series()['potential'][-1], 0.5 * u.masses @ potential
+        )
+
+    def test_no_extra_field_passes(self):
+        """Test recording reuses the field passes of the integrator"""
+        for integrator in ('euler', 'leapfrog'):
+            counts = []
+            for monitor in (None, ConservationMonitor()):
+                u = self.makeUniverse(integrator=integrator)
+                calls = []
+                computeField = u._computeField
+                u._computeField = lambda *args, **kwargs: \
+                    calls.append(1) or computeField(*args, **kwargs)
+                if monitor:
+                    u.addOutput(monitor)
+                for _ in range(10):
+                    u.stepTime()
+                counts.append(len(calls))
+
+            self.assertLessEqual(counts[1], counts[0] + 1, integrator)
+
+    def test_one_pass_a_step(self):
+        """Test the python and adaptive steps compute the potential once"""
+        for engine, integrator, adaptive in (('python', 'euler', False),
+                                             ('numpy', 'leapfrog', True)):
+            u = Universe(0.05, 1, engine=engine, integrator=integrator,
+                         adaptive=adaptive, softening=0.1)
+            u.setPlanets([
+                Planet(1000, Vec3(50), Vec3(-10, 5)),
+                Planet(1000, Vec3(5, -15), Vec3(7, 0)),
+                Planet(1000, Vec3(50.5), Vec3(0, 5)),
+            ])
+            u.addOutput(ConservationMonitor())
+            # Number of planets of each pass, all of them for the pair kernel
+            passes = []
+            computeField, pairFields = u._computeField, u._pairFields
+            if engine == 'python':
+                u._pairFields = lambda *args: \
+                    passes.append(3) or pairFields(*args)
+            else:
+                u._computeField = lambda pos, targets=None, **kwargs: \
+                    passes.append(3 if targets is None else len(targets)) \
+                    or computeField(pos, targets, **kwargs)
+            u.stepTime()
+
+            self.assertEqual(passes.count(3), 1, engine)
+            # Only the adaptive step refines the close pair's substeps
+            self.assertEqual(len(passes) > 1, adaptive)
+            u.potentials()
+            self.assertEqual(passes.count(3), 1, engine)
+
+            potential = np.empty(3)
+            directField(u.positions, u.masses, 1, softening=0.1,
+                        potential=potential)
+            np.testing.assert_allclose(u.potentials(), potential)
+
+    def test_python_engine_and_every(self):
+        """Test recording every few steps of the python engine"""
+        u = self.makeUniverse('python', 'euler')
+        monitor = ConservationMonitor(every=5)
+        u.addOutput(monitor)
+        for _ in range(10):
+            u.stepTime()
+
+        self.assertEqual(len(monitor), 3)
+        self.assertEqual(monitor.series()['time'].tolist()[1], u.dt * 5)
+
+    def test_cached_center_of_mass(self):
+        """Test the center of mass is cached until the next step"""
+        u = self.makeUniverse()
+        center = u.centerOfMass()
+
+        self.assertIs(u.centerOfMass(), center)
+        np.testing.assert_allclose(
+            center, np.average(u.positions, axis=0, weights=u.masses)
+        )
+        u.stepTime()
+        self.assertIsNot(u.centerOfMass(), center)
@@ -0,0 +1,88 @@
+import copy
+from unittest import TestCase
+
+import numpy as np
+
+from src.BarnesHut import Octree
+from src.ParallelSolver import ParallelSolver
+from src.kernels import directField
+
+
+class ParallelSolverTests(TestCase):
+    """Test the process pool field solver"""
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.pos = rng.normal(size=(300, 3))
+        self.mass = rng.uniform(0.5, 1.5, 300)
+        self.solver = ParallelSolver(3)
+
+    def tearDown(self):
+        self.solver.close()
+
+    def test_direct_field(self):
+        """Test the workers reproduce the serial direct sum"""
+        field = self.solver.field(self.pos, self.mass, 2.0)
+
+        np.testing.assert_allclose(
+            field, directField(self.pos, self.mass, 2.0), rtol=1e-12
+        )
+
+    def test_barneshut_field(self):
+        """Test the workers reproduce the serial Barnes-Hut field"""
+        field = self.solver.field(self.pos, self.mass, 2.0, 'barneshut', 0.5)
+
+        np.testing.assert_allclose(
+            field, Octree(self.pos, self.mass).field(2.0, 0.5), rtol=1e-12
+        )
+
+    def test_targets_and_softening(self):
+        """Test computing a softened field on a subset of the bodies"""
+        targets = np.array([5, 17, 200, 299])
+        field = self.solver.field(
+            self.pos, self.mass, 2.0, softening=0.2, targets=targets
+        )
+
+        np.testing.assert_allclose(
+            field,
+            directField(self.pos, self.mass, 2.0, targets, softening=0.2),
+            rtol=1e-12
+        )
+
+    def test_potential(self):
+        """Test the workers write the potential on the targets too"""
+        potential = np.empty(300)
+        reference = np.empty(300)
+        self.solver.field(self.pos, self.mass, 2.0, potential=potential)
+        directField(self.pos, self.mass, 2.0, potential=reference)
+
+        np.testing.assert_allclose(potential, reference, rtol=1e-12)
+
+    def test_results_are_copies(self):
+        """Test a result isn't overwritten by the next evaluation"""
+        field = self.solver.field(
+            self.pos, self.mass, 2.0, targets=slice(0, 100)
+        )
+        expected = field.copy()
+        self.solver.field(self.pos, 2 * self.mass, 2.0)
+
+        np.testing.assert_array_equal(field, expected)
+
+    def test_resize_and_copy(self):
+        """Test changing the number of bodies and copying the solver"""
+        self.solver.field(self.pos, self.mass, 1.0)
+        pool = self.solver._pool
+        for num in (10, 299, 600):
+            pos = np.resize(self.pos, (num, 3)) + np.arange(num)[:, None]
+            mass = np.resize(self.mass, num)
+            field = self.solver.field(pos, mass, 1.0)
+
+            np.testing.assert_allclose(
+                field, directField(pos, mass, 1.0), rtol=1e-12
+            )
+        # The pool is kept, only the shared memory grows
+        self.assertIs(self.solver._pool, pool)
+
+        solver_copy = copy.deepcopy(self.solver)
+        self.assertEqual(solver_copy.workers, 3)
+        solver_copy.close()
@@ -1,5 +1,7 @@
 from unittest import TestCase
 
+import numpy as np
+
 from src.Planet import Planet
 from src.vecN import Vec3
 
@@ -36,6 +38,20 @@ class PlanetTests(TestCase):
         with self.assertRaises(TypeError):
             Planet(1e4, Vec3(), [1, 2, 3])
 
+    def test_numpy_scalars(self):
+        """Test NumPy scalars are accepted as masses"""
+        self.assertEqual(Planet(np.float32(2.5), Vec3(), Vec3()).mass, 2.5)
+        self.assertEqual(Planet(np.int64(3), Vec3(), Vec3()).mass, 3)
+
+        with self.assertRaises(TypeError):
+            Planet(True, Vec3(), Vec3())
+
+    def test_skip_validation(self):
+        """Test creating a planet without checking its arguments"""
+        p = Planet(np.float64(2), Vec3(1), Vec3(), validate=False)
+        self.assertEqual(p.mass, 2)
+        self.assertEqual(p.pos, Vec3(1))
+
     def test_update_planet(self):
         """Test updating planet based on a gravitational field"""
         p = Planet(10, Vec3(), Vec3(5, 0, 0))
@@ -46,3 +62,15 @@ class PlanetTests(TestCase):
 
         self.assertEqual(p.pos, Vec3(0.5, 0, 0))
         self.assertEqual(p.vel, Vec3(5, 0.4, 0))
+
+    def test_bounded_trajectory(self):
+        """Test the trajectory keeps only the latest positions"""
+        p = Planet(10, Vec3(), Vec3(1, 0, 0), trajectoryCapacity=5)
+
+        for _ in range(20):
+            p.update(Vec3(), 1)
+
+        self.assertEqual(len(p.trajectory), 5)
+        self.assertEqual(
+            p.trajectory.points()[:, 0].tolist(), [15, 16, 17, 18, 19]
+        )
@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from src.Planet import Planet
+from src.Universe import Universe
+from src.monitor import ConservationMonitor
+from src.profiling import Profiler
+from src.vecN import Vec3
+
+
+class ProfilerTests(TestCase):
+    """Test timing the phases of a universe"""
+
+    def makeUniverse(self, engine):
+        u = Universe(0.01, 1, engine=engine)
+        u.setPlanets([
+            Planet(1000, Vec3(50), Vec3(-10, 5)),
+            Planet(1000, Vec3(5, -15), Vec3(7, 0)),
+            Planet(1000, Vec3(0, 30), Vec3(1, -5)),
+        ])
+        return u
+
+    def test_phases(self):
+        """Test each phase is counted and the step is broken down"""
+        u = self.makeUniverse('numpy')
+        profiler = Profiler()
+        profiler.attach(u)
+        for _ in range(10):
+            u.stepTime()
+
+        phases = profiler.report()['phases']
+        self.assertEqual(phases['step']['calls'], 10)
+        self.assertEqual(phases['force']['calls'], 10)
+        self.assertEqual(phases['trajectories']['calls'], 10)
+        self.assertGreaterEqual(phases['step']['total'],
+                                phases['force']['total'])
+        self.assertIn('integration', phases)
+        self.assertEqual(len(profiler.summary()), len(phases))
+
+    def test_python_engine(self):
+        """Test timing the per planet updates of the python engine"""
+        u = self.makeUniverse('python')
+        profiler = Profiler()
+        profiler.attach(u)
+        u.stepTime()
+
+        phases = profiler.report()['phases']
+        self.assertEqual(phases['force']['calls'], 1)
+        self.assertEqual(phases['planet update']['calls'], 3)
+
+    def test_nested_force_counted_once(self):
+        """Test the phases of the steps add up to no more than the wall time"""
+        u = self.makeUniverse('python')
+        u.addOutput(ConservationMonitor())
+        profiler = Profiler()
+        profiler.attach(u)
+        for _ in range(20):
+            u.stepTime()
+
+        report = profiler.report()
+        phases = report['phases']
+        # One pass a step, _pairFields within _computeField, gives the
+        # potential to the monitor and the field to the next step
+        self.assertEqual(phases['force']['calls'], 20)
+        self.assertLessEqual(phases['force']['total'],
+                             phases['step']['total'])
+        self.assertLessEqual(
+            sum(stats['total'] for phase, stats in phases.items()
+                if phase != 'step'),
+            report['elapsed']
+        )
+
+    def test_detach(self):
+        """Test detaching leaves no wrappers and stops the counting"""
+        u = self.makeUniverse('numpy')
+        profiler = Profiler()
+        profiler.attach(u)
+        profiler.detach()
+        u.stepTime()
+
+        self.assertNotIn('stepTime', vars(u))
+        self.assertNotIn('update', vars(u.planets[0]))
+        self.assertEqual(profiler.report()['phases']['step']['calls'], 0)
+
+    def test_save(self):
+        """Test saving the report as JSON"""
+        u = self.makeUniverse('numpy')
+        profiler = Profiler()
+        profiler.attach(u)
+        u.stepTime()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'profile.json')
+            profiler.save(path)
+            with open(path) as file:
+                report = json.load(file)
+
+        self.assertEqual(report['phases']['step']['calls'], 1)
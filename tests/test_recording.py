@@ -0,0 +1,64 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from src.Planet import Planet
+from src.Universe import Universe
+from src.recording import Recording, TrajectoryWriter
+from src.vecN import Vec3
+
+
+class RecordingTests(TestCase):
+    """Test streaming a run to disk and reading it back"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'run')
+        self.universe = Universe(0.01, 1, integrator='leapfrog')
+        self.universe.setPlanets([
+            Planet(5000, Vec3(20), Vec3(-5, -5), (200, 20, 20)),
+            Planet(5000, Vec3(-20), Vec3(5, 5), (20, 200, 20)),
+        ])
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_record(self):
+        """Test frames are written every few steps, in chunks"""
+        writer = TrajectoryWriter(self.path, every=3, chunkFrames=4)
+        self.universe.addOutput(writer)
+        for _ in range(30):
+            self.universe.stepTime()
+
+        # Frames 0, 3, ..., 30, of which the first 8 were flushed
+        recording = Recording(self.path)
+        self.assertEqual(len(recording), 8)
+
+        writer.close()
+        recording.reload()
+        self.assertEqual(len(recording), 11)
+        self.assertEqual(recording.positions.shape, (11, 2, 3))
+        np.testing.assert_allclose(recording.times, np.arange(11) * 0.03)
+        self.assertEqual(
+            recording.positions[-1].tolist(),
+            self.universe.positions.tolist()
+        )
+        self.assertEqual(
+            recording.velocities[-1].tolist(),
+            self.universe.velocities.tolist()
+        )
+        self.assertEqual(recording.initial['masses'].tolist(), [5000, 5000])
+
+        positions = np.load(os.path.join(self.path, 'positions.npy'))
+        self.assertEqual(positions.shape, (11, 2, 3))
+
+    def test_body_count_change(self):
+        """Test refusing to record once the number of bodies changes"""
+        with TrajectoryWriter(self.path) as writer:
+            self.universe.addOutput(writer)
+            self.universe.removePlanet(0)
+
+            with self.assertRaises(ValueError):
+                self.universe.stepTime()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from src.Planet import Planet
+from src.Universe import Universe
+from src.recording import TrajectoryWriter
+from src.replay import Replay
+from src.vecN import Vec3
+
+
+class ReplayTests(TestCase):
+    """Test loading recorded frames for playback"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'run')
+
+        universe = Universe(0.01, 1, integrator='leapfrog')
+        universe.setPlanets([
+            Planet(5000, Vec3(20), Vec3(-5, -5), (200, 20, 20)),
+            Planet(5000, Vec3(-20), Vec3(5, 5), (20, 200, 20)),
+        ])
+        with TrajectoryWriter(self.path, every=2) as writer:
+            universe.addOutput(writer)
+            for _ in range(100):
+                universe.stepTime()
+        self.final = universe
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_show_frame(self):
+        """Test a frame sets the state and the trail before it"""
+        replay = Replay(self.path, trailFrames=10)
+        self.assertEqual(len(replay.recording), 51)
+        self.assertEqual(replay.universe.planets[0].color, (200, 20, 20))
+
+        replay.showFrame(50)
+        self.assertAlmostEqual(replay.universe.time, 1.0)
+        self.assertEqual(
+            replay.universe.positions.tolist(),
+            self.final.positions.tolist()
+        )
+        trail = replay.universe.planets[1].trajectory.points()
+        self.assertEqual(
+            trail.tolist(), replay.recording.positions[40:50, 1].tolist()
+        )
+
+    def test_seek(self):
+        """Test seeking is clamped to the recorded frames"""
+        replay = Replay(self.path)
+
+        replay.seek(1000)
+        self.assertEqual(replay.frame, 50)
+
+        replay.seek(-3)
+        self.assertEqual(replay.frame, 0)
+
+    def test_show_frames_forward(self):
+        """Test playing forward appends to the trails like seeking"""
+        replay = Replay(self.path, trailFrames=10)
+        trajectory = replay.universe.planets[0].trajectory
+
+        replay.showFrame(3)
+        marker = trajectory.marker()
+        for frame in (3, 5, 6, 20, 24, 12):
+            replay.showFrame(frame)
+            if frame == 6:
+                self.assertEqual(len(trajectory.pointsSince(marker)), 4)
+
+            reference = Replay(self.path, trailFrames=10)
+            reference.showFrame(frame)
+            self.assertEqual(
+                trajectory.points().tolist(),
+                reference.universe.planets[0].trajectory.points().tolist()
+            )
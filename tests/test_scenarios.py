@@ -0,0 +1,67 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from src.Universe import Universe
+from src.kernels import directField
+from src.scenarios import SCENARIOS, plummer, disk, main
+
+
+class ScenariosTests(TestCase):
+    """Test the initial conditions generators"""
+
+    def test_shapes_and_seeds(self):
+        """Test every scenario is reproducible and in its center of mass"""
+        for name, generate in SCENARIOS.items():
+            state = generate(1001, seed=4)
+            again = generate(1001, seed=4)
+
+            self.assertEqual(state['masses'].shape, (1001,), name)
+            self.assertEqual(state['positions'].shape, (1001, 3), name)
+            self.assertEqual(state['velocities'].shape, (1001, 3), name)
+            for key in state:
+                np.testing.assert_array_equal(state[key], again[key])
+            np.testing.assert_allclose(
+                state['masses'] @ state['positions'], 0, atol=1e-12
+            )
+            np.testing.assert_allclose(
+                state['masses'] @ state['velocities'], 0, atol=1e-12
+            )
+
+    def test_plummer_is_in_virial_equilibrium(self):
+        """Test twice the kinetic energy balances the potential one"""
+        state = plummer(2000, seed=1)
+        masses, positions = state['masses'], state['positions']
+
+        kinetic = 0.5 * masses @ np.sum(state['velocities']**2, axis=1)
+        disp = positions[:, np.newaxis] - positions
+        dist = np.linalg.norm(disp, axis=2)
+        np.fill_diagonal(dist, np.inf)
+        potential = -0.5 * np.sum(masses[:, np.newaxis] * masses / dist)
+
+        self.assertAlmostEqual(2 * kinetic / -potential, 1, delta=0.1)
+
+    def test_disk_orbits_are_circular(self):
+        """Test the disk's speeds balance its field, within a few percent"""
+        state = disk(2000, seed=2)
+        field = directField(state['positions'], state['masses'], 1.0)
+        radial = state['positions'][1:] - state['positions'][0]
+        speed2 = np.sum(state['velocities'][1:]**2, axis=1)
+        pull = -np.einsum('ij,ij->i', field[1:], radial)
+
+        self.assertAlmostEqual(np.median(speed2 / pull), 1, delta=0.05)
+
+    def test_cli_settings(self):
+        """Test a scenario is saved with the engine and integrator given"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cloud.npz')
+            main(['cloud', '50', path, '--seed', '1', '--engine',
+                  'barneshut', '--theta', '0.7', '--integrator', 'leapfrog'])
+            universe = Universe.loadCheckpoint(path)
+
+        self.assertEqual(len(universe.planets), 50)
+        self.assertEqual(universe.engine, 'barneshut')
+        self.assertEqual(universe.theta, 0.7)
+        self.assertEqual(universe.integrator, 'leapfrog')
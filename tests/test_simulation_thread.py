@@ -0,0 +1,44 @@
+import time
+from unittest import TestCase
+
+from src.Planet import Planet
+from src.SimulationThread import SimulationThread
+from src.Universe import Universe
+from src.vecN import Vec3
+
+
+class SimulationThreadTests(TestCase):
+    """Test stepping a universe in a background thread"""
+
+    def setUp(self):
+        self.universe = Universe(0.01, 1)
+        self.universe.setPlanets([
+            Planet(5000, Vec3(20), Vec3(-5, -5), (200, 20, 20)),
+            Planet(5000, Vec3(-20), Vec3(5, 5), (20, 200, 20)),
+        ])
+
+    def test_snapshots(self):
+        """Test the published snapshots follow the universe"""
+        simulation = SimulationThread(self.universe, 1000, 0.01)
+        first = simulation.latest()
+        self.assertEqual(first.time, 0)
+        self.assertEqual(first.planets[0].pos, self.universe.planets[0].pos)
+
+        simulation.start()
+        time.sleep(0.2)
+        simulation.paused = True
+        time.sleep(0.05)
+        steps = simulation.steps
+        time.sleep(0.05)
+        snapshot = simulation.latest()
+        simulation.stop()
+
+        self.assertGreater(steps, 0)
+        self.assertEqual(simulation.steps, steps)
+        self.assertAlmostEqual(snapshot.time, self.universe.time)
+        self.assertEqual(snapshot.planets[1].pos, self.universe.planets[1].pos)
+        self.assertEqual(
+            snapshot.planets[0].trajectory.points().tolist(),
+            self.universe.planets[0].trajectory.points().tolist()
+        )
+        self.assertIsNot(snapshot.planets[0], self.universe.planets[0])
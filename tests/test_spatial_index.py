@@ -0,0 +1,27 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.SpatialIndex import SpatialIndex
+
+
+class SpatialIndexTests(TestCase):
+    """Test picking planets through the grid index"""
+
+    def test_find_matches_linear_scan(self):
+        """Test the index finds the same planet as scanning them all"""
+        rng = np.random.default_rng(5)
+        pos = rng.uniform(-100, 100, (2000, 3))
+        radii = rng.uniform(0.5, 4, 2000)
+        index = SpatialIndex(pos, radii)
+
+        for point in rng.uniform(-100, 100, (300, 2)):
+            dist = np.linalg.norm(pos[:, :2] - point, axis=1)
+            hits = np.flatnonzero(dist < 1.1 * radii)
+            expected = int(hits[0]) if hits.size else None
+            self.assertEqual(index.find(point), expected)
+
+    def test_empty(self):
+        """Test finding nothing without planets"""
+        index = SpatialIndex(np.empty((0, 3)), np.empty(0))
+        self.assertIsNone(index.find((0, 0)))
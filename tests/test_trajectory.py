@@ -0,0 +1,132 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.Trajectory import Trajectory
+from src.vecN import Vec3
+
+
+class TrajectoryTests(TestCase):
+    """Test the Trajectory ring buffer"""
+
+    def test_append_and_wrap(self):
+        """Test the oldest points are overwritten once full"""
+        t = Trajectory(capacity=4)
+        for i in range(3):
+            t.append([i, 0, 0])
+
+        self.assertEqual(len(t), 3)
+        self.assertEqual(t.points()[:, 0].tolist(), [0, 1, 2])
+
+        for i in range(3, 10):
+            t.append([i, 0, 0])
+
+        self.assertEqual(len(t), 4)
+        self.assertEqual(t.points()[:, 0].tolist(), [6, 7, 8, 9])
+        self.assertEqual(list(t)[-1], Vec3(9, 0, 0))
+
+    def test_stride(self):
+        """Test keeping only one of every stride points"""
+        t = Trajectory(capacity=10, stride=3)
+        for i in range(10):
+            t.append(np.array([i, i, i]))
+
+        self.assertEqual(t.points()[:, 1].tolist(), [0, 3, 6, 9])
+
+    def test_extend(self):
+        """Test extending with an array like appending its points"""
+        for capacity, stride in ((4, 1), (5, 3), (0, 2)):
+            t = Trajectory(capacity, stride)
+            reference = Trajectory(capacity, stride)
+            start = 0
+            for size in (2, 3, 0, 11, 1, 6):
+                points = np.arange(start, start + size).repeat(3)
+                points = points.reshape(-1, 3)
+                start += size
+                t.extend(points)
+                for point in points:
+                    reference.append(point)
+
+                self.assertEqual(
+                    t.points().tolist(), reference.points().tolist()
+                )
+                self.assertEqual(t.marker(), reference.marker())
+                self.assertEqual(len(t), len(reference))
+
+    def test_zero_capacity(self):
+        """Test a trajectory that records nothing"""
+        t = Trajectory(capacity=0)
+        t.append([1, 2, 3])
+
+        self.assertEqual(len(t), 0)
+        self.assertEqual(t.points().shape, (0, 3))
+
+    def test_invalid_arguments(self):
+        """Test raising an error on invalid capacity or stride"""
+        with self.assertRaises(ValueError):
+            Trajectory(capacity=-1)
+
+        with self.assertRaises(ValueError):
+            Trajectory(stride=0)
+
+    def test_copy_from(self):
+        """Test copying a trajectory, fully and incrementally"""
+        source = Trajectory(capacity=5)
+        copy = Trajectory(capacity=5)
+
+        for i in range(3):
+            source.append([i, 0, 0])
+        copy.copyFrom(source)
+        self.assertEqual(copy.points().tolist(), source.points().tolist())
+
+        for i in range(3, 7):
+            source.append([i, 0, 0])
+        copy.copyFrom(source)
+        self.assertEqual(copy.points()[:, 0].tolist(), [2, 3, 4, 5, 6])
+
+        source.clear()
+        source.append([9, 9, 9])
+        copy.copyFrom(source)
+        self.assertEqual(copy.points().tolist(), [[9, 9, 9]])
+
+        for i in range(20):
+            source.append([i, 0, 0])
+        copy.copyFrom(source)
+        self.assertEqual(copy.points().tolist(), source.points().tolist())
+
+    def test_set_points(self):
+        """Test replacing the content, keeping the latest points"""
+        t = Trajectory(capacity=4)
+        t.append([9, 9, 9])
+        t.setPoints(np.arange(18).reshape(6, 3))
+
+        self.assertEqual(t.points()[:, 0].tolist(), [6, 9, 12, 15])
+
+        t.append([18, 19, 20])
+        self.assertEqual(t.points()[:, 0].tolist(), [9, 12, 15, 18])
+
+        t.setPoints(np.ones((2, 3)))
+        self.assertEqual(t.points().tolist(), [[1, 1, 1], [1, 1, 1]])
+
+    def test_points_since(self):
+        """Test reading only the points added after a marker"""
+        t = Trajectory(capacity=5)
+        marker = t.marker()
+        for i in range(3):
+            t.append([i, 0, 0])
+        self.assertEqual(t.pointsSince(marker)[:, 0].tolist(), [0, 1, 2])
+        marker = t.marker()
+
+        self.assertEqual(len(t.pointsSince(marker)), 0)
+        for i in range(3, 7):
+            t.append([i, 0, 0])
+        self.assertEqual(
+            t.pointsSince(marker)[:, 0].tolist(), [2, 3, 4, 5, 6]
+        )
+        self.assertEqual(t.dropped(), 2)
+
+        t.append([7, 0, 0])
+        self.assertIsNone(t.pointsSince(marker))
+        marker = t.marker()
+        t.clear()
+        self.assertIsNone(t.pointsSince(marker))
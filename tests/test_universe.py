@@ -1,5 +1,9 @@
+import os
+import tempfile
 from unittest import TestCase
 
+import numpy as np
+
 from src.Planet import Planet
 from src.Universe import Universe
 from src.vecN import Vec3
@@ -25,3 +29,453 @@ class UniverseTest(TestCase):
         self.assertEqual(round(result.x, 5), round(correct.x, 5))
         self.assertEqual(round(result.y, 5), round(correct.y, 5))
         self.assertEqual(round(result.z, 5), round(correct.z, 5))
+
+    def test_pairFields(self):
+        """Test the pair kernel against _fieldOnPlanet on every planet"""
+        rng = np.random.default_rng(2)
+        for softening in (0.0, 0.5):
+            u = Universe(0.01, 1.5, engine='python', softening=softening)
+            u.setArrays(
+                rng.uniform(1, 100, 30), rng.normal(0, 10, (30, 3)),
+                np.zeros((30, 3))
+            )
+
+            fields = u._pairFields()
+            self.assertEqual(len(fields), 30)
+            for i, planet in enumerate(u.planets):
+                expected = u._fieldOnPlanet(i, planet)
+                self.assertLess(
+                    abs(fields[i] - expected), 1e-12 * abs(expected)
+                )
+
+    def test_python_engine_pairs_step_like_per_planet(self):
+        """Test stepping with the pair kernel like the per-planet loop"""
+        planets = [
+            Planet(1000, Vec3(50), Vec3(-10, 5)),
+            Planet(1000, Vec3(5, -15), Vec3(7, 0)),
+            Planet(1000, Vec3(0, 30, 2), Vec3(1, -5)),
+            Planet(10, Vec3(-20, 4, -1), Vec3(0, 2, 1)),
+        ]
+        u = Universe(0.01, 1, engine='python')
+        u.setPlanets(planets)
+        expected = [(Vec3(p.pos), Vec3(p.vel)) for p in planets]
+
+        for _ in range(50):
+            u.stepTime()
+            # The previous path: each planet's field from every other
+            fields = []
+            for i, (pos, _) in enumerate(expected):
+                field = Vec3()
+                for j, (other, _) in enumerate(expected):
+                    if i != j:
+                        field += u._gravitationalField(
+                            planets[j].mass, other - pos
+                        )
+                fields.append(field)
+            expected = [
+                (pos + vel * 0.01, vel + field * 0.01)
+                for (pos, vel), field in zip(expected, fields)
+            ]
+
+        for planet, (pos, vel) in zip(planets, expected):
+            self.assertAlmostEqual(abs(planet.pos - pos), 0, places=9)
+            self.assertAlmostEqual(abs(planet.vel - vel), 0, places=9)
+
+    def test_numpy_engine_matches_python_engine(self):
+        """Test the vectorized engine steps like the per-planet loop"""
+        universes = []
+        for engine in ['python', 'numpy']:
+            u = Universe(0.01, 1, engine=engine)
+            u.setPlanets([
+                Planet(1000, Vec3(50), Vec3(-10, 5), (200, 20, 20)),
+                Planet(1000, Vec3(5, -15), Vec3(7, 0), (20, 200, 20)),
+                Planet(1000, Vec3(0, 30, 2), Vec3(1, -5), (20, 20, 200)),
+            ])
+            for _ in range(50):
+                u.stepTime()
+            universes.append(u)
+
+        for p_py, p_np in zip(*[u.planets for u in universes]):
+            self.assertAlmostEqual(abs(p_py.pos - p_np.pos), 0, places=8)
+            self.assertAlmostEqual(abs(p_py.vel - p_np.vel), 0, places=8)
+            self.assertEqual(len(p_np.trajectory), 50)
+
+    def test_planets_are_views(self):
+        """Test planets read and write the universe's arrays"""
+        u = Universe(0.1, 1)
+        u.setPlanets([
+            Planet(10, Vec3(1, 2, 3), Vec3()),
+            Planet(5, Vec3(), Vec3())
+        ])
+
+        p = u.planets[1]
+        p.vel = Vec3(4, 5, 6)
+        self.assertEqual(list(u.velocities[1]), [4, 5, 6])
+
+        u.positions[1] = [7, 8, 9]
+        self.assertEqual(p.pos, Vec3(7, 8, 9))
+
+    def test_invalid_engine(self):
+        """Test raising an error for an unknown engine"""
+        with self.assertRaises(ValueError):
+            Universe(0.1, 1, engine='fortran')
+
+    def test_barneshut_engine(self):
+        """Test the Barnes-Hut engine against the direct sum"""
+        planets = [
+            Planet(10 + i, Vec3(i % 7, i % 5, i % 3), Vec3())
+            for i in range(40)
+        ]
+        u = Universe(0.1, 1, engine='barneshut', theta=0)
+        u.setPlanets(planets)
+
+        self.assertLess(u.fieldError()['max'], 1e-10)
+
+        u.theta = 0.5
+        error = u.fieldError(sampleSize=10)
+        self.assertLess(error['rms'], 0.05)
+        self.assertLessEqual(error['rms'], error['max'])
+
+        u.setPlanets([Planet(10, Vec3(), Vec3())])
+        self.assertEqual(u.fieldError(), {'max': 0.0, 'rms': 0.0})
+
+    def test_parallel_workers(self):
+        """Test splitting the field computation across worker processes"""
+        fields = []
+        for workers in [1, 2]:
+            u = Universe(0.1, 1, workers=workers)
+            u.setPlanets([
+                Planet(10 + i, Vec3(i % 7, i % 5, i % 3), Vec3())
+                for i in range(30)
+            ])
+            fields.append(u._field())
+
+        # One process visits each pair once, the workers their targets' rows
+        np.testing.assert_allclose(fields[0], fields[1], rtol=1e-12)
+
+        with self.assertRaises(ValueError):
+            Universe(0.1, 1, engine='python', workers=2)
+
+    def test_integrators_conserve_energy(self):
+        """Test the symplectic integrators keep a binary's energy"""
+        def energy(u):
+            p1, p2 = u.planets
+            kinetic = 0.5 * (p1.mass * p1.vel.norm2() +
+                             p2.mass * p2.vel.norm2())
+            return kinetic - u.gravConst * p1.mass * p2.mass / \
+                abs(p1.pos - p2.pos)
+
+        drifts = {}
+        for integrator in ['euler', 'leapfrog', 'yoshida4', 'rk4']:
+            u = Universe(0.05, 1, integrator=integrator)
+            u.setPlanets([
+                Planet(5000, Vec3(20), Vec3(-5, -5), (200, 20, 20)),
+                Planet(5000, Vec3(-20), Vec3(5, 5), (20, 200, 20)),
+            ])
+            initial = energy(u)
+            for _ in range(200):
+                u.stepTime()
+            drifts[integrator] = abs(energy(u) / initial - 1)
+
+        self.assertLess(drifts['leapfrog'], drifts['euler'])
+        self.assertLess(drifts['yoshida4'], 1e-3)
+        self.assertLess(drifts['rk4'], 1e-3)
+
+    def test_invalid_integrator(self):
+        """Test raising an error for unknown or unsupported integrators"""
+        with self.assertRaises(ValueError):
+            Universe(0.1, 1, integrator='midpoint')
+
+        with self.assertRaises(ValueError):
+            Universe(0.1, 1, engine='python', integrator='rk4')
+
+    def test_adaptive_block_steps(self):
+        """Test refining the steps of a close pair only"""
+        def energy(u):
+            p1, p2 = u.planets[1:]
+            kinetic = 0.5 * (p1.mass * p1.vel.norm2() +
+                             p2.mass * p2.vel.norm2())
+            return kinetic - u.gravConst * p1.mass * p2.mass / \
+                ((p1.pos - p2.pos).norm2() + u.softening**2)**0.5
+
+        drifts = {}
+        for adaptive in [False, True]:
+            u = Universe(0.05, 1, integrator='leapfrog', softening=0.1,
+                         adaptive=adaptive)
+            u.setPlanets([
+                Planet(100, Vec3(10), Vec3(0, 0.5)),
+                Planet(100, Vec3(-10), Vec3(0, -0.5)),
+                Planet(1e-3, Vec3(300), Vec3(), (0, 0, 0)),
+            ])
+            u.setPlanets(sorted(u.planets, key=lambda p: -p.pos.x))
+            initial = energy(u)
+            drifts[adaptive] = 0
+            finest = [0, 0]
+            for _ in range(1000):
+                u.stepTime()
+                drifts[adaptive] = max(
+                    drifts[adaptive], abs(energy(u) / initial - 1)
+                )
+                if adaptive:
+                    finest = [max(finest[0], u.timestepLevels[0]),
+                              max(finest[1], u.timestepLevels[1])]
+
+        self.assertLess(drifts[True], drifts[False])
+        self.assertEqual(finest[0], 0)
+        self.assertGreater(finest[1], 0)
+        self.assertAlmostEqual(u.time, 50)
+
+    def test_softening(self):
+        """Test the softened field of the engines agree"""
+        fields = []
+        for engine in ['python', 'numpy', 'barneshut']:
+            u = Universe(0.1, 1, engine=engine, theta=0, softening=0.5)
+            u.setPlanets([
+                Planet(10, Vec3(0, 4, 0), Vec3()),
+                Planet(10, Vec3(3), Vec3()),
+                Planet(10, Vec3(-3), Vec3())
+            ])
+            fields.append(u._field())
+
+        correct = 2 * 10 * 4 / (5**2 + 0.5**2)**1.5
+        for field in fields:
+            self.assertAlmostEqual(field[0][1], -correct)
+
+        with self.assertRaises(ValueError):
+            Universe(0.1, 1, integrator='leapfrog', adaptive=True)
+
+    def test_checkpoint_resume_is_exact(self):
+        """Test a universe restored from a checkpoint steps identically"""
+        u = Universe(0.01, 1, integrator='yoshida4', softening=0.01)
+        u.setPlanets([
+            Planet(1000, Vec3(50), Vec3(-10, 5), (200, 20, 20)),
+            Planet(1000, Vec3(5, -15), Vec3(7, 0), (20, 200, 20), 3.5),
+            Planet(1000, Vec3(0, 30, 2), Vec3(1, -5), 'white'),
+        ])
+        for _ in range(20):
+            u.stepTime()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint.npz')
+            u.saveCheckpoint(path)
+            restored = Universe.loadCheckpoint(path)
+
+        for _ in range(30):
+            u.stepTime()
+            restored.stepTime()
+
+        self.assertEqual(restored.time, u.time)
+        self.assertEqual(restored.integrator, 'yoshida4')
+        self.assertEqual(restored.positions.tolist(), u.positions.tolist())
+        self.assertEqual(restored.velocities.tolist(), u.velocities.tolist())
+        for p, q in zip(u.planets, restored.planets):
+            self.assertEqual(p.color, q.color)
+            self.assertEqual(p.radius, q.radius)
+            self.assertEqual(
+                p.trajectory.points().tolist(), q.trajectory.points().tolist()
+            )
+
+    def test_large_checkpoint(self):
+        """Test a checkpoint of thousands of planets loads in bulk"""
+        rng = np.random.default_rng(3)
+        u = Universe(0.01, 1)
+        u.setArrays(
+            rng.uniform(1, 2, 5000), rng.normal(0, 100, (5000, 3)),
+            rng.normal(0, 1, (5000, 3)),
+            colors=rng.integers(0, 256, (5000, 3)), trajectoryCapacity=4
+        )
+        for i, planet in enumerate(u.planets[:100]):
+            planet.trajectory.extend(rng.normal(0, 1, (i % 7, 3)))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint.npz')
+            u.saveCheckpoint(path, compress=True)
+            restored = Universe.loadCheckpoint(path)
+
+        self.assertEqual(restored.positions.tolist(), u.positions.tolist())
+        self.assertEqual(restored.masses.tolist(), u.masses.tolist())
+        self.assertEqual(restored.planets[4321].color, u.planets[4321].color)
+        for p, q in zip(u.planets[:100], restored.planets):
+            self.assertEqual(
+                p.trajectory.points().tolist(), q.trajectory.points().tolist()
+            )
+        # The planets view the restored arrays
+        restored.planets[0].mass = 7
+        self.assertEqual(restored.masses[0], 7)
+
+    def test_checkpoint_trajectories(self):
+        """Test only the points trajectories hold are saved and restored"""
+        u = Universe(0.01, 1)
+        u.setPlanets([Planet(1, Vec3(i), Vec3()) for i in range(1000)])
+        state = u.checkpoint()
+        self.assertEqual(state['trajectoryPoints'].shape, (0, 3))
+
+        stride = Planet(1, Vec3(), Vec3(), trajectoryCapacity=3,
+                        trajectoryStride=2)
+        u.setPlanets([stride, Planet(1, Vec3(1), Vec3())])
+        for _ in range(7):
+            u.stepTime()
+        state = u.checkpoint()
+        self.assertEqual(state['trajectoryPoints'].shape, (3 + 7, 3))
+        self.assertNotIn(
+            'trajectoryPoints', u.checkpoint(trajectories=False)
+        )
+
+        restored = Universe.fromCheckpoint(state)
+        u.stepTime()
+        restored.stepTime()
+        for p, q in zip(u.planets, restored.planets):
+            self.assertEqual(p.trajectory.capacity, q.trajectory.capacity)
+            self.assertEqual(
+                p.trajectory.points().tolist(), q.trajectory.points().tolist()
+            )
+
+    def test_version_1_checkpoint(self):
+        """Test reading the whole ring buffers of version 1 checkpoints"""
+        u = Universe(0.01, 1)
+        u.setPlanets([
+            Planet(1, Vec3(), Vec3(1), trajectoryCapacity=4),
+            Planet(1, Vec3(5), Vec3(), trajectoryCapacity=0),
+        ])
+        for _ in range(6):
+            u.stepTime()
+
+        state = u.checkpoint()
+        state['version'] = 1
+        trajectory = u.planets[0].trajectory
+        buffer = np.zeros((2, 4, 3))
+        buffer[0] = trajectory._points
+        state['trajectoryPoints'] = buffer
+        state['trajectoryRings'] = np.array([
+            [4, 1, trajectory._head, 4, 6, 6], [0, 1, 0, 0, 6, 0]
+        ])
+
+        restored = Universe.fromCheckpoint(state)
+        self.assertEqual(
+            restored.planets[0].trajectory.points().tolist(),
+            trajectory.points().tolist()
+        )
+        self.assertEqual(len(restored.planets[1].trajectory), 0)
+
+    def test_merging_collisions(self):
+        """Test merged planets keep the total mass, momentum and volume"""
+        u = Universe(0.01, 1, collisions='merge')
+        u.setPlanets([
+            Planet(1, Vec3(0), Vec3(1, 0), (200, 20, 20), 2),
+            Planet(3, Vec3(3), Vec3(-1, 2), (20, 200, 20), 2),
+            Planet(1, Vec3(0, 100), Vec3(0), 'white', 1),
+        ])
+        momentum = u.velocities.T @ u.masses
+        u.stepTime()
+
+        self.assertEqual(len(u.planets), 2)
+        self.assertEqual(u.numCollisions, 1)
+        self.assertEqual(u.masses.tolist(), [4, 1])
+        self.assertEqual(u.planets[0].color, (20, 200, 20))
+        self.assertAlmostEqual(u.radii[0]**3, 16)
+        np.testing.assert_allclose(u.velocities.T @ u.masses, momentum)
+
+        restored = Universe.fromCheckpoint(u.checkpoint())
+        self.assertEqual(restored.numCollisions, 1)
+
+    def test_bouncing_collisions(self):
+        """Test a head-on bounce of equal masses swaps the velocities"""
+        u = Universe(0.01, 0, collisions='bounce')
+        u.setPlanets([
+            Planet(1, Vec3(0), Vec3(1, 0), (200, 20, 20), 2),
+            Planet(1, Vec3(3), Vec3(-1, 0), (20, 200, 20), 2),
+        ])
+        u.stepTime()
+
+        self.assertEqual(len(u.planets), 2)
+        np.testing.assert_allclose(
+            u.velocities, [[-1, 0, 0], [1, 0, 0]], atol=1e-12
+        )
+
+    def test_invalid_collisions(self):
+        """Test raising an error for an unknown collision handling"""
+        with self.assertRaises(ValueError):
+            Universe(0.1, 1, collisions='stick')
+
+    def test_add_and_remove_planets(self):
+        """Test insertions keep the planets sorted and viewing the arrays"""
+        u = Universe(0.01, 1)
+        rng = np.random.default_rng(2)
+        for x, z in rng.uniform(-10, 10, (50, 2)):
+            u.addPlanet(Planet(1, Vec3(x, 0, z), Vec3(0, x)))
+        for idx in (40, 0, 10):
+            u.removePlanet(idx)
+
+        self.assertEqual(len(u.positions), 47)
+        self.assertEqual(
+            [p.pos.z for p in u.planets], sorted(u.positions[:, 2])
+        )
+        for i, planet in enumerate(u.planets):
+            self.assertEqual(planet.pos.x, u.positions[i, 0])
+            self.assertEqual(planet.vel.y, u.velocities[i, 1])
+
+            u.positions[i, 1] = i
+            self.assertEqual(planet.pos.y, i)
+
+    def test_planet_at(self):
+        """Test finding the planet under a point, if any"""
+        u = Universe(0.01, 1)
+        u.setPlanets([
+            Planet(1, Vec3(0), Vec3(), radius=2),
+            Planet(1, Vec3(10), Vec3(), radius=5),
+        ])
+
+        self.assertEqual(u.planetAt((1, 1)), 0)
+        self.assertEqual(u.planetAt((14, 3)), 1)
+        self.assertIsNone(u.planetAt((5, 5)))
+
+        u.planets[1].pos = Vec3(5, 5)
+        self.assertEqual(u.planetAt((5, 5)), 1)
+
+    def test_set_arrays(self):
+        """Test bulk loading matches building the planets one by one"""
+        rng = np.random.default_rng(6)
+        masses = rng.uniform(1, 2, 30)
+        positions = rng.normal(size=(30, 3))
+        velocities = rng.normal(size=(30, 3))
+        colors = [tuple(c) for c in rng.integers(0, 255, (30, 3)).tolist()]
+
+        u = Universe(0.01, 1, integrator='leapfrog')
+        u.setArrays(masses, positions, velocities, 1.5, colors)
+        reference = Universe(0.01, 1, integrator='leapfrog')
+        reference.setPlanets([
+            Planet(m, Vec3(*p), Vec3(*v), c, 1.5)
+            for m, p, v, c in zip(masses.tolist(), positions.tolist(),
+                                  velocities.tolist(), colors)
+        ])
+        for _ in range(5):
+            u.stepTime()
+            reference.stepTime()
+
+        self.assertEqual(u.positions.tolist(), reference.positions.tolist())
+        self.assertEqual(
+            [p.color for p in u.planets], [p.color for p in reference.planets]
+        )
+        u.planets[3].mass = 10
+        self.assertEqual(u.masses[3], 10)
+
+        with self.assertRaises(ValueError):
+            u.setArrays(masses, positions[:, :2], velocities)
+
+    def test_validation(self):
+        """Test NumPy scalars are accepted and invalid planets rejected"""
+        u = Universe(np.float64(0.01), np.int64(1), workers=np.int64(1),
+                     maxLevel=np.int32(4))
+        self.assertEqual(u.dt, 0.01)
+        self.assertEqual(u.maxLevel, 4)
+
+        with self.assertRaises(TypeError):
+            u.setPlanets([Planet(1, Vec3(), Vec3()), 'planet'])
+        with self.assertRaises(ValueError):
+            u.setPlanets([Planet(float('nan'), Vec3(), Vec3())])
+        with self.assertRaises(ValueError):
+            u.setArrays([1, 2], [[0, 0, 0], [1, np.inf, 0]], np.zeros((2, 3)))
+
+        u.setArrays([1, 2], [[0, 0, 0], [1, np.inf, 0]], np.zeros((2, 3)),
+                    validate=False)
+        self.assertEqual(len(u.planets), 2)
@@ -0,0 +1,111 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.Universe import Universe
+from src.UniverseBatch import UniverseBatch
+
+
+class UniverseBatchTests(TestCase):
+    """Test stepping a stack of small systems together"""
+
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.masses = rng.uniform(1, 2, (20, 3))
+        self.positions = rng.normal(0, 10, (20, 3, 3))
+        self.velocities = rng.normal(0, 0.3, (20, 3, 3))
+
+    def makeBatch(self, dt=0.01, gravConst=1, integrator='leapfrog'):
+        batch = UniverseBatch(dt, gravConst, integrator)
+        batch.setArrays(self.masses, self.positions, self.velocities)
+        return batch
+
+    def makeUniverse(self, s, dt=0.01, gravConst=1, integrator='leapfrog'):
+        u = Universe(dt, gravConst, integrator=integrator)
+        u.setArrays(self.masses[s], self.positions[s], self.velocities[s])
+        return u
+
+    def assertMatchesUniverse(self, batch, s, universe):
+        # The universe sorts its planets by z
+        order = np.argsort(self.positions[s, :, 2], kind='stable')
+        np.testing.assert_allclose(
+            batch.positions[s, order], universe.positions, atol=1e-9
+        )
+        np.testing.assert_allclose(
+            batch.velocities[s, order], universe.velocities, atol=1e-9
+        )
+
+    def test_step_like_universe(self):
+        """Test each system steps like a universe of its own"""
+        for integrator in ('euler', 'leapfrog', 'yoshida4', 'rk4'):
+            batch = self.makeBatch(integrator=integrator)
+            batch.stepTime(50)
+            self.assertAlmostEqual(batch.time, 0.5)
+
+            for s in (0, 7, 19):
+                u = self.makeUniverse(s, integrator=integrator)
+                for _ in range(50):
+                    u.stepTime()
+                self.assertMatchesUniverse(batch, s, u)
+
+    def test_per_system_parameters(self):
+        """Test a time step and a constant for each system"""
+        dt = np.linspace(0.005, 0.01, 20)
+        gravConst = np.linspace(1, 3, 20)
+        batch = self.makeBatch(dt, gravConst)
+        batch.stepTime(30)
+
+        np.testing.assert_allclose(batch.time, 30 * dt)
+        for s in (0, 11):
+            u = self.makeUniverse(s, dt[s], gravConst[s])
+            for _ in range(30):
+                u.stepTime()
+            self.assertMatchesUniverse(batch, s, u)
+
+    def test_conserved_quantities(self):
+        """Test the energies, momenta and centers of mass of the systems"""
+        batch = self.makeBatch()
+        for s in (0, 4):
+            u = self.makeUniverse(s)
+            energy = 0.5 * u.masses @ (
+                np.sum(u.velocities**2, axis=1) + u.potentials()
+            )
+            self.assertAlmostEqual(batch.energies()[s], energy)
+            np.testing.assert_allclose(
+                batch.momenta()[s], u.masses @ u.velocities, atol=1e-12
+            )
+            np.testing.assert_allclose(
+                batch.angularMomenta()[s],
+                u.masses @ np.cross(u.positions, u.velocities), atol=1e-12
+            )
+            np.testing.assert_allclose(
+                batch.centersOfMass()[s], u.centerOfMass(), atol=1e-12
+            )
+
+        energies = batch.energies()
+        batch.stepTime(100)
+        self.assertLess(
+            np.max(np.abs(batch.energies() / energies - 1)), 1e-3
+        )
+
+    def test_invalid(self):
+        """Test invalid parameters and arrays are refused"""
+        with self.assertRaises(ValueError):
+            UniverseBatch(0.01, 1, 'verlet')
+        with self.assertRaises(TypeError):
+            UniverseBatch('0.01', 1)
+        with self.assertRaises(ValueError):
+            UniverseBatch(0.01, 1).setArrays(
+                self.masses, self.positions[:, :2], self.velocities
+            )
+        with self.assertRaises(ValueError):
+            UniverseBatch(np.ones(3), 1).setArrays(
+                self.masses, self.positions, self.velocities
+            )
+
+        positions = self.positions.copy()
+        positions[3, 1, 0] = np.nan
+        with self.assertRaises(ValueError):
+            UniverseBatch(0.01, 1).setArrays(
+                self.masses, positions, self.velocities
+            )
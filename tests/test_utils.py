@@ -1,6 +1,8 @@
 from unittest import TestCase
 
-from src.utils import assertType
+import numpy as np
+
+from src.utils import assertType, assertReal, assertInteger, assertArray
 
 
 class AuxClass():
@@ -67,3 +69,41 @@ class CheckTypeTests(TestCase):
         for payload in payloads:
             with self.assertRaises(TypeError):
                 assertType(*payload)
+
+
+class CheckNumbersTests(TestCase):
+    """Test the checks of numbers and arrays"""
+
+    def test_assert_real(self):
+        """Test accepting python and numpy reals only"""
+        for value in (1, 1.5, np.float32(2), np.int8(3), np.float64(-1)):
+            assertReal('', value)
+
+        for value in ('1', True, None, [1.0], np.array([1.0])):
+            with self.assertRaises(TypeError):
+                assertReal('', value)
+
+    def test_assert_integer(self):
+        """Test accepting python and numpy integers only"""
+        for value in (1, np.int64(2), np.uint8(3)):
+            assertInteger('', value)
+
+        for value in (1.0, np.float64(2), False, '1'):
+            with self.assertRaises(TypeError):
+                assertInteger('', value)
+
+    def test_assert_array(self):
+        """Test shapes, wildcards and finite values are checked at once"""
+        array = assertArray('', [[1, 2, 3], [4, 5, 6]], (None, 3))
+        self.assertEqual(array.dtype, np.float64)
+        self.assertEqual(array.shape, (2, 3))
+
+        payloads = [
+            [[1, 2, 3], (None, 3)],
+            [[[1, 2]], (1, 3)],
+            [[1.0, np.nan], (2,)],
+            [[np.inf], (None,)],
+        ]
+        for array, shape in payloads:
+            with self.assertRaises(ValueError):
+                assertArray('', array, shape)
@@ -0,0 +1,182 @@
+import os
+from unittest import TestCase
+
+import numpy as np
+import pygame
+
+from src.Planet import Planet
+from src.SimulationThread import SimulationThread
+from src.Universe import Universe
+from src.View import View, MAX_TRAIL_POINTS
+from src.vecN import Vec2, Vec3
+
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+
+class ViewTests(TestCase):
+    """Test the View drawing helpers, without a display"""
+
+    def setUp(self):
+        self.view = View(800, 600)
+        self.view.camCenter = Vec2(10, -5)
+        self.view.camSize = 200
+
+    def tearDown(self):
+        self.view.quit()
+
+    def test_array_to_screen_coords(self):
+        """Test the batched transform matches the per point one"""
+        points = np.array([[0, 0, 0], [13.7, -42.1, 3], [-90, 95, 0]])
+        coords = self.view._arrayToScreenCoords(points)
+
+        for point, coord in zip(points, coords):
+            self.assertEqual(
+                tuple(coord), self.view._posToScreenCoords(Vec3(*point))
+            )
+
+    def test_visible_runs(self):
+        """Test culling off screen segments and merging repeated pixels"""
+        coords = np.array([
+            [10, 10], [10, 10], [20, 20], [-50, -50], [-60, -60],
+            [-70, -70], [30, 30], [40, 40]
+        ])
+        runs = self.view._visibleRuns(coords)
+
+        self.assertEqual([run.tolist() for run in runs], [
+            [[10, 10], [20, 20], [-50, -50]],
+            [[-70, -70], [30, 30], [40, 40]],
+        ])
+
+    def test_trail_level_of_detail(self):
+        """Test long trails are decimated keeping their end points"""
+        coords = np.stack([np.arange(5000) % 800, np.arange(5000) // 800], 1)
+        runs = self.view._visibleRuns(coords)
+
+        self.assertLessEqual(sum(len(run) for run in runs),
+                             MAX_TRAIL_POINTS + 1)
+        self.assertEqual(runs[0][0].tolist(), [0, 0])
+        self.assertEqual(runs[-1][-1].tolist(), coords[-1].tolist())
+
+    def test_overlay(self):
+        """Test the overlay is drawn over the top left corner"""
+        self.view.screen.fill((0, 0, 0))
+        self.view.overlay = ['step   10   1.000 ms  50.0%']
+        self.view._drawOverlay()
+
+        pixels = pygame.surfarray.array3d(self.view.screen)
+        self.assertTrue(pixels[:200, :30].any())
+        self.assertFalse(pixels[:, 100:].any())
+
+    def test_draw_planets(self):
+        """Test drawing the planets at once like one by one, with culling"""
+        rng = np.random.default_rng(4)
+        positions = np.concatenate([
+            rng.uniform(-80, 100, (50, 3)),
+            # A cluster off the left edge, half of it moving into view
+            np.tile([[-150, 20, 0], [-150, -40, 0]], (100, 1)),
+        ])
+        velocities = np.concatenate([
+            rng.normal(0, 10, (50, 3)),
+            np.tile([[-5, 0, 0], [80, 0, 0]], (100, 1)),
+        ])
+        colors = rng.integers(0, 256, (len(positions), 3))
+        u = Universe(0.05, 1)
+        u.setArrays(np.ones(len(positions)), positions, velocities,
+                    radii=rng.uniform(0.5, 3, len(positions)),
+                    colors=[tuple(color) for color in colors.tolist()])
+
+        self.view.screen.fill((0, 0, 0))
+        rects = self.view._drawPlanets(u)
+        drawn = pygame.surfarray.array3d(self.view.screen)
+
+        # The per planet drawing, every indicator on the edge included
+        self.view.screen.fill((0, 0, 0))
+        width, height = self.view.screenSize
+        for planet in u.planets:
+            x, y = self.view._posToScreenCoords(planet.pos)
+            radius = (width / self.view.camSize) * planet.radius
+            if not self.view._isInScreen((x, y)):
+                radius /= 2
+            center = (min(max(x, 0), width), min(max(y, 0), height))
+            pygame.draw.circle(self.view.screen, planet.color, center,
+                               radius)
+            pygame.draw.line(
+                self.view.screen, (255, 255, 255), center,
+                self.view._posToScreenCoords(planet.pos + 1.5 * planet.vel)
+            )
+
+        np.testing.assert_array_equal(
+            drawn, pygame.surfarray.array3d(self.view.screen)
+        )
+        self.assertLess(len(rects), 2 * len(positions))
+        self.assertEqual(self.view._drawPlanets(Universe(0.05, 1)), [])
+
+    def makeUniverse(self):
+        u = Universe(0.05, 1, integrator='leapfrog')
+        u.setPlanets([
+            Planet(5000, Vec3(20), Vec3(-5, -5), (200, 20, 20)),
+            Planet(5000, Vec3(-20), Vec3(5, 5), (20, 200, 20)),
+            Planet(10, Vec3(0, 60), Vec3(9, 0), (20, 20, 200)),
+        ])
+        return u
+
+    def test_incremental_trails(self):
+        """Test frames drawn on the trail layer match full redraws"""
+        u = self.makeUniverse()
+        self.view.drawUniverse(u)
+
+        for _ in range(20):
+            u.stepTime()
+            self.assertIsNotNone(self.view._updateTrails(u))
+            self.view._invalidateTrails()
+            self.view.drawUniverse(u)
+        full = pygame.surfarray.array3d(self.view.screen)
+
+        view = View(800, 600)
+        view.camCenter, view.camSize = self.view.camCenter, self.view.camSize
+        u = self.makeUniverse()
+        view.drawUniverse(u)
+        for _ in range(20):
+            u.stepTime()
+            view.drawUniverse(u)
+
+        np.testing.assert_array_equal(
+            pygame.surfarray.array3d(view.screen), full
+        )
+
+    def test_trails_redrawn(self):
+        """Test the layer is redrawn when the camera or planets change"""
+        u = self.makeUniverse()
+        self.view.drawUniverse(u)
+        u.stepTime()
+        self.assertIsNotNone(self.view._updateTrails(u))
+
+        self.view._moveCamera(Vec2(1, 0))
+        self.assertIsNone(self.view._updateTrails(u))
+        self.view._zoomCamera(10)
+        self.assertIsNone(self.view._updateTrails(u))
+        self.assertIsNotNone(self.view._updateTrails(u))
+
+        u.removePlanet(0)
+        self.assertIsNone(self.view._updateTrails(u))
+        u.planets[0].trajectory.clear()
+        self.assertIsNone(self.view._updateTrails(u))
+
+    def test_trails_from_snapshots(self):
+        """Test snapshots of a simulation thread are drawn incrementally"""
+        simulation = SimulationThread(self.makeUniverse(), 60, 1 / 60)
+        redraws = []
+        redrawTrails = self.view._redrawTrails
+        self.view._redrawTrails = lambda *args: (
+            redraws.append(args), redrawTrails(*args)
+        )
+
+        self.view.drawUniverse(simulation.latest())
+        for _ in range(10):
+            simulation.universe.stepTime()
+            simulation._publish()
+            self.view.drawUniverse(simulation.latest())
+
+        self.assertEqual(len(redraws), 1)
+        self.assertEqual(len(self.view._trailMarkers), 3)